@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Simple Work Order API Load Benchmark
+Seeds a scratch database, drives the ASGI app in-process with concurrent clients
+and reports latency percentiles and throughput as JSON, optionally against a baseline
+"""
+
+import sys
+import os
+import argparse
+import asyncio
+import json
+import logging
+import math
+import platform
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Make the backend package importable when run from anywhere
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import httpx
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from src import database
+from src.database import Base, async_database_url, create_async_database_engine, create_database_engine
+from src.main import app
+from src.models import SimpleUser, SimpleWorkOrder, WorkOrderFile, WorkOrderUpdate
+from src.security import BCRYPT_ROUNDS, get_password_hash
+from src.services.blob_store import blob_store
+from src.services.file_uploads import chunked_uploads
+from src.services.simple_work_order_service import VALID_STATUSES
+
+BASE_PATH = "/api/v1/simple-work-orders"
+BENCH_PASSWORD = "bench-password"
+SCENARIOS = ("login", "dashboard", "create", "status_change", "upload")
+
+# A scenario regresses when p95 grows or throughput drops by more than this fraction
+DEFAULT_TOLERANCE = 0.25
+
+
+def seed(database_url: str, orders: int, users: int, files: int, seed_value: int = 42):
+    """Create the simple work order tables and fill them; refuses a database that already has orders."""
+    rng = random.Random(seed_value)
+    engine = create_engine(database_url)
+    try:
+        Base.metadata.create_all(engine)
+        with engine.begin() as connection:
+            if connection.execute(select(func.count()).select_from(SimpleWorkOrder.__table__)).scalar():
+                raise RuntimeError("Database already has work orders - point --database-url at a scratch database")
+
+            # One bcrypt hash shared by every user: seeding stays fast, logins still pay full cost
+            hashed = get_password_hash(BENCH_PASSWORD)
+            connection.execute(SimpleUser.__table__.insert(), [
+                {"username": f"bench{i}", "email": f"bench{i}@example.com", "full_name": f"Bench User {i}",
+                 "hashed_password": hashed, "role": "employee", "is_active": True, "is_admin": i == 0,
+                 "created_at": datetime.utcnow()}
+                for i in range(users)
+            ])
+
+            start = datetime.utcnow() - timedelta(days=365)
+            connection.execute(SimpleWorkOrder.__table__.insert(), [
+                {"id": i, "customer_name": f"Cafe {i}", "customer_email": f"orders{i}@example.com",
+                 "order_description": "12oz hot cups, two colour logo", "quantity": rng.choice((1000, 5000, 10000)),
+                 "status": rng.choice(VALID_STATUSES), "created_at": start + timedelta(minutes=i),
+                 "updated_at": start + timedelta(minutes=i)}
+                for i in range(1, orders + 1)
+            ])
+            if connection.dialect.name == "postgresql":
+                # Explicit ids leave the serial sequence at 1 - move it past them or "create" hits duplicate keys
+                connection.execute(text("SELECT setval(pg_get_serial_sequence('simple_work_orders', 'id'), :last_id)"),
+                                   {"last_id": orders})
+            connection.execute(WorkOrderUpdate.__table__.insert(), [
+                {"work_order_id": rng.randint(1, orders), "new_status": rng.choice(VALID_STATUSES),
+                 "updated_by": "Bench", "updated_at": start + timedelta(minutes=i)}
+                for i in range(orders)
+            ])
+            if files:
+                connection.execute(WorkOrderFile.__table__.insert(), [
+                    {"work_order_id": rng.randint(1, orders), "file_name": f"artwork-{i}.pdf",
+                     "file_path": f"uploads/artwork-{i}.pdf", "file_type": "design", "uploaded_by": "Bench",
+                     "uploaded_at": start + timedelta(minutes=i)}
+                    for i in range(files)
+                ])
+    finally:
+        engine.dispose()
+
+
+def use_database(database_url: str):
+    """Route the app's sync and async sessions to the benchmark database (pooled like production)."""
+    sync_engine = create_database_engine(database_url)
+    async_engine = create_async_database_engine(async_database_url(database_url))
+    SyncSession = sessionmaker(autocommit=False, autoflush=False, bind=sync_engine)
+    AsyncSession = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    def override_get_db():
+        db = SyncSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def override_get_async_db():
+        async with AsyncSession() as db:
+            yield db
+
+    app.dependency_overrides[database.get_db] = override_get_db
+    app.dependency_overrides[database.get_async_db] = override_get_async_db
+    return sync_engine, async_engine
+
+
+def percentile(sorted_values: list, p: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(0, math.ceil(p / 100 * len(sorted_values)) - 1)]
+
+
+def summarize(latencies: list, errors: int, elapsed: float) -> dict:
+    latencies = sorted(latencies)
+    to_ms = lambda seconds: round(seconds * 1000, 3)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "p50_ms": to_ms(percentile(latencies, 50)),
+        "p95_ms": to_ms(percentile(latencies, 95)),
+        "p99_ms": to_ms(percentile(latencies, 99)),
+        "mean_ms": to_ms(sum(latencies) / len(latencies)) if latencies else 0.0,
+        "max_ms": to_ms(latencies[-1]) if latencies else 0.0,
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0
+    }
+
+
+def scenario_request(name: str, client: httpx.AsyncClient, rng: random.Random, orders: int, users: int,
+                     upload_bytes: int):
+    """One request of a scenario, as an awaitable."""
+    if name == "login":
+        return client.post("/api/v1/simple-auth/login",
+                           json={"username": f"bench{rng.randrange(users)}", "password": BENCH_PASSWORD})
+    if name == "dashboard":
+        return client.get(f"{BASE_PATH}/dashboard")
+    if name == "create":
+        return client.post(f"{BASE_PATH}/create", data={
+            "customer_name": f"Cafe {rng.randrange(100000)}", "customer_email": "orders@example.com",
+            "order_description": "8oz cold cups, one colour logo", "quantity": "2000"
+        })
+    if name == "status_change":
+        return client.patch(f"{BASE_PATH}/{rng.randint(1, orders)}/status",
+                            json={"status": rng.choice(VALID_STATUSES), "updated_by": "Bench"})
+    if name == "upload":
+        # Fresh content every time, so each upload is a real write and not a dedup hit
+        content = rng.randbytes(upload_bytes)
+        return client.post(f"{BASE_PATH}/{rng.randint(1, orders)}/upload",
+                           data={"file_type": "design", "uploaded_by": "Bench"},
+                           files={"file": ("artwork.pdf", content, "application/pdf")})
+    raise ValueError(f"Unknown scenario {name}")
+
+
+def succeeded(response: httpx.Response) -> bool:
+    if response.status_code >= 400:
+        return False
+    if response.headers.get("content-type", "").startswith("application/json"):
+        body = response.json()
+        return not (isinstance(body, dict) and body.get("success") is False)
+    return True
+
+
+async def run_scenario(client: httpx.AsyncClient, name: str, requests: int, concurrency: int, warmup: int,
+                       orders: int, users: int, upload_bytes: int, seed_value: int) -> dict:
+    """Fire `requests` requests from `concurrency` concurrent clients and time each one."""
+    rng = random.Random(f"{seed_value}:{name}")
+    for _ in range(warmup):
+        await scenario_request(name, client, rng, orders, users, upload_bytes)
+
+    latencies = []
+    errors = 0
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            request = scenario_request(name, client, rng, orders, users, upload_bytes)
+            started = time.perf_counter()
+            try:
+                response = await request
+                ok = succeeded(response)
+            except Exception:
+                ok = False
+            latencies.append(time.perf_counter() - started)
+            if not ok:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+async def run_benchmarks(scenarios, requests: int, concurrency: int, warmup: int, orders: int, users: int,
+                         upload_bytes: int, seed_value: int) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        results = {}
+        for name in scenarios:
+            results[name] = await run_scenario(client, name, requests, concurrency, warmup,
+                                               orders, users, upload_bytes, seed_value)
+            print(f"  {name:<14} p50 {results[name]['p50_ms']:8.2f} ms  p95 {results[name]['p95_ms']:8.2f} ms  "
+                  f"p99 {results[name]['p99_ms']:8.2f} ms  {results[name]['throughput_rps']:8.1f} req/s"
+                  f"{'  ' + str(results[name]['errors']) + ' errors' if results[name]['errors'] else ''}")
+        return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Scenarios that got slower than the baseline by more than `tolerance`, as readable lines."""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous:
+            continue
+        if current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {previous['p95_ms']} -> {current['p95_ms']} ms")
+        if current["throughput_rps"] < previous["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {previous['throughput_rps']} -> {current['throughput_rps']} req/s")
+        if current["errors"] > previous["errors"]:
+            regressions.append(f"{name}: errors {previous['errors']} -> {current['errors']}")
+    return regressions
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Load-test the simple work order API in-process")
+    parser.add_argument("--database-url", help="Empty scratch database to seed (default: a temporary SQLite file)")
+    parser.add_argument("--orders", type=int, default=2000, help="Work orders to seed (default: 2000)")
+    parser.add_argument("--users", type=int, default=20, help="Users to seed (default: 20)")
+    parser.add_argument("--files", type=int, default=2000, help="File rows to seed (default: 2000)")
+    parser.add_argument("--requests", type=int, default=200, help="Measured requests per scenario (default: 200)")
+    parser.add_argument("--concurrency", type=int, default=10, help="Concurrent clients (default: 10)")
+    parser.add_argument("--warmup", type=int, default=5, help="Unmeasured requests per scenario (default: 5)")
+    parser.add_argument("--upload-kb", type=int, default=256, help="Size of each uploaded file (default: 256)")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help=f"Comma-separated subset of {SCENARIOS}")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for data and request mix")
+    parser.add_argument("--output", help="Write the JSON results here (default: print them)")
+    parser.add_argument("--baseline", help="Compare with a previous JSON result and exit 1 on a regression")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help=f"Allowed p95/throughput change vs the baseline (default: {DEFAULT_TOLERANCE})")
+    args = parser.parse_args()
+
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    print("USPC Factory - API Load Benchmark")
+    print("=" * 40)
+
+    # Request logging would dominate the numbers
+    logging.disable(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as scratch:
+        database_url = args.database_url or f"sqlite:///{os.path.join(scratch, 'bench.db')}"
+        print(f"🌱 Seeding {args.orders} orders, {args.users} users, {args.files} files "
+              f"into {'SQLite' if not args.database_url else 'the given database'}...")
+        try:
+            seed(database_url, args.orders, args.users, args.files, args.seed)
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+
+        blob_store.directory = os.path.join(scratch, "blobs")
+        chunked_uploads.directory = os.path.join(scratch, "incoming")
+        sync_engine, async_engine = use_database(database_url)
+
+        print(f"🚀 {args.requests} requests per scenario, {args.concurrency} concurrent clients\n")
+        try:
+            results = asyncio.run(run_benchmarks(
+                scenarios, args.requests, args.concurrency, args.warmup, args.orders, args.users,
+                args.upload_kb * 1024, args.seed
+            ))
+        finally:
+            app.dependency_overrides.clear()
+            sync_engine.dispose()
+            asyncio.run(async_engine.dispose())
+
+    report = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": database_url.split(":", 1)[0] if args.database_url else "sqlite",
+            "orders": args.orders,
+            "users": args.users,
+            "files": args.files,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "upload_kb": args.upload_kb,
+            "bcrypt_rounds": BCRYPT_ROUNDS,
+            "seed": args.seed
+        },
+        "results": results
+    }
+
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(report, handle, indent=2)
+            handle.write("\n")
+        print(f"\n📄 Results written to {args.output}")
+    else:
+        print("\n" + json.dumps(report, indent=2))
+
+    failed = [name for name, result in results.items() if result["errors"]]
+    if failed:
+        print(f"❌ Requests failed in: {', '.join(failed)}")
+
+    if args.baseline:
+        with open(args.baseline) as handle:
+            baseline = json.load(handle)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"❌ Slower than {args.baseline} (tolerance {args.tolerance:.0%}):")
+            for line in regressions:
+                print(f"   {line}")
+            sys.exit(1)
+        print(f"✅ Within {args.tolerance:.0%} of {args.baseline}")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Work Order Statistics Benchmark
+Compares the old one-count-per-enum /stats queries with the single grouped query
+"""
+
+import sys
+import os
+import argparse
+import calendar
+import random
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+# Make the backend package importable when run from anywhere
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from sqlalchemy import Column, Integer, MetaData, Table, create_engine, event, func, select
+
+from src.models.work_order import WorkOrder, WorkOrderStatus, Priority
+from src.services.work_order_service import OPEN_VALUE_STATUSES, fold_statistics, statistics_statement
+
+
+def create_sqlite_schema(engine):
+    """work_orders plus bare users/customers tables so its foreign keys resolve."""
+    metadata = MetaData()
+    Table("users", metadata, Column("id", Integer, primary_key=True))
+    Table("customers", metadata, Column("id", Integer, primary_key=True))
+    work_orders = WorkOrder.__table__.to_metadata(metadata)
+    metadata.create_all(engine)
+    return work_orders
+
+
+def seed_work_orders(engine, work_orders, count: int):
+    """Insert random work orders spread over the last year."""
+    now = datetime.utcnow()
+    rows = []
+    for i in range(count):
+        status = random.choice(list(WorkOrderStatus))
+        order_date = now - timedelta(days=random.randint(0, 365))
+        rows.append({
+            "work_order_number": f"WOBENCH-{i:07d}",
+            "customer_id": 1,
+            "product_type": "Paper Cup 12oz",
+            "quantity": 1000,
+            "unit_price": Decimal("0.12"),
+            "total_amount": Decimal("120.00"),
+            "priority": random.choice(list(Priority)),
+            "status": status,
+            "order_date": order_date,
+            "delivery_date": order_date + timedelta(days=14) if status == WorkOrderStatus.DELIVERED else None,
+            "is_active": random.random() > 0.05
+        })
+    with engine.begin() as connection:
+        connection.execute(work_orders.insert(), rows)
+
+
+def per_enum_statistics(connection, month_start, month_end) -> dict:
+    """The previous implementation: one COUNT per status and priority plus five more queries."""
+    work_orders = WorkOrder.__table__
+    active = work_orders.c.is_active == True
+
+    def count(*criteria):
+        return connection.execute(select(func.count()).select_from(work_orders).where(active, *criteria)).scalar()
+
+    status_counts = {status.value: count(work_orders.c.status == status) for status in WorkOrderStatus}
+    priority_counts = {priority.value: count(work_orders.c.priority == priority) for priority in Priority}
+    total_value = connection.execute(
+        select(func.coalesce(func.sum(work_orders.c.total_amount), 0))
+        .where(active, work_orders.c.status.in_(OPEN_VALUE_STATUSES))
+    ).scalar()
+
+    return {
+        "total_orders": count(),
+        "orders_by_status": status_counts,
+        "orders_by_priority": priority_counts,
+        "pending_orders": count(work_orders.c.status == WorkOrderStatus.PENDING),
+        "in_production_orders": count(work_orders.c.status == WorkOrderStatus.IN_PRODUCTION),
+        "completed_this_month": count(
+            work_orders.c.status == WorkOrderStatus.DELIVERED,
+            work_orders.c.delivery_date.between(month_start, month_end)
+        ),
+        "total_value": Decimal(total_value)
+    }
+
+
+def grouped_statistics(connection, month_start, month_end) -> dict:
+    return fold_statistics(connection.execute(statistics_statement(month_start, month_end)).all())
+
+
+def measure(engine, strategy, month_start, month_end, repeat: int):
+    """Run a strategy `repeat` times; return (statements per call, ms per call, last result)."""
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        with engine.connect() as connection:
+            started_at = time.perf_counter()
+            for _ in range(repeat):
+                result = strategy(connection, month_start, month_end)
+            elapsed = time.perf_counter() - started_at
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    return len(statements) // repeat, elapsed * 1000 / repeat, result
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Benchmark /stats query strategies")
+    parser.add_argument("--database-url", help="Existing database to measure (default: seeded temporary SQLite)")
+    parser.add_argument("--orders", type=int, default=50000, help="Orders to seed into SQLite (default: 50000)")
+    parser.add_argument("--repeat", type=int, default=20, help="Calls per strategy (default: 20)")
+    args = parser.parse_args()
+
+    print("USPC Factory - /stats Benchmark")
+    print("=" * 40)
+
+    if args.database_url:
+        engine = create_engine(args.database_url)
+        print(f"🔍 Using existing data at {engine.url.render_as_string(hide_password=True)}")
+    else:
+        engine = create_engine("sqlite://")
+        print(f"🔄 Seeding {args.orders} work orders into in-memory SQLite...")
+        seed_work_orders(engine, create_sqlite_schema(engine), args.orders)
+
+    now = datetime.utcnow()
+    month_start = datetime(now.year, now.month, 1)
+    month_end = datetime(now.year, now.month, calendar.monthrange(now.year, now.month)[1], 23, 59, 59)
+
+    old_statements, old_ms, old_result = measure(engine, per_enum_statistics, month_start, month_end, args.repeat)
+    new_statements, new_ms, new_result = measure(engine, grouped_statistics, month_start, month_end, args.repeat)
+
+    print(f"\nper-enum counts : {old_statements:3d} round trips, {old_ms:8.2f} ms/call")
+    print(f"grouped query   : {new_statements:3d} round trips, {new_ms:8.2f} ms/call")
+    print(f"\n{'✅' if old_result == new_result else '❌'} Results {'match' if old_result == new_result else 'differ'}")
+    if old_result != new_result:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
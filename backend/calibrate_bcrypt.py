@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+bcrypt Cost Calibration
+Measures hash time on this machine and recommends BCRYPT_ROUNDS for a latency budget
+"""
+
+import sys
+import os
+import argparse
+
+# Add the src directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.security import BCRYPT_ROUNDS, PASSWORD_HASH_WORKERS, measure_hash_time, recommend_rounds
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Recommend a bcrypt cost for a target login latency")
+    parser.add_argument("--target-ms", type=float, default=250.0, help="Latency budget for one hash (default: 250)")
+    parser.add_argument("--min-rounds", type=int, default=10, help="Lowest cost to try (default: 10)")
+    parser.add_argument("--max-rounds", type=int, default=15, help="Highest cost to try (default: 15)")
+    parser.add_argument("--samples", type=int, default=3, help="Hashes per cost, median is reported (default: 3)")
+    args = parser.parse_args()
+
+    print("USPC Factory - bcrypt Calibration")
+    print("=" * 40)
+    print(f"Target: {args.target_ms:.0f} ms per hash (current BCRYPT_ROUNDS={BCRYPT_ROUNDS})\n")
+
+    timings = {}
+    for rounds in range(args.min_rounds, args.max_rounds + 1):
+        timings[rounds] = measure_hash_time(rounds, args.samples)
+        marker = "✅" if timings[rounds] <= args.target_ms else "⚠️ "
+        print(f"{marker} cost {rounds:2d}: {timings[rounds]:8.1f} ms")
+
+        # Each extra round doubles the cost, no point measuring far past the budget
+        if timings[rounds] > args.target_ms * 2:
+            break
+
+    recommended = recommend_rounds(timings, args.target_ms)
+    per_worker = 1000 / timings[recommended]
+
+    print(f"\n🎯 Recommended: BCRYPT_ROUNDS={recommended}")
+    print(f"   ~{per_worker:.1f} logins/sec per worker, "
+          f"~{per_worker * PASSWORD_HASH_WORKERS:.1f} logins/sec with PASSWORD_HASH_WORKERS={PASSWORD_HASH_WORKERS}")
+    if recommended != BCRYPT_ROUNDS:
+        print("   Existing hashes are rehashed to the new cost on each user's next login.")
+
+
+if __name__ == "__main__":
+    main()
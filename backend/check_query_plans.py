@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Query Plan Check
+Seeds a scratch database and fails if a hot query reads a whole table
+"""
+
+import sys
+import os
+import argparse
+import tempfile
+
+# Add the src directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from sqlalchemy import create_engine, inspect
+
+from src.query_plans import SEEDED_TABLES, analyze, check_query_plans, plan_check_metadata, seed
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="EXPLAIN the hot work order and customer queries")
+    parser.add_argument("--database-url",
+                        help="Empty scratch database to seed (default: a temporary SQLite file)")
+    parser.add_argument("--rows", type=int, default=20000, help="Work orders to seed (default: 20000)")
+    parser.add_argument("--use-existing", action="store_true",
+                        help="Explain against the data already in --database-url instead of seeding")
+    parser.add_argument("--verbose", action="store_true", help="Print every plan, not only failing ones")
+    args = parser.parse_args()
+
+    print("USPC Factory - Query Plan Check")
+    print("=" * 40)
+
+    scratch_dir = None
+    database_url = args.database_url
+    if not database_url:
+        scratch_dir = tempfile.TemporaryDirectory()
+        database_url = f"sqlite:///{os.path.join(scratch_dir.name, 'plans.db')}"
+
+    engine = create_engine(database_url)
+    try:
+        # Everything happens in one transaction that is rolled back, so a scratch database stays empty
+        with engine.connect() as connection, connection.begin() as transaction:
+            if not args.use_existing:
+                existing = set(inspect(connection).get_table_names()) & set(SEEDED_TABLES)
+                if existing:
+                    print(f"❌ Refusing to seed a database that already has {', '.join(sorted(existing))}")
+                    print("   Point --database-url at an empty database, or pass --use-existing")
+                    sys.exit(1)
+                plan_check_metadata().create_all(connection)
+                print(f"🌱 Seeding {args.rows} work orders...")
+                seed(connection, rows=args.rows)
+            analyze(connection)
+            results = check_query_plans(connection)
+            transaction.rollback()
+    finally:
+        engine.dispose()
+        if scratch_dir:
+            scratch_dir.cleanup()
+
+    failures = 0
+    for name, result in results.items():
+        if result["seq_scans"]:
+            failures += 1
+            print(f"❌ {name}: full scan of {', '.join(result['seq_scans'])}")
+        else:
+            print(f"✅ {name}")
+        if result["seq_scans"] or args.verbose:
+            for line in result["plan"]:
+                print(f"     {line}")
+
+    if failures:
+        print(f"\n❌ {failures} of {len(results)} queries read a whole table")
+        sys.exit(1)
+    print(f"\n✅ All {len(results)} queries use an index")
+
+
+if __name__ == "__main__":
+    main()
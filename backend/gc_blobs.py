@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+File Blob Garbage Collection
+Removes stored files no work order references any more
+"""
+
+import sys
+import os
+import argparse
+
+# Add the src directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.database import SessionLocal
+from src.services.blob_store import BLOB_GC_GRACE_SECONDS, adopt_legacy_files, collect_garbage
+
+
+def megabytes(size: int) -> str:
+    return f"{size / (1024 * 1024):.1f} MB"
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Garbage-collect unreferenced work order file blobs")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would be removed")
+    parser.add_argument("--grace-seconds", type=int, default=BLOB_GC_GRACE_SECONDS,
+                        help=f"Leave anything touched more recently alone (default: {BLOB_GC_GRACE_SECONDS})")
+    parser.add_argument("--adopt-legacy", action="store_true",
+                        help="First move files uploaded before the blob store into it, merging duplicates")
+    args = parser.parse_args()
+
+    print("USPC Factory - File Blob GC")
+    print("=" * 40)
+
+    db = SessionLocal()
+    try:
+        if args.adopt_legacy and not args.dry_run:
+            adopted = adopt_legacy_files(db)
+            print(f"📦 Adopted {adopted['files']} legacy file(s), {adopted['deduplicated']} duplicate(s) "
+                  f"({megabytes(adopted['bytes_saved'])} saved), {adopted['missing']} missing on disk")
+
+        report = collect_garbage(db, grace_seconds=args.grace_seconds, dry_run=args.dry_run)
+    except Exception as e:
+        print(f"❌ Garbage collection failed: {e}")
+        db.rollback()
+        sys.exit(1)
+    finally:
+        db.close()
+
+    verb = "Would remove" if args.dry_run else "Removed"
+    print(f"✅ {verb} {report['blobs']} unreferenced blob(s), {report['orphans']} orphaned file(s) "
+          f"and {report['temp_files']} stale temp file(s) - {megabytes(report['bytes'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Add pg_trgm search indexes for customers and work orders
+
+Revision ID: 007
+Revises: 006
+Create Date: 2025-01-15 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+# (index name, table, column) - GIN trigram indexes serve ILIKE '%term%' and the <% operator
+TRIGRAM_INDEXES = [
+    ('ix_customers_company_name_trgm', 'customers', 'company_name'),
+    ('ix_customers_contact_person_trgm', 'customers', 'contact_person'),
+    ('ix_customers_email_trgm', 'customers', 'email'),
+    ('ix_customers_city_trgm', 'customers', 'city'),
+    ('ix_work_orders_work_order_number_trgm', 'work_orders', 'work_order_number'),
+    ('ix_work_orders_product_type_trgm', 'work_orders', 'product_type'),
+]
+
+
+def upgrade() -> None:
+    # Trigram search is PostgreSQL-only; other databases fall back to LIKE scans
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for index_name, table, column in TRIGRAM_INDEXES:
+        op.create_index(
+            index_name, table, [column], unique=False,
+            postgresql_using='gin', postgresql_ops={column: 'gin_trgm_ops'}
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    for index_name, table, _ in reversed(TRIGRAM_INDEXES):
+        op.drop_index(index_name, table_name=table)
@@ -0,0 +1,73 @@
+"""Add composite and partial indexes for the hot work order and customer queries
+
+Revision ID: 010
+Revises: 009
+Create Date: 2025-01-27 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '010'
+down_revision = '009'
+branch_labels = None
+depends_on = None
+
+# (index name, table, columns, partial index predicate or None) - mirrors the models' __table_args__;
+# check_query_plans.py verifies the service queries use them
+HOT_PATH_INDEXES = [
+    ('ix_simple_work_orders_status_created_at', 'simple_work_orders', ['status', 'created_at', 'id'], None),
+    ('ix_simple_work_orders_created_at', 'simple_work_orders', ['created_at'], None),
+    ('ix_simple_work_orders_updated_at', 'simple_work_orders', ['updated_at'], None),
+    ('ix_simple_work_order_updates_order_updated', 'simple_work_order_updates', ['work_order_id', 'updated_at'], None),
+    ('ix_work_orders_active_queue', 'work_orders', ['status', 'priority', 'requested_delivery_date'], 'is_active'),
+    ('ix_work_orders_order_date_id', 'work_orders', ['order_date', 'id'], None),
+    ('ix_work_orders_status_order_date', 'work_orders', ['status', 'order_date', 'id'], None),
+    ('ix_work_orders_customer_order_date', 'work_orders', ['customer_id', 'order_date', 'id'], None),
+    ('ix_work_orders_priority_order_date', 'work_orders', ['priority', 'order_date', 'id'], None),
+    ('ix_customers_status', 'customers', ['status'], None),
+]
+
+# Superseded by ix_simple_work_order_updates_order_updated (same leading column)
+REDUNDANT_INDEXES = [
+    ('ix_simple_work_order_updates_work_order_id', 'simple_work_order_updates', ['work_order_id']),
+]
+
+# Predicates spelled the way each dialect renders the queries' boolean comparisons
+PREDICATES = {
+    'is_active': {'postgresql': 'is_active = true', 'sqlite': 'is_active = 1'},
+}
+
+
+def upgrade() -> None:
+    dialect_name = op.get_bind().dialect.name
+    if dialect_name == "postgresql":
+        # Build without blocking writes to these tables on a live database
+        with op.get_context().autocommit_block():
+            for index_name, table, columns, predicate in HOT_PATH_INDEXES:
+                op.create_index(
+                    index_name, table, columns, unique=False, postgresql_concurrently=True,
+                    postgresql_where=sa.text(PREDICATES[predicate][dialect_name]) if predicate else None
+                )
+            for index_name, table, _ in REDUNDANT_INDEXES:
+                op.drop_index(index_name, table_name=table, postgresql_concurrently=True)
+            for table in sorted({table for _, table, _, _ in HOT_PATH_INDEXES}):
+                op.execute(f"ANALYZE {table}")
+        return
+
+    for index_name, table, columns, predicate in HOT_PATH_INDEXES:
+        op.create_index(
+            index_name, table, columns, unique=False,
+            sqlite_where=sa.text(PREDICATES[predicate]['sqlite']) if predicate else None
+        )
+    for index_name, table, _ in REDUNDANT_INDEXES:
+        op.drop_index(index_name, table_name=table)
+
+
+def downgrade() -> None:
+    for index_name, table, columns in REDUNDANT_INDEXES:
+        op.create_index(index_name, table, columns, unique=False)
+    for index_name, table, _, _ in reversed(HOT_PATH_INDEXES):
+        op.drop_index(index_name, table_name=table)
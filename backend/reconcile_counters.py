@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Work Order Counter Reconciliation
+Rebuilds work_order_counters from work_orders and reports any drift
+"""
+
+import sys
+import os
+import argparse
+
+# Add the src directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.database import SessionLocal
+from src.services.work_order_counters import compute_counters, counter_delta, rebuild_counters, stored_counters
+
+
+def print_drift(drift):
+    for name in sorted(drift):
+        count, amount = drift[name]
+        print(f"   {name:30s} count {count:+d}, amount {amount:+.2f}")
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Rebuild the work order counters table")
+    parser.add_argument("--dry-run", action="store_true", help="Only report drift, do not rewrite the table")
+    args = parser.parse_args()
+
+    print("USPC Factory - Counter Reconciliation")
+    print("=" * 40)
+
+    db = SessionLocal()
+    try:
+        if args.dry_run:
+            drift = counter_delta(stored_counters(db), compute_counters(db))
+        else:
+            drift = rebuild_counters(db)
+    except Exception as e:
+        print(f"❌ Reconciliation failed: {e}")
+        db.rollback()
+        sys.exit(1)
+    finally:
+        db.close()
+
+    if not drift:
+        print("✅ Counters match work_orders")
+        return
+
+    print(f"⚠️  {len(drift)} counter(s) {'differ' if args.dry_run else 'were corrected'} (stored -> actual):")
+    print_drift(drift)
+    if args.dry_run:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,8 @@ from ...models.customer import Customer
 from ...schemas.customer import Customer, CustomerCreate, CustomerUpdate, CustomerListResponse
 from ...database import get_db
 from ...api.v1.auth import get_current_active_user
+from ...services.search import text_search
+from ...services.customer_typeahead import customer_typeahead
 from ...schemas.user import User
 from sqlalchemy import or_, func
 
@@ -44,6 +46,7 @@ def create_customer(
     db.add(db_customer)
     db.commit()
     db.refresh(db_customer)
+    customer_typeahead.upsert(db_customer)
     return db_customer
 
 @router.get("/", response_model=CustomerListResponse)
@@ -55,21 +58,26 @@ def get_customers(
     current_user: User = Depends(get_current_active_user)
 ):
     query = db.query(Customer).filter(Customer.is_archived == False)
+    rank = None
 
     # Add search functionality
     if search:
-        search_filter = f"%{search}%"
-        query = query.filter(
-            or_(
-                Customer.company_name.ilike(search_filter),
-                Customer.contact_person.ilike(search_filter),
-                Customer.email.ilike(search_filter)
-            )
+        search_filter, rank = text_search(
+            db.get_bind().dialect.name,
+            (Customer.company_name, Customer.contact_person, Customer.email),
+            search
         )
+        query = query.filter(search_filter)
 
     # Get total count for pagination
     total = query.count()
 
+    # Best matches first when searching
+    if rank is not None:
+        query = query.order_by(rank.desc(), Customer.id)
+    else:
+        query = query.order_by(Customer.id)  # stable pages
+
     # Apply pagination
     customers = query.offset((page - 1) * limit).limit(limit).all()
 
@@ -81,6 +89,17 @@ def get_customers(
         pages=(total + limit - 1) // limit  # Ceiling division
     )
 
+@router.get("/suggest")
+def suggest_customers(
+    q: str = Query(..., min_length=1, description="What the user has typed so far"),
+    limit: int = Query(10, ge=1, le=50, description="Maximum suggestions"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Customer autocomplete served from the in-memory typeahead index."""
+    customer_typeahead.ensure_built(db)
+    return {"items": customer_typeahead.suggest(q, limit)}
+
 @router.get("/{customer_id}", response_model=Customer)
 def get_customer(
     customer_id: int,
@@ -128,6 +147,7 @@ def update_customer(
 
     db.commit()
     db.refresh(db_customer)
+    customer_typeahead.upsert(db_customer)
     return db_customer
 
 @router.delete("/{customer_id}")
@@ -148,5 +168,6 @@ def delete_customer(
     customer.is_archived = True
     customer.updated_at = datetime.utcnow()
     db.commit()
+    customer_typeahead.remove(customer_id)
 
     return {"message": "Customer deleted successfully"}
\ No newline at end of file
@@ -0,0 +1,50 @@
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import FileResponse, JSONResponse
+import asyncio
+
+from ...profiler import ProfilerBusy, sampling_profiler
+from .simple_auth import require_admin
+
+router = APIRouter()
+
+
+@router.get("")
+async def profiler_status(admin=Depends(require_admin)):
+    """Whether a run is in progress, and the last profile written (admin only)."""
+    return {"success": True, **sampling_profiler.status()}
+
+
+@router.post("/start")
+async def start_profiler(request: Request, admin=Depends(require_admin)):
+    """Sample every thread for the next N seconds or N requests: JSON body with seconds, requests, interval_ms."""
+    try:
+        data = await request.json() if await request.body() else {}
+        if not isinstance(data, dict):
+            raise ValueError("Expected a JSON object")
+        status = sampling_profiler.start(
+            seconds=float(data["seconds"]) if data.get("seconds") is not None else None,
+            requests=int(data["requests"]) if data.get("requests") is not None else None,
+            interval_ms=float(data["interval_ms"]) if data.get("interval_ms") is not None else None
+        )
+        return {"success": True, **status}
+    except ProfilerBusy as e:
+        return JSONResponse(status_code=409, content={"success": False, "error": str(e)})
+    except (TypeError, ValueError) as e:
+        return JSONResponse(status_code=400, content={"success": False, "error": str(e)})
+
+
+@router.post("/stop")
+async def stop_profiler(admin=Depends(require_admin)):
+    """End the current run now and write its collapsed-stack file."""
+    profile = await asyncio.to_thread(sampling_profiler.stop)
+    return {"success": True, "profile": profile}
+
+
+@router.get("/profiles/{name}")
+async def download_profile(name: str, admin=Depends(require_admin)):
+    """A collapsed-stack file, ready for flamegraph.pl or speedscope."""
+    try:
+        path = sampling_profiler.profile_path(name)
+    except ValueError as e:
+        return JSONResponse(status_code=404, content={"success": False, "error": str(e)})
+    return FileResponse(path, media_type="text/plain", filename=name)
@@ -1,18 +1,64 @@
 from fastapi import APIRouter, HTTPException, status, Request, Response, Depends
 from fastapi.responses import HTMLResponse, RedirectResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+from typing import Optional
 from jose import jwt
+import os
+import time
 
+from ...cache import TTLCache
 from ...models.simple_user import SimpleUser
-from ...security import verify_password, create_access_token, verify_token, get_password_hash
-from ...database import get_db
+from ...security import (
+    verify_password, create_access_token, verify_token, get_password_hash,
+    verify_password_async, get_password_hash_async, needs_rehash, PasswordHashBusy
+)
+from ...database import get_db, get_async_db
 
 router = APIRouter()
 
 # Simple JWT for the system
 SECRET_KEY = "simple-uspc-secret-key-change-in-production"
 
+# Authenticated users are cached per token so polling requests skip the DB
+USER_CACHE_TTL = float(os.getenv("AUTH_USER_CACHE_TTL", "30"))
+USER_CACHE_SIZE = int(os.getenv("AUTH_USER_CACHE_SIZE", "1024"))
+
+
+@dataclass(frozen=True)
+class AuthenticatedUser:
+    """Read-only snapshot of a SimpleUser, safe to share between requests."""
+    id: int
+    username: str
+    email: str
+    full_name: str
+    role: str
+    is_active: bool
+    is_admin: bool
+
+    @classmethod
+    def from_user(cls, user: SimpleUser) -> "AuthenticatedUser":
+        return cls(
+            id=user.id,
+            username=user.username,
+            email=user.email,
+            full_name=user.full_name,
+            role=user.role,
+            is_active=user.is_active,
+            is_admin=user.is_admin
+        )
+
+
+_user_cache = TTLCache(maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL)
+
+
+def invalidate_cached_user(username: str):
+    """Forget cached sessions for a user after their account changes."""
+    _user_cache.delete_where(lambda token, user: user.username == username)
+
 def create_simple_token(username: str):
     """Create a simple JWT token."""
     payload = {
@@ -21,20 +67,25 @@ def create_simple_token(username: str):
     }
     return jwt.encode(payload, SECRET_KEY, algorithm="HS256")
 
-def verify_simple_token(token: str) -> str:
-    """Verify a simple JWT token."""
+def decode_simple_token(token: str) -> Optional[dict]:
+    """Decode a simple JWT token, returning its payload if valid."""
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
-        username = payload.get("username")  # Changed from "sub" to match create_simple_token
-        if username is None:
+        if payload.get("username") is None:  # Changed from "sub" to match create_simple_token
             return None
-        return username
+        return payload
     except Exception as e:  # Changed from jwt.PyJWTError to generic Exception
         import logging
         logging.error(f"Token verification failed: {str(e)}")
         return None
 
 
+def verify_simple_token(token: str) -> str:
+    """Verify a simple JWT token."""
+    payload = decode_simple_token(token)
+    return payload["username"] if payload else None
+
+
 @router.get("/login", response_class=HTMLResponse)
 def login_page():
     """Simple login page."""
@@ -120,7 +171,7 @@ def login_page():
 
 
 @router.post("/login")
-async def login_user(request: Request, db: Session = Depends(get_db)):
+async def login_user(request: Request, db: AsyncSession = Depends(get_async_db)):
     """Simple login endpoint."""
     import logging
     logger = logging.getLogger(__name__)
@@ -134,7 +185,7 @@ async def login_user(request: Request, db: Session = Depends(get_db)):
 
         # Find user
         try:
-            user = db.query(SimpleUser).filter(SimpleUser.username == username).first()
+            user = (await db.scalars(select(SimpleUser).where(SimpleUser.username == username))).first()
             logger.info(f"User query completed, found: {user is not None}")
         except Exception as e:
             logger.error(f"Database query error: {str(e)}")
@@ -149,8 +200,11 @@ async def login_user(request: Request, db: Session = Depends(get_db)):
         # Verify password
         try:
             logger.info(f"Verifying password for user: {username}")
-            password_valid = verify_password(password, user.hashed_password)
+            password_valid = await verify_password_async(password, user.hashed_password)
             logger.info(f"Password verification result: {password_valid}")
+        except PasswordHashBusy:
+            logger.warning(f"Password hashing pool saturated, rejecting login for: {username}")
+            return {"success": False, "error": "Server is busy, please try again in a moment"}
         except Exception as e:
             logger.error(f"Password verification error: {str(e)}")
             import traceback
@@ -166,10 +220,18 @@ async def login_user(request: Request, db: Session = Depends(get_db)):
             logger.warning(f"Inactive user attempted login: {username}")
             return {"success": False, "error": "Account is disabled"}
 
+        # Bring the stored hash up (or down) to the configured bcrypt cost
+        if needs_rehash(user.hashed_password):
+            try:
+                user.hashed_password = await get_password_hash_async(password)
+                logger.info(f"Rehashed password for user: {username}")
+            except PasswordHashBusy:
+                logger.warning(f"Password hashing pool saturated, deferring rehash for: {username}")
+
         # Update last login
         try:
             user.last_login = datetime.utcnow()
-            db.commit()
+            await db.commit()
             logger.info(f"Updated last login for user: {username}")
         except Exception as e:
             logger.error(f"Error updating last login: {str(e)}")
@@ -212,35 +274,73 @@ def logout_user():
     return {"success": True, "message": "Logged out successfully"}
 
 
-def get_current_user_from_request(request: Request, db: Session = Depends(get_db)):
-    """Helper to get current user from request."""
-    # Get token from Authorization header or cookie
-    token = None
+def get_token_from_request(request: Request) -> Optional[str]:
+    """Get token from Authorization header, query string or cookie."""
     if "Authorization" in request.headers:
         auth_header = request.headers["Authorization"]
         if auth_header.startswith("Bearer "):
-            token = auth_header[7:]
-    elif "token" in request.query:
-        token = request.query["token"]
+            return auth_header[7:]
+    elif "token" in request.query_params:
+        return request.query_params["token"]
     elif "auth_token" in request.cookies:
-        token = request.cookies["auth_token"]
+        return request.cookies["auth_token"]
+    return None
+
+
+def _remember_user(token: str, payload: dict, user: Optional[SimpleUser]) -> Optional[AuthenticatedUser]:
+    """Snapshot an active user and cache it for the token."""
+    if not user or not user.is_active:
+        return None
+
+    # Never cache past the token's own expiry
+    snapshot = AuthenticatedUser.from_user(user)
+    seconds_left = payload["exp"] - time.time() if "exp" in payload else USER_CACHE_TTL
+    _user_cache.set(token, snapshot, ttl=min(USER_CACHE_TTL, seconds_left))
+    return snapshot
 
+
+def get_current_user_from_request(request: Request, db: Session = Depends(get_db)) -> Optional[AuthenticatedUser]:
+    """Helper to get current user from request."""
+    token = get_token_from_request(request)
     if not token:
         return None
 
+    # Cached snapshot - no token decode, no DB round trip
+    cached_user = _user_cache.get(token)
+    if cached_user is not None:
+        return cached_user
+
     # Verify token
-    username = verify_simple_token(token)
-    if not username:
+    payload = decode_simple_token(token)
+    if not payload:
         return None
 
     # Get user from database
-    user = db.query(SimpleUser).filter(SimpleUser.username == username).first()
-    return user
+    user = db.query(SimpleUser).filter(SimpleUser.username == payload["username"]).first()
+    return _remember_user(token, payload, user)
+
+
+async def get_current_user_from_request_async(request: Request, db: AsyncSession = Depends(get_async_db)) -> Optional[AuthenticatedUser]:
+    """Async version of get_current_user_from_request for the async routers."""
+    token = get_token_from_request(request)
+    if not token:
+        return None
+
+    cached_user = _user_cache.get(token)
+    if cached_user is not None:
+        return cached_user
+
+    payload = decode_simple_token(token)
+    if not payload:
+        return None
+
+    user = (await db.scalars(select(SimpleUser).where(SimpleUser.username == payload["username"]))).first()
+    return _remember_user(token, payload, user)
 
 
-def require_auth_or_redirect(request: Request, db: Session = Depends(get_db)):
+async def require_auth_or_redirect(request: Request, db: AsyncSession = Depends(get_async_db)):
     """Check authentication or return redirect to login."""
-    user = get_current_user_from_request(request, db)
+    user = await get_current_user_from_request_async(request, db)
 
     if not user:
         return None, RedirectResponse(url="/api/v1/simple-auth/login")
@@ -249,15 +349,15 @@ def require_auth_or_redirect(request: Request, db: Session = Depends(get_db)):
 
 
 # Simple dependency that can be used in other routes
-def get_current_user_optional(request: Request, db: Session = Depends(get_db)):
+async def get_current_user_optional(request: Request, db: AsyncSession = Depends(get_async_db)):
     """Get current user (optional - returns None if not authenticated)."""
-    return get_current_user_from_request(request, db)
+    return await get_current_user_from_request_async(request, db)
 
 
 # Admin-only endpoints
-def require_admin(request: Request, db: Session = Depends(get_db)):
+async def require_admin(request: Request, db: AsyncSession = Depends(get_async_db)):
     """Require admin authentication."""
-    user = get_current_user_from_request(request, db)
+    user = await get_current_user_from_request_async(request, db)
     if not user or not user.is_admin:
         from fastapi import HTTPException
         raise HTTPException(status_code=403, detail="Admin access required")
@@ -265,13 +365,13 @@ def require_admin(request: Request, db: Session = Depends(get_db)):
 
 
 @router.post("/admin/create-user")
-def create_user(request: Request, db: Session = Depends(get_db)):
+async def create_user(request: Request, db: AsyncSession = Depends(get_async_db)):
     """Create a new user (admin only)."""
     try:
         # Verify admin access
-        admin = require_admin(request, db)
+        admin = await require_admin(request, db)
 
-        data = request.json()
+        data = await request.json()
         username = data.get("username")
         password = data.get("password")
         email = data.get("email")
@@ -284,12 +384,12 @@ def create_user(request: Request, db: Session = Depends(get_db)):
             return {"success": False, "error": "Missing required fields"}
 
         # Check if username already exists
-        existing_user = db.query(SimpleUser).filter(SimpleUser.username == username).first()
+        existing_user = (await db.scalars(select(SimpleUser).where(SimpleUser.username == username))).first()
         if existing_user:
             return {"success": False, "error": "Username already exists"}
 
         # Check if email already exists
-        existing_email = db.query(SimpleUser).filter(SimpleUser.email == email).first()
+        existing_email = (await db.scalars(select(SimpleUser).where(SimpleUser.email == email))).first()
         if existing_email:
             return {"success": False, "error": "Email already exists"}
 
@@ -298,7 +398,7 @@ def create_user(request: Request, db: Session = Depends(get_db)):
             username=username,
             email=email,
             full_name=full_name,
-            hashed_password=get_password_hash(password),
+            hashed_password=await get_password_hash_async(password),
             role=role,
             is_admin=is_admin,
             is_active=True,
@@ -306,8 +406,9 @@ def create_user(request: Request, db: Session = Depends(get_db)):
         )
 
         db.add(new_user)
-        db.commit()
-        db.refresh(new_user)
+        await db.commit()
+        await db.refresh(new_user)
+        invalidate_cached_user(new_user.username)
 
         return {
             "success": True,
@@ -330,13 +431,13 @@ def create_user(request: Request, db: Session = Depends(get_db)):
 
 
 @router.get("/admin/users")
-def list_users(request: Request, db: Session = Depends(get_db)):
+async def list_users(request: Request, db: AsyncSession = Depends(get_async_db)):
     """List all users (admin only)."""
     try:
         # Verify admin access
-        admin = require_admin(request, db)
+        admin = await require_admin(request, db)
 
-        users = db.query(SimpleUser).order_by(SimpleUser.created_at.desc()).all()
+        users = (await db.scalars(select(SimpleUser).order_by(SimpleUser.created_at.desc()))).all()
 
         user_list = []
         for user in users:
@@ -361,13 +462,13 @@ def list_users(request: Request, db: Session = Depends(get_db)):
 
 
 @router.post("/admin/toggle-user/{user_id}")
-def toggle_user_status(user_id: int, request: Request, db: Session = Depends(get_db)):
+async def toggle_user_status(user_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
     """Toggle user active status (admin only)."""
     try:
         # Verify admin access
-        admin = require_admin(request, db)
+        admin = await require_admin(request, db)
 
-        user = db.query(SimpleUser).filter(SimpleUser.id == user_id).first()
+        user = await db.get(SimpleUser, user_id)
         if not user:
             return {"success": False, "error": "User not found"}
 
@@ -376,7 +477,8 @@ def toggle_user_status(user_id: int, request: Request, db: Session = Depends(get
             return {"success": False, "error": "Cannot deactivate your own account"}
 
         user.is_active = not user.is_active
-        db.commit()
+        await db.commit()
+        invalidate_cached_user(user.username)
 
         status = "activated" if user.is_active else "deactivated"
         return {
@@ -392,24 +494,25 @@ def toggle_user_status(user_id: int, request: Request, db: Session = Depends(get
 
 
 @router.post("/admin/reset-password/{user_id}")
-def reset_user_password(user_id: int, request: Request, db: Session = Depends(get_db)):
+async def reset_user_password(user_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
     """Reset user password (admin only)."""
     try:
         # Verify admin access
-        admin = require_admin(request, db)
+        admin = await require_admin(request, db)
 
-        data = request.json()
+        data = await request.json()
         new_password = data.get("password")
 
         if not new_password or len(new_password) < 6:
             return {"success": False, "error": "Password must be at least 6 characters long"}
 
-        user = db.query(SimpleUser).filter(SimpleUser.id == user_id).first()
+        user = await db.get(SimpleUser, user_id)
         if not user:
             return {"success": False, "error": "User not found"}
 
-        user.hashed_password = get_password_hash(new_password)
-        db.commit()
+        user.hashed_password = await get_password_hash_async(new_password)
+        await db.commit()
+        invalidate_cached_user(user.username)
 
         return {
             "success": True,
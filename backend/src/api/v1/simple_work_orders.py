@@ -1,27 +1,38 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Request, Depends
-from fastapi.responses import HTMLResponse, RedirectResponse
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Request, Response, Depends, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
+from email.utils import format_datetime
+import asyncio
+import hashlib
 import os
-import shutil
-from datetime import datetime
-
-from ...services.simple_work_order_service import SimpleWorkOrderService
-from ...api.v1.simple_auth import get_current_user_from_request
-from ...database import get_db
+from datetime import datetime, timezone
+
+from ...services.async_simple_work_order_service import AsyncSimpleWorkOrderService
+from ...services.work_order_events import event_hub, format_sse, HEARTBEAT_SECONDS
+from ...services.file_uploads import UPLOAD_DIR, UploadTooLarge, remove_quietly, chunked_uploads
+from ...services.blob_store import blob_store, is_sha256
+from ...services.file_downloads import etag_matches, file_download_response
+from ...services.file_previews import preview_path, preview_worker
+from ...api.v1.simple_auth import get_current_user_from_request_async
+from ...database import get_async_db
+from ...metrics import dashboard_responses
 
 router = APIRouter()
 
 # Create upload directory if it doesn't exist
-UPLOAD_DIR = "uploads"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+ADMIN_PANEL_BUTTON = "<button id='admin-panel-btn' onclick='toggleAdminPanel()' style='position: fixed; top: 80px; right: 20px; background: #28a745; color: white; padding: 10px; border-radius: 5px; cursor: pointer; z-index: 1000;'>👤 Admin Panel</button>"
+ADMIN_PANEL_OPEN = "<div id='admin-panel' style='position: fixed; top: 120px; right: 20px; background: white; border: 1px solid #ddd; border-radius: 5px; padding: 15px; box-shadow: 0 2px 4px rgba(0,0,0,0.1); z-index: 1000; width: 300px; display: none;'>"
+
 
 @router.get("/", response_class=HTMLResponse)
-def dashboard_page(request: Request, db: Session = Depends(get_db)):
+async def dashboard_page(request: Request, db: AsyncSession = Depends(get_async_db)):
     """Dashboard HTML page with authentication check."""
     # Check if user is logged in
-    user = get_current_user_from_request(request, db)
+    user = await get_current_user_from_request_async(request, db)
     if not user:
         # Redirect to login page
         return RedirectResponse(url="/api/v1/simple-auth/login")
@@ -78,183 +89,188 @@ def dashboard_page(request: Request, db: Session = Depends(get_db)):
         </div>
 
         <script>
-            // Load dashboard data
-            fetch('/api/v1/simple-work-orders/dashboard')
+            // Load dashboard data (cheap 304 when nothing changed)
+            function loadDashboard() {{
+            fetch('/api/v1/simple-work-orders/dashboard?view=card')
                 .then(response => response.json())
-                .then(data => {
+                .then(data => {{
                     let html = '';
 
                     // New Orders
                     html += '<div class="status-section">';
                     html += '<h2>📝 New Orders</h2>';
-                    if (data.new_orders.length === 0) {
+                    if (data.new_orders.length === 0) {{
                         html += '<p>No new orders</p>';
-                    } else {
-                        data.new_orders.forEach(order => {
+                    }} else {{
+                        data.new_orders.forEach(order => {{
                             html += `<div class="order-card">
-                                <h4>${{order.customer_name} - ${{order.quantity} units</h4>
-                                <p>${{order.order_description}</p>
-                                <button class="btn" onclick="startDesign(${{order.id})">🎨 Start Design</button>
-                                <button class="btn" onclick="viewDetails(${{order.id})">📋 Details</button>
+                                <h4>${{order.customer_name}} - ${{order.quantity}} units</h4>
+                                <p>${{order.order_description}}</p>
+                                <button class="btn" onclick="startDesign(${{order.id}})">🎨 Start Design</button>
+                                <button class="btn" onclick="viewDetails(${{order.id}})">📋 Details</button>
                             </div>`;
-                        });
-                    }
+                        }});
+                    }}
                     html += '</div>';
 
                     // Design Stage
                     html += '<div class="status-section">';
                     html += '<h2>🎨 Design Stage</h2>';
-                    if (data.design.length === 0) {
+                    if (data.design.length === 0) {{
                         html += '<p>No orders in design</p>';
-                    } else {
-                        data.design.forEach(order => {
+                    }} else {{
+                        data.design.forEach(order => {{
                             html += `<div class="order-card design">
-                                <h4>${{order.customer_name} - ${{order.quantity} units</h4>
-                                ${{order.assigned_to ? `<p class="assigned">Assigned to: ${{order.assigned_to}</p>` : '<button class="btn" onclick="claimDesign(' + order.id + ')">Claim Design</button>'}
-                                <button class="btn" onclick="designComplete(${{order.id})">✅ Design Complete</button>
-                                <button class="btn" onclick="uploadFile(${{order.id})">📁 Upload Files</button>
+                                <h4>${{order.customer_name}} - ${{order.quantity}} units</h4>
+                                ${{order.assigned_to ? `<p class="assigned">Assigned to: ${{order.assigned_to}}</p>` : '<button class="btn" onclick="claimDesign(' + order.id + ')">Claim Design</button>'}}
+                                <button class="btn" onclick="designComplete(${{order.id}})">✅ Design Complete</button>
+                                <button class="btn" onclick="uploadFile(${{order.id}})">📁 Upload Files</button>
                             </div>`;
-                        });
-                    }
+                        }});
+                    }}
                     html += '</div>';
 
                     // Approval Stage
                     html += '<div class="status-section">';
                     html += '<h2>👤 Customer Approval</h2>';
-                    if (data.approval.length === 0) {
+                    if (data.approval.length === 0) {{
                         html += '<p>No orders awaiting approval</p>';
-                    } else {
-                        data.approval.forEach(order => {
+                    }} else {{
+                        data.approval.forEach(order => {{
                             html += `<div class="order-card approval">
-                                <h4>${{order.customer_name} - ${{order.quantity} units</h4>
-                                <button class="btn" onclick="approved(${{order.id})">✅ Approved</button>
-                                <button class="btn" onclick="viewFiles(${{order.id})">📄 View Files</button>
+                                <h4>${{order.customer_name}} - ${{order.quantity}} units</h4>
+                                <button class="btn" onclick="approved(${{order.id}})">✅ Approved</button>
+                                <button class="btn" onclick="viewFiles(${{order.id}})">📄 View Files</button>
                             </div>`;
-                        });
-                    }
+                        }});
+                    }}
                     html += '</div>';
 
                     // Print Stage
                     html += '<div class="status-section">';
                     html += '<h2>🖨️ Printing</h2>';
-                    if (data.print.length === 0) {
+                    if (data.print.length === 0) {{
                         html += '<p>No orders in printing</p>';
-                    } else {
-                        data.print.forEach(order => {
+                    }} else {{
+                        data.print.forEach(order => {{
                             html += `<div class="order-card print">
-                                <h4>${{order.customer_name} - ${{order.quantity} units</h4>
-                                ${{order.assigned_to ? `<p class="assigned">Assigned to: ${{order.assigned_to}</p>` : '<button class="btn" onclick="claimPrint(' + order.id + ')">Claim Print Job</button>'}
-                                <button class="btn" onclick="printComplete(${{order.id})">✅ Printing Complete</button>
+                                <h4>${{order.customer_name}} - ${{order.quantity}} units</h4>
+                                ${{order.assigned_to ? `<p class="assigned">Assigned to: ${{order.assigned_to}}</p>` : '<button class="btn" onclick="claimPrint(' + order.id + ')">Claim Print Job</button>'}}
+                                <button class="btn" onclick="printComplete(${{order.id}})">✅ Printing Complete</button>
                             </div>`;
-                        });
-                    }
+                        }});
+                    }}
                     html += '</div>';
 
                     // Production Stage
                     html += '<div class="status-section">';
                     html += '<h2>🏭 Production</h2>';
-                    if (data.production.length === 0) {
+                    if (data.production.length === 0) {{
                         html += '<p>No orders in production</p>';
-                    } else {
-                        data.production.forEach(order => {
+                    }} else {{
+                        data.production.forEach(order => {{
                             html += `<div class="order-card production">
-                                <h4>${{order.customer_name} - ${{order.quantity} units</h4>
-                                <button class="btn" onclick="productionComplete(${{order.id})">✅ Production Complete</button>
+                                <h4>${{order.customer_name}} - ${{order.quantity}} units</h4>
+                                <button class="btn" onclick="productionComplete(${{order.id}})">✅ Production Complete</button>
                             </div>`;
-                        });
-                    }
+                        }});
+                    }}
                     html += '</div>';
 
                     // Shipping
                     html += '<div class="status-section">';
                     html += '<h2>📦 Shipping</h2>';
-                    if (data.shipping.length === 0) {
+                    if (data.shipping.length === 0) {{
                         html += '<p>No orders ready for shipping</p>';
-                    } else {
-                        data.shipping.forEach(order => {
+                    }} else {{
+                        data.shipping.forEach(order => {{
                             html += `<div class="order-card shipping">
-                                <h4>${{order.customer_name} - ${{order.quantity} units</h4>
-                                <button class="btn" onclick="shipped(${{order.id})">✅ Mark as Shipped</button>
+                                <h4>${{order.customer_name}} - ${{order.quantity}} units</h4>
+                                <button class="btn" onclick="shipped(${{order.id}})">✅ Mark as Shipped</button>
                             </div>`;
-                        });
-                    }
+                        }});
+                    }}
                     html += '</div>';
 
                     document.getElementById('dashboard-content').innerHTML = html;
-                });
+                }});
+            }}
+
+            loadDashboard();
+
+            // Refresh when the server pushes a work order change
+            let refreshTimer = null;
+            const workOrderEvents = new EventSource('/api/v1/simple-work-orders/events');
+            workOrderEvents.onmessage = () => {{
+                clearTimeout(refreshTimer);
+                refreshTimer = setTimeout(loadDashboard, 250);
+            }};
 
             // Simple API call functions
-            function startDesign(orderId) {
-                fetch(`/api/v1/simple-work-orders/${orderId}}/status`, {
+            function startDesign(orderId) {{
+                fetch(`/api/v1/simple-work-orders/${{orderId}}/status`, {{
                     method: 'PATCH',
-                    headers: {'Content-Type': 'application/json'},
-                    body: JSON.stringify({status: 'design', notes: 'Started design work'})
-                });
-                location.reload();
-            }
+                    headers: {{'Content-Type': 'application/json'}},
+                    body: JSON.stringify({{status: 'design', notes: 'Started design work'}})
+                }}).then(loadDashboard);
+            }}
 
-            function claimDesign(orderId) {
+            function claimDesign(orderId) {{
                 const personName = prompt('Enter your name:');
-                if (personName) {
-                    fetch(`/api/v1/simple-work-orders/${orderId}}/claim`, {
+                if (personName) {{
+                    fetch(`/api/v1/simple-work-orders/${{orderId}}/claim`, {{
                         method: 'POST',
-                        headers: {'Content-Type': 'application/json'},
-                        body: JSON.stringify({person_name: personName})
-                    });
-                    location.reload();
-                }
-            }
-
-            function designComplete(orderId) {
-                fetch(`/api/v1/simple-work-orders/${orderId}}/status`, {
+                        headers: {{'Content-Type': 'application/json'}},
+                        body: JSON.stringify({{person_name: personName}})
+                    }}).then(loadDashboard);
+                }}
+            }}
+
+            function designComplete(orderId) {{
+                fetch(`/api/v1/simple-work-orders/${{orderId}}/status`, {{
                     method: 'PATCH',
-                    headers: {'Content-Type': 'application/json'},
-                    body: JSON.stringify({status: 'approval', notes: 'Design ready for customer approval'})
-                });
-                location.reload();
-            }
-
-            function approved(orderId) {
-                fetch(`/api/v1/simple-work-orders/${orderId}}/status`, {
+                    headers: {{'Content-Type': 'application/json'}},
+                    body: JSON.stringify({{status: 'approval', notes: 'Design ready for customer approval'}})
+                }}).then(loadDashboard);
+            }}
+
+            function approved(orderId) {{
+                fetch(`/api/v1/simple-work-orders/${{orderId}}/status`, {{
                     method: 'PATCH',
-                    headers: {'Content-Type': 'application/json'},
-                    body: JSON.stringify({status: 'print', notes: 'Customer approved - ready for printing'})
-                });
-                location.reload();
-            }
-
-            function printComplete(orderId) {
-                fetch(`/api/v1/simple-work-orders/${orderId}}/status`, {
+                    headers: {{'Content-Type': 'application/json'}},
+                    body: JSON.stringify({{status: 'print', notes: 'Customer approved - ready for printing'}})
+                }}).then(loadDashboard);
+            }}
+
+            function printComplete(orderId) {{
+                fetch(`/api/v1/simple-work-orders/${{orderId}}/status`, {{
                     method: 'PATCH',
-                    headers: {'Content-Type': 'application/json'},
-                    body: JSON.stringify({status: 'production', notes: 'Printing complete - ready for cup production'})
-                });
-                location.reload();
-            }
-
-            function productionComplete(orderId) {
-                fetch(`/api/v1/simple-work-orders/${orderId}}/status`, {
+                    headers: {{'Content-Type': 'application/json'}},
+                    body: JSON.stringify({{status: 'production', notes: 'Printing complete - ready for cup production'}})
+                }}).then(loadDashboard);
+            }}
+
+            function productionComplete(orderId) {{
+                fetch(`/api/v1/simple-work-orders/${{orderId}}/status`, {{
                     method: 'PATCH',
-                    headers: {'Content-Type': 'application/json'},
-                    body: JSON.stringify({status: 'shipping', notes: 'Cups produced - ready for shipping'})
-                });
-                location.reload();
-            }
-
-            function shipped(orderId) {
-                fetch(`/api/v1/simple-work-orders/${orderId}}/status`, {
+                    headers: {{'Content-Type': 'application/json'}},
+                    body: JSON.stringify({{status: 'shipping', notes: 'Cups produced - ready for shipping'}})
+                }}).then(loadDashboard);
+            }}
+
+            function shipped(orderId) {{
+                fetch(`/api/v1/simple-work-orders/${{orderId}}/status`, {{
                     method: 'PATCH',
-                    headers: {'Content-Type': 'application/json'},
-                    body: JSON.stringify({status: 'completed', notes: 'Order shipped to customer'})
-                });
-                location.reload();
-            }
+                    headers: {{'Content-Type': 'application/json'}},
+                    body: JSON.stringify({{status: 'completed', notes: 'Order shipped to customer'}})
+                }}).then(loadDashboard);
+            }}
         </script>
 
-        // Admin Panel functionality (only for admin users)
-        {"<button id='admin-panel-btn' onclick='toggleAdminPanel()' style='position: fixed; top: 80px; right: 20px; background: #28a745; color: white; padding: 10px; border-radius: 5px; cursor: pointer; z-index: 1000;'>👤 Admin Panel</button>" if user.is_admin else ""}
+        <!-- Admin Panel functionality (only for admin users) -->
+        {admin_button}
 
-        {"<div id='admin-panel' style='position: fixed; top: 120px; right: 20px; background: white; border: 1px solid #ddd; border-radius: 5px; padding: 15px; box-shadow: 0 2px 4px rgba(0,0,0,0.1); z-index: 1000; width: 300px; display: none;'>" if user.is_admin else ""}
+        {admin_panel}
             <h3>👤 Admin Panel</h3>
             <button class="btn" onclick="showCreateUserForm()">➕ Create User</button>
             <button class="btn" onclick="showUserList()">📋 Manage Users</button>
@@ -301,124 +317,184 @@ def dashboard_page(request: Request, db: Session = Depends(get_db)):
             // Existing functions...
 
             // Admin Panel functions
-            function toggleAdminPanel() {
+            function toggleAdminPanel() {{
                 const panel = document.getElementById('admin-panel');
-                if (panel.style.display === 'none') {
+                if (panel.style.display === 'none') {{
                     panel.style.display = 'block';
-                } else {
+                }} else {{
                     panel.style.display = 'none';
-                }
-            }
+                }}
+            }}
 
-            function showCreateUserForm() {
+            function showCreateUserForm() {{
                 document.getElementById('create-user-form').style.display = 'block';
                 document.getElementById('user-list').style.display = 'none';
-            }
+            }}
 
-            function showUserList() {
+            function showUserList() {{
                 document.getElementById('user-list').style.display = 'block';
                 document.getElementById('create-user-form').style.display = 'none';
                 loadUsers();
-            }
+            }}
 
-            function hideCreateUserForm() {
+            function hideCreateUserForm() {{
                 document.getElementById('create-user-form').style.display = 'none';
-            }
+            }}
 
-            function loadUsers() {
+            function loadUsers() {{
                 fetch('/api/v1/simple-auth/users')
                     .then(response => response.json())
-                    .then(data => {
-                        if (data.success) {
+                    .then(data => {{
+                        if (data.success) {{
                             let html = '<h5>All Users:</h5>';
-                            data.users.forEach(user => {
+                            data.users.forEach(user => {{
                                 html += `
                                     <div style="background: #f8f9f9; padding: 10px; margin-bottom: 5px; border-radius: 3px;">
-                                    <strong>${{user_full_name}</strong> (${{user_role})
-                                    <br><small>${{user.email}</small>
-                                    <button class="btn btn-danger btn-sm" onclick="deactivateUser(${{user.id})">Deactivate</button>
+                                    <strong>${{user.full_name}}</strong> (${{user.role}})
+                                    <br><small>${{user.email}}</small>
+                                    <button class="btn btn-danger btn-sm" onclick="deactivateUser(${{user.id}})">Deactivate</button>
                                 </div>`;
-                            });
+                            }});
                             document.getElementById('users-content').innerHTML = html;
-                        } else {
+                        }} else {{
                             document.getElementById('users-content').innerHTML = 'Error loading users';
-                        }
-                    });
-            }
+                        }}
+                    }});
+            }}
 
-            function createUser(formData) {
-                fetch('/api/v1/simple-auth/create-user', {
+            function createUser(formData) {{
+                fetch('/api/v1/simple-auth/create-user', {{
                     method: 'POST',
-                    headers: {'Content-Type': 'application/json'},
+                    headers: {{'Content-Type': 'application/json'}},
                     body: JSON.stringify(formData)
-                })
+                }})
                 .then(response => response.json())
-                .then(data => {
-                    if (data.success) {
+                .then(data => {{
+                    if (data.success) {{
                         alert('User created successfully!');
                         hideCreateUserForm();
                         loadUsers();
-                    } else {
+                    }} else {{
                         alert('Error: ' + data.error);
-                    }
-                });
-            }
+                    }}
+                }});
+            }}
 
-            function deactivateUser(userId) {
-                if (confirm('Are you sure you want to deactivate this user?')) {
-                    fetch(`/api/v1/simple-auth/deactivate-user/${userId}`, {
+            function deactivateUser(userId) {{
+                if (confirm('Are you sure you want to deactivate this user?')) {{
+                    fetch(`/api/v1/simple-auth/deactivate-user/${{userId}}`, {{
                         method: 'POST'
-                    })
+                    }})
                     .then(response => response.json())
-                    .then(data => {
-                        if (data.success) {
+                    .then(data => {{
+                        if (data.success) {{
                             alert('User deactivated successfully!');
                             loadUsers();
-                        } else {
+                        }} else {{
                             alert('Error: ' + data.error);
-                        }
-                    });
-                }
-            }
+                        }}
+                    }});
+                }}
+            }}
 
             // Handle create user form submission
-            document.getElementById('createUserForm').addEventListener('submit', (e) => {
+            document.getElementById('createUserForm').addEventListener('submit', (e) => {{
                 e.preventDefault();
-                const formData = {
+                const formData = {{
                     fullName: document.getElementById('fullName').value,
                     username: document.getElementById('username').value,
                     email: document.getElementById('email').value,
                     password: document.getElementById('password').value,
                     role: document.getElementById('role').value
-                };
+                }};
                 createUser(formData);
-            });
+            }});
         </script>
     </body>
     </html>
-    """.format(user_full_name=user.full_name, user_role=user.role)
+    """.format(
+        user_full_name=user.full_name,
+        user_role=user.role,
+        admin_button=ADMIN_PANEL_BUTTON if user.is_admin else "",
+        admin_panel=ADMIN_PANEL_OPEN if user.is_admin else "<div id='admin-panel' style='display: none;'>"
+    )
+
+
+def dashboard_etag(count: int, last_updated: Optional[datetime], view: str, limit: Optional[int]) -> str:
+    """Build the dashboard ETag from the change token and the requested representation."""
+    token = f"{count}:{last_updated.isoformat() if last_updated else ''}:{view}:{limit}"
+    return '"' + hashlib.sha1(token.encode("utf-8")).hexdigest()[:20] + '"'
 
 
 @router.get("/dashboard")
-def get_dashboard_data(db: Session = Depends(get_db)):
-    """Get dashboard data organized by status."""
-    service = SimpleWorkOrderService(db)
-    return service.get_dashboard_data()
+async def get_dashboard_data(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=0, description="Max orders per stage (0 = no cap)"),
+    view: str = Query("full", pattern="^(full|card)$", description="full orders or lightweight cards"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get dashboard data organized by status (supports If-None-Match)."""
+    service = AsyncSimpleWorkOrderService(db)
+
+    # One tiny aggregate query decides whether anything changed
+    count, last_updated = await service.get_dashboard_version()
+    headers = {
+        "ETag": dashboard_etag(count, last_updated, view, limit),
+        "Cache-Control": "no-cache"
+    }
+    if last_updated:
+        headers["Last-Modified"] = format_datetime(last_updated.replace(tzinfo=timezone.utc), usegmt=True)
+
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        dashboard_responses.inc("not_modified")
+        return Response(status_code=304, headers=headers)
+
+    dashboard_responses.inc("full")
+    if view == "card":
+        # Card rows are already plain JSON types - skip the encoder walk
+        return JSONResponse(content=await service.get_dashboard_cards(per_stage_limit=limit), headers=headers)
+    return JSONResponse(content=jsonable_encoder(await service.get_dashboard_data(per_stage_limit=limit)), headers=headers)
+
+
+@router.get("/events")
+async def work_order_events(request: Request):
+    """Server-sent events stream of work order changes for live dashboards."""
+    queue = event_hub.subscribe()
+
+    async def event_stream():
+        try:
+            yield "retry: 5000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    # Keep proxies from closing an idle connection
+                    yield ": keep-alive\n\n"
+                    continue
+                yield format_sse(event)
+        finally:
+            event_hub.unsubscribe(queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 @router.post("/create")
-def create_work_order(
+async def create_work_order(
     customer_name: str = Form(...),
     customer_email: str = Form(...),
     order_description: str = Form(...),
     quantity: int = Form(...),
     special_notes: str = Form(""),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new work order - super simple form."""
-    service = SimpleWorkOrderService(db)
+    service = AsyncSimpleWorkOrderService(db)
     try:
-        work_order = service.create_work_order(
+        work_order = await service.create_work_order(
             customer_name=customer_name,
             customer_email=customer_email,
             order_description=order_description,
@@ -431,16 +507,16 @@ def create_work_order(
 
 
 @router.patch("/{order_id}/status")
-def update_status(
+async def update_status(
     order_id: int,
     status_data: dict,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update work order status."""
-    service = SimpleWorkOrderService(db)
+    service = AsyncSimpleWorkOrderService(db)
     try:
-        work_order = service.update_status(
-            order_id=order_id,
+        work_order = await service.update_status(
+            work_order_id=order_id,
             new_status=status_data.get("status"),
             notes=status_data.get("notes"),
             updated_by=status_data.get("updated_by", "Unknown")
@@ -451,16 +527,16 @@ def update_status(
 
 
 @router.post("/{order_id}/claim")
-def claim_task(
+async def claim_task(
     order_id: int,
     claim_data: dict,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Claim responsibility for a work order."""
-    service = SimpleWorkOrderService(db)
+    service = AsyncSimpleWorkOrderService(db)
     try:
-        work_order = service.claim_task(
-            order_id=order_id,
+        work_order = await service.claim_task(
+            work_order_id=order_id,
             person_name=claim_data.get("person_name", "Unknown")
         )
         return {"success": True, "message": f"Task claimed by {work_order.assigned_to}"}
@@ -468,49 +544,244 @@ def claim_task(
         return {"success": False, "error": str(e)}
 
 
+def upload_error(status_code: int, error: str, **fields) -> JSONResponse:
+    return JSONResponse(status_code=status_code, content={"success": False, "error": error, **fields})
+
+
+async def attach_stored_upload(service: AsyncSimpleWorkOrderService, work_order_id: int, file_name: str,
+                               file_type: str, uploaded_by: str, stored) -> dict:
+    """Reference the blob for a received upload, then move the bytes into the blob store."""
+    work_order_file = await service.add_file(
+        work_order_id=work_order_id,
+        file_name=file_name,
+        file_path=blob_store.path_for(stored.sha256),
+        file_type=file_type,
+        uploaded_by=uploaded_by,
+        blob_sha256=stored.sha256,
+        file_size=stored.size
+    )
+    await blob_store.adopt_async(stored.path, stored.sha256)
+    preview_worker.notify()
+    return {"success": True, "message": "File uploaded successfully", "file_id": work_order_file.id,
+            "size": stored.size, "sha256": stored.sha256}
+
+
 @router.post("/{order_id}/upload")
 async def upload_file(
     order_id: int,
     file: UploadFile = File(...),
     file_type: str = Form(...),
     uploaded_by: str = Form(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Upload a file for a work order."""
-    service = SimpleWorkOrderService(db)
+    """Upload a file for a work order (streamed to disk in chunks, stored once per content)."""
+    service = AsyncSimpleWorkOrderService(db)
+    stored = None
 
     try:
-        # Create file path
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        file_extension = file.filename.split('.')[-1] if '.' in file.filename else ''
-        safe_filename = f"{timestamp}_{file.filename}" if file.filename else f"{timestamp}_{order_id}.{file_extension}"
-        file_path = os.path.join(UPLOAD_DIR, safe_filename)
-
-        # Save file
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-
-        # Add to database
-        work_order_file = service.add_file(
+        stored = await blob_store.receive(file)
+        return await attach_stored_upload(service, order_id, file.filename, file_type, uploaded_by, stored)
+
+    except UploadTooLarge as e:
+        return upload_error(413, str(e))
+    except Exception as e:
+        if stored:
+            await asyncio.to_thread(remove_quietly, stored.path)
+        return {"success": False, "error": str(e)}
+
+
+@router.post("/{order_id}/files/by-hash")
+async def attach_file_by_hash(order_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    """Attach an already stored file without uploading it: JSON body with sha256, file_name, file_type, uploaded_by.
+
+    Answers 404 when the content is not stored yet; the client then uploads it normally.
+    """
+    service = AsyncSimpleWorkOrderService(db)
+    try:
+        data = await request.json()
+        sha256 = (data.get("sha256") or "").lower()
+        if not is_sha256(sha256):
+            return upload_error(400, "sha256 must be a hex SHA-256 digest")
+
+        blob = await service.get_blob(sha256)
+        if not blob or not await asyncio.to_thread(blob_store.exists, sha256):
+            return upload_error(404, "File not stored yet", missing=True)
+
+        work_order_file = await service.add_file(
+            work_order_id=order_id,
+            file_name=data.get("file_name") or sha256,
+            file_path=blob_store.path_for(sha256),
+            file_type=data.get("file_type", "other"),
+            uploaded_by=data.get("uploaded_by", "Unknown"),
+            blob_sha256=sha256,
+            file_size=blob.size
+        )
+        if not await asyncio.to_thread(blob_store.exists, sha256):
+            # Lost a race with the garbage collector - undo and ask for the bytes
+            await service.delete_file(order_id, work_order_file.id)
+            return upload_error(404, "File not stored yet", missing=True)
+
+        preview_worker.notify()
+        return {"success": True, "message": "File attached", "file_id": work_order_file.id,
+                "size": blob.size, "sha256": sha256, "deduplicated": True}
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+@router.post("/{order_id}/uploads")
+async def start_chunked_upload(order_id: int, request: Request):
+    """Open a resumable upload: JSON body with file_name, file_type, uploaded_by, total_size."""
+    try:
+        data = await request.json()
+        session = await chunked_uploads.create(
             work_order_id=order_id,
-            file_name=file.filename,
-            file_path=file_path,
-            file_type=file_type,
-            uploaded_by=uploaded_by
+            file_name=data.get("file_name"),
+            file_type=data.get("file_type", "other"),
+            uploaded_by=data.get("uploaded_by", "Unknown"),
+            total_size=int(data.get("total_size") or 0)
         )
+        return {"success": True, **session}
+    except UploadTooLarge as e:
+        return upload_error(413, str(e))
+    except Exception as e:
+        return {"success": False, "error": str(e)}
 
-        return {"success": True, "message": f"File uploaded successfully", "file_id": work_order_file.id}
 
+@router.get("/uploads/{upload_id}")
+async def chunked_upload_status(upload_id: str):
+    """Bytes received so far - where a client resumes after a dropped connection."""
+    try:
+        session = await chunked_uploads.status(upload_id)
+        return {"success": True, "offset": session["offset"], "total_size": session["total_size"]}
+    except ValueError as e:
+        return upload_error(404, str(e))
+
+
+@router.put("/uploads/{upload_id}")
+async def upload_chunk(upload_id: str, request: Request, offset: int = Query(..., ge=0)):
+    """Append the raw request body at offset; returns the new offset."""
+    try:
+        new_offset = await chunked_uploads.append(upload_id, offset, request.stream())
+        return {"success": True, "offset": new_offset}
+    except ValueError as e:
+        try:
+            current = (await chunked_uploads.status(upload_id))["offset"]
+        except ValueError:
+            return upload_error(404, str(e))
+        return upload_error(409, str(e), offset=current)
+
+
+@router.post("/uploads/{upload_id}/complete")
+async def complete_chunked_upload(upload_id: str, db: AsyncSession = Depends(get_async_db)):
+    """Finish a resumable upload and attach it to its work order."""
+    service = AsyncSimpleWorkOrderService(db)
+    stored = None
+    try:
+        session, stored = await chunked_uploads.complete(upload_id, blob_store.temp_path())
+        return await attach_stored_upload(
+            service, session["work_order_id"], session["file_name"], session["file_type"], session["uploaded_by"], stored
+        )
     except Exception as e:
+        if stored:
+            await asyncio.to_thread(remove_quietly, stored.path)
         return {"success": False, "error": str(e)}
 
 
+@router.delete("/uploads/{upload_id}")
+async def abort_chunked_upload(upload_id: str):
+    """Throw away a resumable upload."""
+    try:
+        await chunked_uploads.abort(upload_id)
+        return {"success": True}
+    except ValueError as e:
+        return upload_error(404, str(e))
+
+
 @router.get("/{order_id}/files")
-def get_order_files(order_id: int, db: Session = Depends(get_db)):
+async def get_order_files(order_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get all files for a work order."""
-    service = SimpleWorkOrderService(db)
+    service = AsyncSimpleWorkOrderService(db)
+    try:
+        files = await service.get_order_files(order_id)
+        previews = await service.get_preview_jobs([f.id for f in files])
+        return {"success": True, "files": [file_listing(order_id, f, previews.get(f.id)) for f in files]}
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+def file_listing(order_id: int, work_order_file, preview_job) -> dict:
+    listing = {"id": work_order_file.id, "name": work_order_file.file_name, "type": work_order_file.file_type,
+               "uploaded_by": work_order_file.uploaded_by, "uploaded_at": work_order_file.uploaded_at,
+               "size": work_order_file.file_size, "sha256": work_order_file.blob_sha256,
+               "download_url": f"/api/v1/simple-work-orders/{order_id}/files/{work_order_file.id}/download",
+               "preview": preview_job.status if preview_job else None}
+    if preview_job and preview_job.status == "done":
+        listing["preview_url"] = f"/api/v1/simple-work-orders/{order_id}/files/{work_order_file.id}/preview"
+    return listing
+
+
+@router.get("/{order_id}/files/{file_id}/preview")
+async def get_file_preview(order_id: int, file_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    """Small WebP preview of an image file; 202 while it is still being rendered."""
+    service = AsyncSimpleWorkOrderService(db)
     try:
-        files = service.get_order_files(order_id)
-        return {"success": True, "files": [{"name": f.file_name, "type": f.file_type, "uploaded_by": f.uploaded_by, "uploaded_at": f.uploaded_at} for f in files]}
+        work_order_file = await service.get_file(order_id, file_id)
+    except ValueError as e:
+        return upload_error(404, str(e))
+
+    preview_job = (await service.get_preview_jobs([file_id])).get(file_id)
+    if not preview_job or preview_job.status == "failed":
+        return upload_error(404, "No preview for this file")
+    if preview_job.status != "done":
+        return upload_error(202, "Preview is being generated", status=preview_job.status)
+
+    try:
+        stat_result = await asyncio.to_thread(os.stat, preview_job.preview_path)
+    except FileNotFoundError:
+        return upload_error(404, "No preview for this file")
+    return file_download_response(
+        preview_job.preview_path,
+        f"{os.path.splitext(work_order_file.file_name)[0]}.webp",
+        stat_result,
+        method=request.method,
+        if_none_match=request.headers.get("if-none-match"),
+        disposition="inline"
+    )
+
+
+@router.api_route("/{order_id}/files/{file_id}/download", methods=["GET", "HEAD"])
+async def download_order_file(order_id: int, file_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    """Download a work order file; supports Range, If-Range and If-None-Match."""
+    service = AsyncSimpleWorkOrderService(db)
+    try:
+        work_order_file = await service.get_file(order_id, file_id)
+        stat_result = await asyncio.to_thread(os.stat, work_order_file.file_path)
+    except (ValueError, FileNotFoundError):
+        return upload_error(404, "File not found")
+
+    return file_download_response(
+        work_order_file.file_path,
+        work_order_file.file_name,
+        stat_result,
+        blob_sha256=work_order_file.blob_sha256,
+        method=request.method,
+        range_header=request.headers.get("range"),
+        if_range=request.headers.get("if-range"),
+        if_none_match=request.headers.get("if-none-match")
+    )
+
+
+@router.delete("/{order_id}/files/{file_id}")
+async def delete_order_file(order_id: int, file_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Remove a file from a work order; shared content stays until its last reference is gone."""
+    service = AsyncSimpleWorkOrderService(db)
+    try:
+        work_order_file = await service.delete_file(order_id, file_id)
+        if not work_order_file.blob_sha256:
+            await asyncio.to_thread(remove_quietly, work_order_file.file_path)
+            await asyncio.to_thread(remove_quietly, preview_path(work_order_file.id))
+        return {"success": True}
+    except ValueError as e:
+        return upload_error(404, str(e))
     except Exception as e:
-        return {"success": False, "error": str(e)}
\ No newline at end of file
+        return {"success": False, "error": str(e)}
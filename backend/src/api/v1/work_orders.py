@@ -9,7 +9,8 @@ from ...schemas.work_order import (
     WorkOrderListResponse, WorkOrderStats, WorkOrderStatusUpdate,
     ProductionQueue
 )
-from ...services.work_order_service import WorkOrderService
+from ...services.work_order_service import CACHE_NAMESPACE, WorkOrderService
+from ...cache import response_cache
 from ...api.v1.auth import get_current_active_user
 from ...schemas.user import User
 from ...database import get_db
@@ -42,8 +43,10 @@ def get_work_orders(
     priority: Optional[Priority] = Query(None, description="Filter by priority"),
     date_from: Optional[datetime] = Query(None, description="Filter orders from date"),
     date_to: Optional[datetime] = Query(None, description="Filter orders to date"),
-    sort_by: str = Query("order_date", description="Sort field"),
+    sort_by: str = Query("order_date", description="Sort field, or 'relevance' when searching"),
     sort_order: str = Query("desc", description="Sort order (asc/desc)"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page (overrides page)"),
+    count: str = Query("exact", pattern="^(exact|estimate|none)$", description="Total count: exact, estimate or none"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
@@ -51,25 +54,32 @@ def get_work_orders(
     work_order_service = WorkOrderService(db)
     skip = (page - 1) * limit
 
-    work_orders, total = work_order_service.get_work_orders(
-        skip=skip,
-        limit=limit,
-        search=search,
-        status=status,
-        customer_id=customer_id,
-        priority=priority,
-        date_from=date_from,
-        date_to=date_to,
-        sort_by=sort_by,
-        sort_order=sort_order
-    )
+    try:
+        work_orders, total, next_cursor = work_order_service.get_work_orders(
+            skip=skip,
+            limit=limit,
+            search=search,
+            status=status,
+            customer_id=customer_id,
+            priority=priority,
+            date_from=date_from,
+            date_to=date_to,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            cursor=cursor,
+            count=count
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     return WorkOrderListResponse(
         items=work_orders,
         total=total,
+        total_is_estimate=total is not None and count == "estimate",
         page=page,
         limit=limit,
-        pages=(total + limit - 1) // limit
+        pages=(total + limit - 1) // limit if total is not None else None,
+        next_cursor=next_cursor
     )
 
 
@@ -80,8 +90,10 @@ def get_work_order_statistics(
 ):
     """Get work order statistics and dashboard data."""
     work_order_service = WorkOrderService(db)
-    stats = work_order_service.get_work_order_statistics()
-    return WorkOrderStats(**stats)
+    return response_cache.get_or_compute(
+        CACHE_NAMESPACE, "stats",
+        lambda: WorkOrderStats(**work_order_service.get_work_order_statistics()).model_dump(mode="json")
+    )
 
 
 @router.get("/queue", response_model=ProductionQueue)
@@ -91,8 +103,10 @@ def get_production_queue(
 ):
     """Get current production queue organized by status."""
     work_order_service = WorkOrderService(db)
-    queue = work_order_service.get_production_queue()
-    return ProductionQueue(**queue)
+    return response_cache.get_or_compute(
+        CACHE_NAMESPACE, "queue",
+        lambda: ProductionQueue(**work_order_service.get_production_queue()).model_dump(mode="json")
+    )
 
 
 @router.get("/{work_order_id}", response_model=WorkOrderDetail)
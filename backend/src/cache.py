@@ -0,0 +1,223 @@
+"""
+Small in-process caches shared by the API layers.
+
+ResponseCache sits in front of expensive read endpoints. It stores JSON-ready
+payloads in a TTLCache, or in Redis when RESPONSE_CACHE_BACKEND=redis so every
+worker shares them. Concurrent misses on one key are collapsed into a single
+computation.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+# memory (per process) or redis (shared by every worker)
+RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "memory")
+RESPONSE_CACHE_REDIS_URL = os.getenv("RESPONSE_CACHE_REDIS_URL", "redis://localhost:6379/0")
+
+# Safety net only - writes invalidate cached responses straight away
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "30"))
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "256"))
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after a time-to-live."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return a fresh cached value, or default if missing/expired."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._data[key]
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Store a value; ``ttl`` overrides the cache default for this entry."""
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def delete_where(self, predicate: Callable[[Hashable, Any], bool]) -> int:
+        """Drop every entry for which predicate(key, value) is true."""
+        with self._lock:
+            stale = [key for key, (_, value) in self._data.items() if predicate(key, value)]
+            for key in stale:
+                del self._data[key]
+            return len(stale)
+
+    def delete_prefix(self, prefix: str) -> int:
+        """Drop every entry whose string key starts with prefix."""
+        return self.delete_where(lambda key, value: isinstance(key, str) and key.startswith(prefix))
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class RedisCache:
+    """TTLCache-compatible backend storing JSON values in Redis."""
+
+    def __init__(self, url: str = RESPONSE_CACHE_REDIS_URL, ttl: float = RESPONSE_CACHE_TTL, prefix: str = "uspc:cache:"):
+        import redis
+
+        self.ttl = ttl
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+        self._redis = redis.Redis.from_url(url)
+        self._errors = redis.RedisError
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            raw = self._redis.get(self.prefix + key)
+        except self._errors as e:
+            # Redis being down degrades to recomputing, not to failing the request
+            logger.error(f"Response cache read failed: {e}")
+            raw = None
+        if raw is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return json.loads(raw)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        try:
+            self._redis.set(self.prefix + key, json.dumps(value), px=int(ttl * 1000))
+        except self._errors as e:
+            logger.error(f"Response cache write failed: {e}")
+
+    def delete(self, key: str):
+        self._redis.delete(self.prefix + key)
+
+    def delete_prefix(self, prefix: str) -> int:
+        keys = list(self._redis.scan_iter(match=f"{self.prefix}{prefix}*", count=100))
+        if keys:
+            self._redis.delete(*keys)
+        return len(keys)
+
+    def clear(self):
+        self.delete_prefix("")
+
+
+class ResponseCache:
+    """Namespaced read-through cache with single-flight recomputation.
+
+    Values must be JSON-ready (dicts, lists, strings, numbers) so any backend
+    can hold them. invalidate(namespace) drops every key under a namespace and
+    stops computations already in flight from storing their now-stale result.
+    """
+
+    def __init__(self, backend=None, ttl: float = RESPONSE_CACHE_TTL):
+        self.backend = backend if backend is not None else TTLCache(maxsize=RESPONSE_CACHE_SIZE, ttl=ttl)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, Future] = {}
+        self._generations: Dict[str, int] = {}
+
+    @staticmethod
+    def key(namespace: str, name: str, params: Optional[dict] = None) -> str:
+        """Cache key for one endpoint and filter set, e.g. "work_orders:stats:{}"."""
+        return f"{namespace}:{name}:{json.dumps(params or {}, sort_keys=True, default=str)}"
+
+    def get_or_compute(self, namespace: str, name: str, compute: Callable[[], Any],
+                       params: Optional[dict] = None, ttl: Optional[float] = None) -> Any:
+        """Return the cached value, or compute it once no matter how many callers miss together."""
+        key = self.key(namespace, name, params)
+        value = self.backend.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        with self._lock:
+            future = self._in_flight.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = Future()
+                self._in_flight[key] = future
+            generation = self._generations.get(namespace, 0)
+
+        if not is_leader:
+            return future.result()
+
+        try:
+            value = compute()
+            with self._lock:
+                if self._generations.get(namespace, 0) == generation:
+                    self.backend.set(key, value, ttl)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def invalidate(self, namespace: str):
+        """Forget everything cached under namespace (call after the write commits)."""
+        with self._lock:
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+        try:
+            self.backend.delete_prefix(f"{namespace}:")
+        except Exception as e:
+            # A stale entry still expires after the TTL; never fail the write over it
+            logger.error(f"Response cache invalidation failed for '{namespace}': {e}")
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.backend.hits + self.backend.misses
+        return self.backend.hits / lookups if lookups else 0.0
+
+
+def create_response_cache(backend: str = RESPONSE_CACHE_BACKEND) -> ResponseCache:
+    """ResponseCache on the configured backend."""
+    if backend == "redis":
+        logger.info("Response cache using Redis")
+        return ResponseCache(RedisCache(RESPONSE_CACHE_REDIS_URL, RESPONSE_CACHE_TTL))
+    return ResponseCache()
+
+
+response_cache = create_response_cache()
@@ -1,8 +1,16 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, Response
 from .api.v1.simple_work_orders import router as simple_work_orders_router
 from .api.v1.simple_auth import router as simple_auth_router
+from .api.v1.profiler import router as profiler_router
+from .services.work_order_events import event_hub
+from .services.file_previews import preview_worker
+from . import database, metrics
+from .security import password_hash_pool
+from .services.file_uploads import UploadSizeLimit
+from .profiler import ProfilerMiddleware, sampling_profiler
+import asyncio
 import logging
 
 # Configure logging first
@@ -12,7 +20,7 @@ logger = logging.getLogger(__name__)
 # Import models to ensure they are registered with SQLAlchemy
 try:
     logger.info("Importing models...")
-    from .models import SimpleUser, SimpleWorkOrder, WorkOrderFile, WorkOrderUpdate
+    from .models import FileBlob, FilePreviewJob, SimpleUser, SimpleWorkOrder, WorkOrderFile, WorkOrderUpdate
     logger.info("Models imported successfully")
 except Exception as e:
     logger.error(f"Error importing models: {e}")
@@ -34,6 +42,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Refuse oversized uploads from Content-Length, before the multipart body is spooled
+app.add_middleware(UploadSizeLimit)
+
+# Server-Timing header and log summary with each request's SQL statement count and DB time
+app.add_middleware(database.QueryTimingMiddleware)
+
+# Counts requests for profiling runs bounded by a request count (one attribute check when idle)
+app.add_middleware(ProfilerMiddleware)
+
+# Route latency histograms and in-flight requests for /metrics (outermost, so it times everything)
+app.add_middleware(metrics.MetricsMiddleware)
+
 # Include simple auth router
 logger.info("Registering simple auth router at /api/v1/simple-auth")
 app.include_router(simple_auth_router, prefix="/api/v1/simple-auth", tags=["simple-auth"])
@@ -42,6 +62,10 @@ app.include_router(simple_auth_router, prefix="/api/v1/simple-auth", tags=["simp
 logger.info("Registering simple work orders router at /api/v1/simple-work-orders")
 app.include_router(simple_work_orders_router, prefix="/api/v1/simple-work-orders", tags=["simple-work-orders"])
 
+# Include admin sampling profiler router
+logger.info("Registering profiler router at /api/v1/admin/profiler")
+app.include_router(profiler_router, prefix="/api/v1/admin/profiler", tags=["admin"])
+
 @app.on_event("startup")
 async def startup_event():
     """Log all registered routes on startup"""
@@ -53,6 +77,19 @@ async def startup_event():
             logger.info(f"  {route.methods} {route.path}")
     logger.info("=" * 50)
 
+    # Work order events are delivered on this loop
+    event_hub.start(asyncio.get_running_loop())
+
+    # Artwork previews are rendered in the background, off the request path
+    preview_worker.start(asyncio.get_running_loop())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background event listeners, preview workers and any profiling run"""
+    event_hub.stop()
+    preview_worker.stop()
+    sampling_profiler.stop()
+
 @app.get("/", response_class=HTMLResponse)
 def home_page():
     """Simple home page that redirects to dashboard."""
@@ -75,6 +112,11 @@ def home_page():
 def health_check():
     return {"status": "healthy", "system": "Simple Work Order Management"}
 
+@app.get("/metrics")
+def prometheus_metrics():
+    """Prometheus scrape endpoint: route latency, in-flight requests, DB pools, bcrypt queue, uploads, caches"""
+    return Response(content=metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
 @app.get("/debug/routes")
 def list_routes():
     """Debug endpoint to list all registered routes"""
@@ -86,4 +128,22 @@ def list_routes():
                 "methods": list(route.methods),
                 "name": route.name
             })
-    return {"routes": routes, "total": len(routes)}
\ No newline at end of file
+    return {"routes": routes, "total": len(routes)}
+
+@app.get("/debug/db-pool")
+def db_pool_stats():
+    """Debug endpoint with connection pool occupancy and checkout wait times"""
+    return {
+        "sync": database.get_pool_stats(database.engine),
+        "async": database.get_pool_stats(database.async_engine) if database.async_engine else None
+    }
+
+@app.get("/debug/password-hashing")
+def password_hashing_stats():
+    """Debug endpoint with bcrypt pool queue depth and latency"""
+    return password_hash_pool.snapshot()
+
+@app.get("/debug/previews")
+def preview_worker_stats():
+    """Debug endpoint with preview jobs rendered and worker errors in this process"""
+    return preview_worker.snapshot()
@@ -0,0 +1,282 @@
+"""
+In-process metrics in the Prometheus text format, served at /metrics.
+
+The registry is deliberately small: counters, gauges and fixed-bucket
+histograms kept in plain dicts keyed by label values. Request metrics are
+updated on the event loop thread only, so no locks are taken on the request
+path. MetricsMiddleware costs two perf_counter() calls, a bisect and a few
+dict updates per request - a few microseconds. Pool, bcrypt, cache and
+preview figures are read from their own snapshots at scrape time.
+
+Each worker process keeps its own numbers; with several uvicorn workers,
+scrape each one (or run one worker per scrape target).
+"""
+
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+# Request latency buckets in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4"  # Response appends the charset
+
+# (metric suffix, labels, value)
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class Metric:
+    """One metric family; values are keyed by a tuple of label values."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def samples(self) -> Iterable[Sample]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name if name.endswith("_total") else f"{name}_total", documentation, labelnames)
+        self._values: Dict[tuple, float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1):
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values: str) -> float:
+        return self._values.get(label_values, 0)
+
+    def samples(self) -> Iterable[Sample]:
+        for label_values, value in list(self._values.items()):
+            yield "", dict(zip(self.labelnames, label_values)), value
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[tuple, float] = {}
+
+    def set(self, value: float, *label_values: str):
+        self._values[label_values] = value
+
+    def inc(self, *label_values: str, amount: float = 1):
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def dec(self, *label_values: str, amount: float = 1):
+        self.inc(*label_values, amount=-amount)
+
+    def value(self, *label_values: str) -> float:
+        return self._values.get(label_values, 0)
+
+    def samples(self) -> Iterable[Sample]:
+        for label_values, value in list(self._values.items()):
+            yield "", dict(zip(self.labelnames, label_values)), value
+
+
+class Histogram(Metric):
+    """Fixed buckets; counts are stored per bucket and made cumulative when rendered."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[tuple, list] = {}  # label values -> [bucket counts..., +Inf count, sum]
+
+    def observe(self, value: float, *label_values: str):
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def count(self, *label_values: str) -> int:
+        series = self._series.get(label_values)
+        return sum(series[:-1]) if series else 0
+
+    def samples(self) -> Iterable[Sample]:
+        for label_values, series in list(self._series.items()):
+            labels = dict(zip(self.labelnames, label_values))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                yield "_bucket", dict(labels, le=_format_value(float(bound))), cumulative
+            yield "_sum", labels, series[-1]
+            yield "_count", labels, cumulative
+
+
+class MetricsRegistry:
+    """Metrics updated in place plus collectors that report a snapshot at scrape time."""
+
+    def __init__(self):
+        self._metrics: List[Metric] = []
+        self._collectors: List[Callable[[], Iterable[Metric]]] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], Iterable[Metric]]):
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Everything in the Prometheus text exposition format."""
+        families = list(self._metrics)
+        for collector in self._collectors:
+            families.extend(collector())
+
+        lines = []
+        for metric in families:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for suffix, labels, value in metric.samples():
+                lines.append(f"{metric.name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_requests = registry.counter(
+    "uspc_http_requests_total", "HTTP requests by route and status code", ("method", "route", "status"))
+http_request_duration = registry.histogram(
+    "uspc_http_request_duration_seconds", "HTTP request latency by route", ("method", "route"))
+http_requests_in_flight = registry.gauge(
+    "uspc_http_requests_in_flight", "HTTP requests being handled right now")
+upload_bytes = registry.counter(
+    "uspc_upload_bytes_total", "Bytes of work order files received (rate() gives bytes per second)")
+dashboard_responses = registry.counter(
+    "uspc_dashboard_responses_total", "Dashboard responses by result: not_modified (ETag hit) or full", ("result",))
+
+# Export zeros from the start so rate() and ratios work before the first event
+upload_bytes.inc(amount=0)
+for result in ("not_modified", "full"):
+    dashboard_responses.inc(result, amount=0)
+http_requests_in_flight.set(0)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, status and in-flight requests per route.
+
+    The route label is the matched path template (e.g. /api/v1/simple-work-orders/{order_id}),
+    so label cardinality stays bounded; unmatched paths share one label.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_requests_in_flight.dec()
+            route = scope.get("route")
+            route_label = getattr(route, "path", None) or "unmatched"
+            http_request_duration.observe(time.perf_counter() - started, scope["method"], route_label)
+            http_requests.inc(scope["method"], route_label, str(status_code))
+
+
+def _snapshot_metrics(prefix: str, documentation: str, snapshots: Sequence[Tuple[Dict[str, str], dict]],
+                      counters: Sequence[str] = ()) -> List[Metric]:
+    """Numeric fields of (labels, snapshot) pairs as gauges - or counters for the names in `counters`."""
+    families: Dict[str, Metric] = {}
+    for labels, snapshot in snapshots:
+        for key, value in snapshot.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            metric = families.get(key)
+            if metric is None:
+                metric_class = Counter if key in counters else Gauge
+                metric = families[key] = metric_class(f"{prefix}_{key}", f"{documentation}: {key}", tuple(labels))
+            if isinstance(metric, Counter):
+                metric.inc(*labels.values(), amount=value)
+            else:
+                metric.set(value, *labels.values())
+    return list(families.values())
+
+
+def collect_runtime_metrics() -> Iterable[Metric]:
+    """Connection pools, bcrypt pool, caches and preview workers, read at scrape time."""
+    from . import database
+    from .cache import response_cache
+    from .security import password_hash_pool
+    from .services.file_previews import preview_worker
+
+    pools = [({"engine": "sync"}, database.get_pool_stats(database.engine))]
+    if database.async_engine is not None:
+        pools.append(({"engine": "async"}, database.get_pool_stats(database.async_engine)))
+    yield from _snapshot_metrics("uspc_db_pool", "Connection pool", pools, counters=("checkouts", "timeouts"))
+
+    yield from _snapshot_metrics("uspc_password_hash", "bcrypt hashing pool", [({}, password_hash_pool.snapshot())],
+                                 counters=("completed", "rejected"))
+
+    # ResponseCache only backs the /work-orders stats and queue endpoints
+    backend = response_cache.backend
+    cache_lookups = Counter("uspc_response_cache_lookups_total", "Response cache lookups by result", ("result",))
+    cache_lookups.inc("hit", amount=backend.hits)
+    cache_lookups.inc("miss", amount=backend.misses)
+    yield cache_lookups
+
+    # The dashboard is cached by the client: a hit is a 304 answered from its ETag
+    not_modified = dashboard_responses.value("not_modified")
+    total = not_modified + dashboard_responses.value("full")
+    hit_ratio = Gauge("uspc_dashboard_cache_hit_ratio",
+                      "Dashboard responses answered 304 Not Modified / all dashboard responses since start")
+    hit_ratio.set(not_modified / total if total else 0.0)
+    yield hit_ratio
+
+    yield from _snapshot_metrics("uspc_preview_worker", "Artwork preview workers", [({}, preview_worker.snapshot())],
+                                 counters=("processed", "errors"))
+
+
+registry.add_collector(collect_runtime_metrics)
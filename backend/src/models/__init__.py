@@ -2,6 +2,6 @@
 # Import all models to ensure they are registered with SQLAlchemy Base
 
 from .simple_user import SimpleUser
-from .simple_work_order import SimpleWorkOrder, WorkOrderFile, WorkOrderUpdate
+from .simple_work_order import FileBlob, FilePreviewJob, SimpleWorkOrder, WorkOrderFile, WorkOrderUpdate
 
-__all__ = ['SimpleUser', 'SimpleWorkOrder', 'WorkOrderFile', 'WorkOrderUpdate']
\ No newline at end of file
+__all__ = ['SimpleUser', 'SimpleWorkOrder', 'WorkOrderFile', 'FileBlob', 'FilePreviewJob', 'WorkOrderUpdate']
\ No newline at end of file
@@ -20,7 +20,7 @@ class Customer(Base):
     postal_code = Column(String, nullable=True)
     country = Column(String, nullable=True, default="USA")
     notes = Column(Text, nullable=True)
-    status = Column(String, default="active")  # active, inactive, archived
+    status = Column(String, default="active", index=True)  # active, inactive, archived
     total_orders_count = Column(Integer, default=0)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Text, Boolean, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from ..database import Base
@@ -6,6 +6,12 @@ from ..database import Base
 
 class SimpleWorkOrder(Base):
     __tablename__ = "simple_work_orders"
+    __table_args__ = (
+        # Dashboard stages and get_orders_by_status, oldest first within a status
+        Index("ix_simple_work_orders_status_created_at", "status", "created_at", "id"),
+        Index("ix_simple_work_orders_created_at", "created_at"),
+        Index("ix_simple_work_orders_updated_at", "updated_at"),  # dashboard change token
+    )
 
     # Basic Information
     id = Column(Integer, primary_key=True, index=True)
@@ -47,19 +53,56 @@ class WorkOrderFile(Base):
     __tablename__ = "work_order_files"
 
     id = Column(Integer, primary_key=True, index=True)
-    work_order_id = Column(Integer, ForeignKey("simple_work_orders.id"), nullable=False)
+    work_order_id = Column(Integer, ForeignKey("simple_work_orders.id"), nullable=False, index=True)
     file_name = Column(String(200), nullable=False)
     file_path = Column(String(500), nullable=False)
     file_type = Column(String(50), nullable=False)  # logo, design, document, other
     uploaded_by = Column(String(100), nullable=False)
     uploaded_at = Column(DateTime, default=datetime.utcnow)
 
+    # Content-addressed storage - NULL for files uploaded before the blob store
+    blob_sha256 = Column(String(64), ForeignKey("file_blobs.sha256"), nullable=True, index=True)
+    file_size = Column(BigInteger, nullable=True)
+
     # Relationship
     work_order = relationship("SimpleWorkOrder")
 
 
+class FileBlob(Base):
+    """One stored file content, shared by every WorkOrderFile with the same hash."""
+    __tablename__ = "file_blobs"
+
+    sha256 = Column(String(64), primary_key=True)
+    size = Column(BigInteger, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_used_at = Column(DateTime, default=datetime.utcnow)  # last acquire/release, for the GC grace period
+
+
+class FilePreviewJob(Base):
+    """Preview rendering for one WorkOrderFile - rows are the persisted work queue."""
+    __tablename__ = "file_preview_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    file_id = Column(Integer, ForeignKey("work_order_files.id"), nullable=False, unique=True)
+    status = Column(String(20), nullable=False, default="pending", index=True)  # pending, running, done, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    run_after = Column(DateTime, default=datetime.utcnow)  # not picked up before this (retry backoff)
+    locked_at = Column(DateTime, nullable=True)  # when a worker claimed it
+    preview_path = Column(String(500), nullable=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Relationship
+    file = relationship("WorkOrderFile")
+
+
 class WorkOrderUpdate(Base):
     __tablename__ = "simple_work_order_updates"
+    __table_args__ = (
+        Index("ix_simple_work_order_updates_order_updated", "work_order_id", "updated_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     work_order_id = Column(Integer, ForeignKey("simple_work_orders.id"), nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, Numeric, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, Numeric, ForeignKey, Enum, Index, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -31,6 +31,16 @@ class Priority(enum.Enum):
 
 class WorkOrder(Base):
     __tablename__ = "work_orders"
+    __table_args__ = (
+        # Production queue: active orders of one status by priority and due date
+        Index("ix_work_orders_active_queue", "status", "priority", "requested_delivery_date",
+              postgresql_where=text("is_active = true"), sqlite_where=text("is_active = 1")),
+        # Work order list, newest first - alone and per status/customer/priority filter
+        Index("ix_work_orders_order_date_id", "order_date", "id"),
+        Index("ix_work_orders_status_order_date", "status", "order_date", "id"),
+        Index("ix_work_orders_customer_order_date", "customer_id", "order_date", "id"),
+        Index("ix_work_orders_priority_order_date", "priority", "order_date", "id"),
+    )
 
     # Basic Information
     id = Column(Integer, primary_key=True, index=True)
@@ -123,4 +133,20 @@ class ProductionSchedule(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relationships
-    work_order = relationship("WorkOrder")
\ No newline at end of file
+    work_order = relationship("WorkOrder")
+
+class WorkOrderCounter(Base):
+    """Incrementally maintained totals behind /stats (status, priority, monthly completions)"""
+    __tablename__ = "work_order_counters"
+
+    name = Column(String(100), primary_key=True)  # e.g. "status:pending", "priority:high", "completed:2024-05"
+    count = Column(Integer, nullable=False, default=0)
+    amount = Column(Numeric(14, 2), nullable=False, default=0)  # sum of total_amount (status counters only)
+
+
+class WorkOrderNumberCounter(Base):
+    """Last work order number handed out per number prefix (e.g. "WO2024")"""
+    __tablename__ = "work_order_number_counters"
+
+    prefix = Column(String(20), primary_key=True)
+    last_value = Column(Integer, nullable=False, default=0)
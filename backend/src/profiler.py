@@ -0,0 +1,227 @@
+"""
+On-demand sampling profiler for the running app.
+
+An admin starts it for the next N seconds or N requests. While it runs, a
+background thread snapshots the Python stack of every thread every
+PROFILER_INTERVAL_MS via sys._current_frames(). This covers the event loop,
+the sync-route threadpool, the bcrypt pool and the preview workers. When the
+run ends, the stacks are written to PROFILER_DIR in the collapsed
+("folded") format read by flamegraph.pl, speedscope and inferno.
+
+Nothing is hooked into the interpreter. When the profiler is off there is no
+thread and no trace function; the only cost is one attribute check per
+request in ProfilerMiddleware. Each worker process profiles itself, so with
+several uvicorn workers the run covers the worker that took the start
+request.
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from types import CodeType
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Where collapsed-stack files are written
+PROFILER_DIR = os.getenv("PROFILER_DIR", "profiles")
+
+# Time between stack samples (lower = more detail, more overhead while running)
+PROFILER_INTERVAL_MS = float(os.getenv("PROFILER_INTERVAL_MS", "5"))
+
+# Shortest interval accepted - below this the sampler spends most of the GIL walking stacks
+PROFILER_MIN_INTERVAL_MS = 1.0
+
+# Longest run allowed, also the limit for runs bounded by a request count
+PROFILER_MAX_SECONDS = int(os.getenv("PROFILER_MAX_SECONDS", "300"))
+
+PROFILER_DEFAULT_SECONDS = 30
+
+# Leaf frames of threads parked with nothing to do - sampling them only adds noise
+IDLE_LEAVES = {("threading.py", "wait"), ("selectors.py", "select"), ("queue.py", "get")}
+
+
+class ProfilerBusy(RuntimeError):
+    """A profiling run is already in progress."""
+
+
+class SamplingProfiler:
+    """Periodic whole-process stack sampler writing collapsed-stack files."""
+
+    def __init__(self, directory: str = None, interval_ms: float = PROFILER_INTERVAL_MS):
+        self.directory = directory or PROFILER_DIR
+        self.interval_ms = interval_ms
+        self.request_budget = 0  # requests left in a request-bounded run (0 = not counting)
+        self.last_profile: Optional[dict] = None
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._stacks: Counter = Counter()
+        self._labels: Dict[CodeType, str] = {}
+        self._samples = 0
+        self._requests = 0
+        self._started_at = 0.0
+        self._deadline = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self, seconds: float = None, requests: int = None, interval_ms: float = None) -> dict:
+        """Begin a run that ends after `seconds`, or after `requests` finished requests."""
+        with self._lock:
+            if self._thread is not None:
+                raise ProfilerBusy("A profiling run is already in progress")
+            if seconds is None:
+                seconds = PROFILER_MAX_SECONDS if requests else PROFILER_DEFAULT_SECONDS
+            if not seconds > 0 or (requests is not None and requests <= 0):
+                raise ValueError("seconds and requests must be positive")
+            if interval_ms is not None and not interval_ms > 0:
+                raise ValueError("interval_ms must be positive")
+
+            self._stacks = Counter()
+            self._samples = 0
+            self._requests = 0
+            self._stop.clear()
+            self._started_at = time.monotonic()
+            self._deadline = self._started_at + min(seconds, PROFILER_MAX_SECONDS)
+            self.request_budget = requests or 0
+            interval = max(interval_ms or self.interval_ms, PROFILER_MIN_INTERVAL_MS) / 1000
+            self._thread = threading.Thread(target=self._run, args=(interval,), name="sampling-profiler", daemon=True)
+            self._thread.start()
+
+        logger.info(f"Sampling profiler started for {min(seconds, PROFILER_MAX_SECONDS):g}s"
+                    f"{f' or {requests} requests' if requests else ''}")
+        return self.status()
+
+    def request_finished(self):
+        """Count a request against a request-bounded run (called by ProfilerMiddleware)."""
+        with self._lock:
+            if self.request_budget <= 0:
+                return
+            self._requests += 1
+            self.request_budget -= 1
+            if self.request_budget == 0:
+                self._stop.set()
+
+    def stop(self) -> Optional[dict]:
+        """End the run now and wait for its file (blocking); returns its summary."""
+        thread = self._thread
+        if thread is None:
+            return self.last_profile
+        self._stop.set()
+        thread.join()
+        return self.last_profile
+
+    def status(self) -> dict:
+        with self._lock:
+            running = self._thread is not None
+            return {
+                "running": running,
+                "samples": self._samples,
+                "requests": self._requests,
+                "requests_left": self.request_budget if running else 0,
+                "seconds_left": round(max(self._deadline - time.monotonic(), 0), 1) if running else 0,
+                "last_profile": self.last_profile
+            }
+
+    def _label(self, code: CodeType) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            path = code.co_filename
+            try:
+                relative = os.path.relpath(path)
+            except ValueError:
+                relative = path
+            if relative.startswith(".."):
+                # Library code: keep the package-relative tail, e.g. sqlalchemy/orm/loading.py
+                parts = path.replace("\\", "/").split("/")
+                anchor = max((i for i, part in enumerate(parts) if part in ("site-packages", "lib")), default=-1)
+                relative = "/".join(parts[anchor + 1:]) if anchor >= 0 else parts[-1]
+            label = self._labels[code] = f"{code.co_name} ({relative}:{code.co_firstlineno})"
+        return label
+
+    def _sample(self, own_ident: int, thread_names: Dict[int, str]):
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident:
+                continue
+            code = frame.f_code
+            if (os.path.basename(code.co_filename), code.co_name) in IDLE_LEAVES:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self._label(frame.f_code))
+                frame = frame.f_back
+            stack.append(thread_names.get(ident, f"thread-{ident}"))
+            self._stacks[";".join(reversed(stack))] += 1
+        self._samples += 1
+
+    def _run(self, interval: float):
+        own_ident = threading.get_ident()
+        thread_names: Dict[int, str] = {}
+        next_refresh = 0.0
+        try:
+            while not self._stop.wait(interval) and time.monotonic() < self._deadline:
+                now = time.monotonic()
+                if now >= next_refresh:  # pool threads come and go
+                    thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+                    next_refresh = now + 1
+                self._sample(own_ident, thread_names)
+            self._write()
+        except Exception as e:
+            logger.error(f"Sampling profiler failed: {e}")
+        finally:
+            with self._lock:
+                self.request_budget = 0
+                self._thread = None
+
+    def _write(self):
+        duration = time.monotonic() - self._started_at
+        os.makedirs(self.directory, exist_ok=True)
+        name = f"profile-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.folded"
+        path = os.path.join(self.directory, name)
+        with open(path, "w") as handle:
+            for stack, count in self._stacks.most_common():
+                handle.write(f"{stack} {count}\n")
+
+        self.last_profile = {
+            "file": name,
+            "samples": self._samples,
+            "stacks": len(self._stacks),
+            "requests": self._requests,
+            "duration_s": round(duration, 2)
+        }
+        logger.info(f"Sampling profiler wrote {path}: {self.last_profile}")
+
+    def profile_path(self, name: str) -> str:
+        """Path of a written profile; only plain names from this directory are accepted."""
+        if os.path.basename(name) != name or not name.endswith(".folded"):
+            raise ValueError("Profile not found")
+        path = os.path.join(self.directory, name)
+        if not os.path.isfile(path):
+            raise ValueError("Profile not found")
+        return path
+
+
+class ProfilerMiddleware:
+    """Counts finished requests while a request-bounded profiling run is active."""
+
+    def __init__(self, app, profiler: SamplingProfiler = None):
+        self.app = app
+        self.profiler = profiler or sampling_profiler
+
+    async def __call__(self, scope, receive, send):
+        if not self.profiler.request_budget or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.profiler.request_finished()
+
+
+sampling_profiler = SamplingProfiler()
@@ -0,0 +1,207 @@
+"""
+Query plan checks for the hot read paths.
+
+Seeds a realistically skewed dataset, runs EXPLAIN on the queries behind the
+dashboard, production queue, work order list and customer list, and reports
+every sequential scan of a seeded table. check_query_plans.py runs this
+against a scratch database (SQLite by default, PostgreSQL via --database-url);
+tests/unit/test_query_plans.py runs it on SQLite so a dropped index or a new
+unindexed filter fails the suite.
+"""
+
+import json
+import random
+import re
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Callable, Dict, List, NamedTuple, Tuple
+
+from sqlalchemy import Column, Integer, MetaData, Table, desc, func, select
+from sqlalchemy.engine import Connection
+
+from .database import Base
+from .models.customer import Customer
+from .models.simple_work_order import SimpleWorkOrder, WorkOrderFile, WorkOrderUpdate
+from .models.work_order import Priority, WorkOrder, WorkOrderStatus
+from .services.simple_work_order_service import CARD_COLUMNS, DASHBOARD_STAGE_LIMIT, dashboard_statement
+from .services.work_order_service import PRODUCTION_QUEUE_STAGES, production_queue_criteria
+
+# Tables the seed fills - a full scan of any of these is a finding
+SEEDED_TABLES = ("customers", "work_orders", "simple_work_orders", "simple_work_order_updates", "work_order_files")
+
+# Most orders are finished, so the active stages are a small slice of the table
+WORK_ORDER_STATUS_WEIGHTS = {
+    WorkOrderStatus.DELIVERED: 70, WorkOrderStatus.CANCELLED: 8, WorkOrderStatus.SHIPPED: 6,
+    WorkOrderStatus.DRAFT: 3, WorkOrderStatus.PENDING: 3, WorkOrderStatus.APPROVED: 3,
+    WorkOrderStatus.IN_PRODUCTION: 2, WorkOrderStatus.PRODUCTION_COMPLETE: 1,
+    WorkOrderStatus.QUALITY_CHECK: 1, WorkOrderStatus.ON_HOLD: 2,
+}
+SIMPLE_STATUS_WEIGHTS = {"new_order": 10, "design": 15, "approval": 10, "print": 10, "production": 15, "shipping": 40}
+
+
+class PlanCheck(NamedTuple):
+    name: str
+    statement: Callable[[], object]
+    # Tables a full read of is the right plan (e.g. nearly every row matches and LIMIT stops early)
+    accepted_scans: Tuple[str, ...] = ()
+
+
+def plan_check_metadata() -> MetaData:
+    """Every table the checked queries touch, in one MetaData (the legacy models use separate Bases)."""
+    metadata = MetaData()
+    Table("users", metadata, Column("id", Integer, primary_key=True))
+    Customer.__table__.to_metadata(metadata)
+    WorkOrder.__table__.to_metadata(metadata)
+    for table in Base.metadata.sorted_tables:
+        table.to_metadata(metadata)
+    return metadata
+
+
+def seed(connection: Connection, rows: int = 20000, seed_value: int = 42):
+    """Insert about `rows` work orders of each kind plus customers, updates and files."""
+    rng = random.Random(seed_value)
+    start = datetime(2022, 1, 1)
+    customers = max(rows // 10, 10)
+
+    def weighted(weights: dict, count: int) -> list:
+        return rng.choices(list(weights), weights=list(weights.values()), k=count)
+
+    def moment() -> datetime:
+        return start + timedelta(minutes=rng.randrange(3 * 365 * 24 * 60))
+
+    connection.execute(Customer.__table__.insert(), [
+        {"id": i, "company_name": f"Cafe {i}", "contact_person": f"Owner {i}", "email": f"orders{i}@example.com",
+         "status": "active" if rng.random() < 0.9 else "inactive", "is_archived": rng.random() < 0.05,
+         "total_orders_count": 0, "created_at": moment(), "updated_at": moment()}
+        for i in range(1, customers + 1)
+    ])
+
+    statuses = weighted(WORK_ORDER_STATUS_WEIGHTS, rows)
+    connection.execute(WorkOrder.__table__.insert(), [
+        {"id": i, "work_order_number": f"WO{i:07d}", "customer_id": rng.randint(1, customers),
+         "product_type": "Paper Cup 12oz", "quantity": 1000, "unit_price": Decimal("0.10"), "total_amount": Decimal("100.00"),
+         "priority": rng.choice(list(Priority)), "status": statuses[i - 1], "order_date": moment(),
+         "requested_delivery_date": moment(), "actual_production_start": moment(), "actual_production_complete": moment(),
+         "is_active": rng.random() < 0.97, "created_at": moment(), "updated_at": moment()}
+        for i in range(1, rows + 1)
+    ])
+
+    # The simple board keeps a long tail of shipped orders behind the working stages
+    simple_statuses = weighted(SIMPLE_STATUS_WEIGHTS, rows)
+    connection.execute(SimpleWorkOrder.__table__.insert(), [
+        {"id": i, "customer_name": f"Cafe {i}", "customer_email": f"orders{i}@example.com",
+         "order_description": "12oz hot cups", "quantity": 1000, "status": simple_statuses[i - 1],
+         "created_at": moment(), "updated_at": moment()}
+        for i in range(1, rows + 1)
+    ])
+    connection.execute(WorkOrderUpdate.__table__.insert(), [
+        {"work_order_id": rng.randint(1, rows), "new_status": "design", "updated_by": "Sam", "updated_at": moment()}
+        for _ in range(rows * 2)
+    ])
+    connection.execute(WorkOrderFile.__table__.insert(), [
+        {"work_order_id": rng.randint(1, rows), "file_name": "logo.png", "file_path": "uploads/logo.png",
+         "file_type": "logo", "uploaded_by": "Sam", "uploaded_at": moment()}
+        for _ in range(rows)
+    ])
+
+
+def analyze(connection: Connection):
+    """Refresh planner statistics so plans reflect the seeded data."""
+    for table in SEEDED_TABLES:
+        connection.exec_driver_sql(f"ANALYZE {table}")
+
+
+def _work_order_list(*criteria):
+    """WorkOrderService.get_work_orders: first page, newest first, one extra row."""
+    work_orders = WorkOrder.__table__
+    return (
+        select(work_orders).where(*criteria)
+        .order_by(desc(work_orders.c.order_date), desc(work_orders.c.id)).limit(51)
+    )
+
+
+def plan_checks() -> List[PlanCheck]:
+    """The service queries to check, named after the method they come from."""
+    work_orders = WorkOrder.__table__
+    customers = Customer.__table__
+    checks = [
+        PlanCheck("AsyncSimpleWorkOrderService.get_dashboard_data", lambda: dashboard_statement(DASHBOARD_STAGE_LIMIT)),
+        PlanCheck("AsyncSimpleWorkOrderService.get_dashboard_cards",
+                  lambda: dashboard_statement(DASHBOARD_STAGE_LIMIT, CARD_COLUMNS)),
+        PlanCheck("AsyncSimpleWorkOrderService.get_orders_by_status",
+                  lambda: select(SimpleWorkOrder).where(SimpleWorkOrder.status == "approval")),
+        PlanCheck("AsyncSimpleWorkOrderService.get_dashboard_version",
+                  lambda: select(func.max(SimpleWorkOrder.updated_at))),
+        PlanCheck("AsyncSimpleWorkOrderService.get_order_files",
+                  lambda: select(WorkOrderFile).where(WorkOrderFile.work_order_id == 42)),
+        PlanCheck("AsyncSimpleWorkOrderService.get_order_updates",
+                  lambda: select(WorkOrderUpdate).where(WorkOrderUpdate.work_order_id == 42)
+                  .order_by(WorkOrderUpdate.updated_at.desc())),
+        PlanCheck("WorkOrderService.get_work_orders", lambda: _work_order_list()),
+        PlanCheck("WorkOrderService.get_work_orders(status)",
+                  lambda: _work_order_list(work_orders.c.status == WorkOrderStatus.PENDING)),
+        PlanCheck("WorkOrderService.get_work_orders(customer_id)",
+                  lambda: _work_order_list(work_orders.c.customer_id == 42)),
+        PlanCheck("WorkOrderService.get_work_orders(priority)",
+                  lambda: _work_order_list(work_orders.c.priority == Priority.URGENT)),
+        # ~95% of customers are not archived: walking the primary key and stopping at
+        # the page end beats any index on is_archived
+        PlanCheck("customers.get_customers",
+                  lambda: select(customers).where(customers.c.is_archived == False)
+                  .order_by(customers.c.id).offset(100).limit(50), accepted_scans=("customers",)),
+        PlanCheck("CustomerService.get_customers(status)",
+                  lambda: select(customers).where(customers.c.status == "inactive")
+                  .order_by(customers.c.id).limit(50)),
+    ]
+    for stage in PRODUCTION_QUEUE_STAGES:
+        def queue(stage=stage):
+            criteria, ordering = production_queue_criteria(stage)
+            return select(work_orders).where(*criteria).order_by(*ordering)
+        checks.append(PlanCheck(f"WorkOrderService.get_production_queue({stage})", queue))
+    return checks
+
+
+def explain(connection: Connection, statement) -> List[str]:
+    """Plan of a statement as readable lines (one per plan node)."""
+    sql = str(statement.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True}))
+    if connection.dialect.name == "postgresql":
+        plan = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}").scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        lines = []
+
+        def walk(node, depth=0):
+            relation = f" on {node['Relation Name']}" if "Relation Name" in node else ""
+            index = f" using {node['Index Name']}" if "Index Name" in node else ""
+            lines.append(f"{'  ' * depth}{node['Node Type']}{relation}{index}")
+            for child in node.get("Plans", []):
+                walk(child, depth + 1)
+
+        walk(plan[0]["Plan"])
+        return lines
+
+    return [row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")]
+
+
+_SQLITE_SCAN = re.compile(r"^SCAN (\w+)(?! USING)")
+_POSTGRES_SCAN = re.compile(r"^\s*Seq Scan on (\w+)")
+
+
+def sequential_scans(plan: List[str]) -> List[str]:
+    """Seeded tables read in full by a plan."""
+    tables = []
+    for line in plan:
+        match = _POSTGRES_SCAN.match(line) or _SQLITE_SCAN.match(line)
+        if match and match.group(1) in SEEDED_TABLES:
+            tables.append(match.group(1))
+    return tables
+
+
+def check_query_plans(connection: Connection) -> Dict[str, dict]:
+    """Name -> {"plan": [...], "seq_scans": [...]} for every check."""
+    results = {}
+    for check in plan_checks():
+        plan = explain(connection, check.statement())
+        scans = [table for table in sequential_scans(plan) if table not in check.accepted_scans]
+        results[check.name] = {"plan": plan, "seq_scans": scans}
+    return results
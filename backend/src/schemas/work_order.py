@@ -138,10 +138,12 @@ class WorkOrderDetail(WorkOrder):
 # Work order list response
 class WorkOrderListResponse(BaseModel):
     items: List[WorkOrder]
-    total: int
+    total: Optional[int] = None
+    total_is_estimate: bool = False
     page: int
     limit: int
-    pages: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None
 
 
 # Work order statistics
@@ -1,7 +1,12 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
+import asyncio
 import bcrypt
+import os
+import threading
+import time
 from fastapi import HTTPException, status
 
 # Configuration
@@ -9,6 +14,14 @@ SECRET_KEY = "your-super-secret-key-change-this-in-production"  # Change this in
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+# bcrypt work factor for new hashes; existing hashes are upgraded on next login.
+# Run calibrate_bcrypt.py to pick a value for the hardware we deploy on.
+BCRYPT_ROUNDS = min(31, max(4, int(os.getenv("BCRYPT_ROUNDS", "12"))))
+
+# bcrypt runs in its own bounded pool so logins never block the event loop
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "64"))
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash."""
@@ -21,13 +34,146 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         return False
 
 
-def get_password_hash(password: str) -> str:
+def get_password_hash(password: str, rounds: Optional[int] = None) -> str:
     """Hash a password."""
-    salt = bcrypt.gensalt(rounds=12)
+    salt = bcrypt.gensalt(rounds=rounds or BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
     return hashed.decode('utf-8')
 
 
+def hash_rounds(hashed_password: str) -> Optional[int]:
+    """Cost factor of a bcrypt hash ("$2b$12$..." -> 12), or None if unrecognised."""
+    parts = (hashed_password or "").split("$")
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
+def needs_rehash(hashed_password: str, rounds: Optional[int] = None) -> bool:
+    """True when a stored hash was made with a different cost than the target."""
+    return hash_rounds(hashed_password) != (rounds or BCRYPT_ROUNDS)
+
+
+def measure_hash_time(rounds: int, samples: int = 3) -> float:
+    """Median milliseconds for one bcrypt hash at the given cost on this machine."""
+    timings = []
+    for _ in range(samples):
+        started_at = time.perf_counter()
+        bcrypt.hashpw(b"calibration-password", bcrypt.gensalt(rounds=rounds))
+        timings.append((time.perf_counter() - started_at) * 1000)
+    timings.sort()
+    return timings[len(timings) // 2]
+
+
+def recommend_rounds(timings: dict, target_ms: float) -> int:
+    """Highest measured cost whose hash time fits the latency budget (lowest cost if none fit)."""
+    fitting = [rounds for rounds, elapsed_ms in timings.items() if elapsed_ms <= target_ms]
+    return max(fitting) if fitting else min(timings)
+
+
+class PasswordHashBusy(Exception):
+    """Raised when too many password hashes are already waiting."""
+
+
+class PasswordHashPool:
+    """Bounded worker pool for bcrypt with queue-depth limits and timing stats.
+
+    bcrypt releases the GIL while hashing, so threads give real parallelism
+    without the start-up and pickling cost of a process pool.
+    """
+
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, max_queue: int = PASSWORD_HASH_MAX_QUEUE):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_hash_time = 0.0
+        self.max_hash_time = 0.0
+        self.total_queue_time = 0.0
+        self.max_queue_time = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+        return self._executor
+
+    def _record(self, queue_time: float, hash_time: float):
+        with self._lock:
+            self.completed += 1
+            self.total_queue_time += queue_time
+            self.max_queue_time = max(self.max_queue_time, queue_time)
+            self.total_hash_time += hash_time
+            self.max_hash_time = max(self.max_hash_time, hash_time)
+
+    async def run(self, func, *args):
+        """Run a hashing function in the pool, rejecting work past the queue limit."""
+        with self._lock:
+            if self._pending >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise PasswordHashBusy("Too many password checks in progress")
+            self._pending += 1
+
+        submitted_at = time.perf_counter()
+
+        def timed_call():
+            started_at = time.perf_counter()
+            try:
+                return func(*args)
+            finally:
+                self._record(started_at - submitted_at, time.perf_counter() - started_at)
+
+        try:
+            future = self._get_executor().submit(timed_call)
+        except BaseException:
+            self._release()
+            raise
+        # Released when the hash really ends (or is cancelled before starting), not when the
+        # caller stops waiting - a disconnected login's bcrypt call still occupies a worker
+        future.add_done_callback(lambda _: self._release())
+        return await asyncio.wrap_future(future)
+
+    def _release(self):
+        with self._lock:
+            self._pending -= 1
+
+    @property
+    def queue_depth(self) -> int:
+        """Hashes waiting for a free worker."""
+        return max(0, self._pending - self.workers)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            completed = self.completed
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "in_flight": self._pending,
+                "queue_depth": max(0, self._pending - self.workers),
+                "completed": completed,
+                "rejected": self.rejected,
+                "avg_hash_ms": round(self.total_hash_time * 1000 / completed, 3) if completed else 0.0,
+                "max_hash_ms": round(self.max_hash_time * 1000, 3),
+                "avg_queue_ms": round(self.total_queue_time * 1000 / completed, 3) if completed else 0.0,
+                "max_queue_ms": round(self.max_queue_time * 1000, 3)
+            }
+
+
+password_hash_pool = PasswordHashPool()
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password in the hashing pool (raises PasswordHashBusy when saturated)."""
+    return await password_hash_pool.run(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password in the hashing pool (raises PasswordHashBusy when saturated)."""
+    return await password_hash_pool.run(get_password_hash, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token."""
     to_encode = data.copy()
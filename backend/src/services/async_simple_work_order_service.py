@@ -0,0 +1,206 @@
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, List, Optional
+from datetime import datetime
+
+from ..models.simple_work_order import FileBlob, FilePreviewJob, SimpleWorkOrder, WorkOrderFile, WorkOrderUpdate
+from .blob_store import acquire_blob_statement, release_blob_statement
+from .file_previews import enqueue_preview
+from .simple_work_order_service import (
+    CARD_COLUMNS, DASHBOARD_STAGE_LIMIT, VALID_STATUSES, dashboard_statement, group_by_stage
+)
+from .work_order_events import event_hub, work_order_event
+
+
+class AsyncSimpleWorkOrderService:
+    """Work order operations for the simple workflow routers."""
+
+    VALID_STATUSES = VALID_STATUSES
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def _get_order(self, work_order_id: int) -> SimpleWorkOrder:
+        work_order = await self.db.get(SimpleWorkOrder, work_order_id)
+        if not work_order:
+            raise ValueError("Work order not found")
+        return work_order
+
+    async def create_work_order(self, customer_name: str, customer_email: str, order_description: str,
+                                quantity: int, special_notes: str = None, delivery_date: datetime = None) -> SimpleWorkOrder:
+        """Create a new work order - super simple."""
+        work_order = SimpleWorkOrder(
+            customer_name=customer_name,
+            customer_email=customer_email,
+            order_description=order_description,
+            quantity=quantity,
+            special_notes=special_notes,
+            delivery_date=delivery_date,
+            status="new_order"
+        )
+
+        self.db.add(work_order)
+        await self.db.commit()
+        await self.db.refresh(work_order)
+
+        await event_hub.publish_async(work_order_event("created", work_order.id, status=work_order.status))
+        return work_order
+
+    async def get_all_orders(self) -> List[SimpleWorkOrder]:
+        """Get all orders with their current status."""
+        result = await self.db.scalars(select(SimpleWorkOrder).order_by(SimpleWorkOrder.created_at.desc()))
+        return result.all()
+
+    async def get_orders_by_status(self, status: str) -> List[SimpleWorkOrder]:
+        """Get orders by specific status."""
+        result = await self.db.scalars(select(SimpleWorkOrder).where(SimpleWorkOrder.status == status))
+        return result.all()
+
+    async def claim_task(self, work_order_id: int, person_name: str) -> SimpleWorkOrder:
+        """Someone clicks button to take responsibility for this stage."""
+        work_order = await self._get_order(work_order_id)
+
+        work_order.assigned_to = person_name
+        work_order.assigned_at = datetime.utcnow()
+
+        await self.db.commit()
+        await self.db.refresh(work_order)
+
+        await event_hub.publish_async(work_order_event(
+            "claimed", work_order.id, status=work_order.status, assigned_to=work_order.assigned_to
+        ))
+        return work_order
+
+    async def update_status(self, work_order_id: int, new_status: str, notes: str = None, updated_by: str = None) -> SimpleWorkOrder:
+        """Update work order status and create update record."""
+        work_order = await self._get_order(work_order_id)
+
+        old_status = work_order.status
+        work_order.status = new_status
+        work_order.updated_at = datetime.utcnow()
+
+        # If moving to next stage, clear assignment
+        if new_status != old_status:
+            work_order.assigned_to = None
+            work_order.assigned_at = None
+
+        # Create update record
+        self.db.add(WorkOrderUpdate(
+            work_order_id=work_order_id,
+            old_status=old_status,
+            new_status=new_status,
+            notes=notes,
+            updated_by=updated_by or "System"
+        ))
+
+        await self.db.commit()
+        await self.db.refresh(work_order)
+
+        await event_hub.publish_async(work_order_event(
+            "status", work_order.id, status=work_order.status, old_status=old_status
+        ))
+        return work_order
+
+    async def add_file(self, work_order_id: int, file_name: str, file_path: str, file_type: str, uploaded_by: str,
+                       blob_sha256: str = None, file_size: int = None) -> WorkOrderFile:
+        """Add a file to work order (taking a reference on its blob when stored by hash)."""
+        work_order_file = WorkOrderFile(
+            work_order_id=work_order_id,
+            file_name=file_name,
+            file_path=file_path,
+            file_type=file_type,
+            uploaded_by=uploaded_by,
+            blob_sha256=blob_sha256,
+            file_size=file_size
+        )
+
+        if blob_sha256:
+            await self.db.execute(acquire_blob_statement(self.db.get_bind().dialect.name, blob_sha256, file_size))
+        self.db.add(work_order_file)
+        # Workers are woken by the caller once the bytes are in place (see preview_worker.notify)
+        enqueue_preview(self.db, work_order_file)
+        await self.db.commit()
+        await self.db.refresh(work_order_file)
+
+        await event_hub.publish_async(work_order_event(
+            "upload", work_order_id, file_id=work_order_file.id, file_type=file_type
+        ))
+        return work_order_file
+
+    async def get_order_files(self, work_order_id: int) -> List[WorkOrderFile]:
+        """Get all files for a work order."""
+        result = await self.db.scalars(select(WorkOrderFile).where(WorkOrderFile.work_order_id == work_order_id))
+        return result.all()
+
+    async def get_file(self, work_order_id: int, file_id: int) -> WorkOrderFile:
+        work_order_file = await self.db.get(WorkOrderFile, file_id)
+        if not work_order_file or work_order_file.work_order_id != work_order_id:
+            raise ValueError("File not found")
+        return work_order_file
+
+    async def delete_file(self, work_order_id: int, file_id: int) -> WorkOrderFile:
+        """Detach a file; its blob is released, a pre-blob-store file is returned for the caller to remove."""
+        work_order_file = await self.get_file(work_order_id, file_id)
+
+        if work_order_file.blob_sha256:
+            await self.db.execute(release_blob_statement(work_order_file.blob_sha256))
+        await self.db.execute(delete(FilePreviewJob).where(FilePreviewJob.file_id == work_order_file.id))
+        await self.db.delete(work_order_file)
+        await self.db.commit()
+        return work_order_file
+
+    async def get_preview_jobs(self, file_ids: List[int]) -> Dict[int, FilePreviewJob]:
+        """Preview job per file id (files that are not images have none)."""
+        if not file_ids:
+            return {}
+        result = await self.db.scalars(select(FilePreviewJob).where(FilePreviewJob.file_id.in_(file_ids)))
+        return {job.file_id: job for job in result}
+
+    async def get_blob(self, sha256: str) -> Optional[FileBlob]:
+        return await self.db.get(FileBlob, sha256)
+
+    async def get_order_updates(self, work_order_id: int) -> List[WorkOrderUpdate]:
+        """Get all updates for a work order."""
+        result = await self.db.scalars(
+            select(WorkOrderUpdate)
+            .where(WorkOrderUpdate.work_order_id == work_order_id)
+            .order_by(WorkOrderUpdate.updated_at.desc())
+        )
+        return result.all()
+
+    async def notify_design_ready(self, work_order_id: int) -> SimpleWorkOrder:
+        """Notify order creator that design is ready for client approval."""
+        work_order = await self._get_order(work_order_id)
+
+        work_order.order_creator_notified = True
+        work_order.last_notification = datetime.utcnow()
+
+        await self.db.commit()
+        await self.db.refresh(work_order)
+        return work_order
+
+    async def get_dashboard_data(self, per_stage_limit: Optional[int] = None) -> dict:
+        """Get dashboard data for every stage in one query."""
+        if per_stage_limit is None:
+            per_stage_limit = DASHBOARD_STAGE_LIMIT
+
+        result = await self.db.scalars(dashboard_statement(per_stage_limit))
+        return group_by_stage(result.all())
+
+    async def get_dashboard_version(self) -> tuple:
+        """Cheap change token for the dashboard: (order count, latest updated_at)."""
+        stmt = select(func.count(SimpleWorkOrder.id), func.max(SimpleWorkOrder.updated_at))
+        count, last_updated = (await self.db.execute(stmt)).one()
+        return count, last_updated
+
+    async def get_dashboard_cards(self, per_stage_limit: Optional[int] = None) -> dict:
+        """Get dashboard card view - plain dicts, no ORM entities."""
+        if per_stage_limit is None:
+            per_stage_limit = DASHBOARD_STAGE_LIMIT
+
+        rows = (await self.db.execute(dashboard_statement(per_stage_limit, CARD_COLUMNS))).all()
+        sections = group_by_stage(rows)
+        return {section: [row._asdict() for row in cards] for section, cards in sections.items()}
+
+    def is_valid_status(self, status: str) -> bool:
+        return status in self.VALID_STATUSES
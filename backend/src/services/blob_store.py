@@ -0,0 +1,233 @@
+"""
+Content-addressed storage for work order files.
+
+Each distinct file is stored once at BLOB_DIR/ab/cd/<sha256>, however many
+work orders it is attached to. file_blobs.ref_count counts the
+work_order_files rows pointing at a blob. A reorder that re-sends the same
+logo costs one row, not another copy, and a client that already knows the
+hash can attach a stored file without uploading it at all.
+
+Ordering rule that keeps files safe from the garbage collector: a writer
+commits its reference first and only then makes sure the file is on disk.
+The collector deletes unreferenced rows first and, before unlinking, checks
+again that no new reference appeared.
+"""
+
+import asyncio
+import logging
+import os
+import re
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, Optional, Tuple
+
+from sqlalchemy import and_, exists, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from ..models.simple_work_order import FileBlob, WorkOrderFile
+from .file_uploads import UPLOAD_DIR, UPLOAD_MAX_BYTES, StoredUpload, remove_quietly, save_upload, sha256_file
+
+logger = logging.getLogger(__name__)
+
+# Where blobs live (fan-out by the first two hash bytes)
+BLOB_DIR = os.getenv("BLOB_DIR", os.path.join(UPLOAD_DIR, "blobs"))
+
+# Unreferenced blobs and stray temp files younger than this are left alone by the GC
+BLOB_GC_GRACE_SECONDS = int(os.getenv("BLOB_GC_GRACE_SECONDS", "3600"))
+
+blobs_table = FileBlob.__table__
+files_table = WorkOrderFile.__table__
+
+_SHA256 = re.compile(r"[0-9a-f]{64}")
+
+
+def is_sha256(value: Optional[str]) -> bool:
+    return bool(value) and bool(_SHA256.fullmatch(value))
+
+
+def acquire_blob_statement(dialect_name: str, sha256: str, size: int, now: datetime = None):
+    """Upsert adding one reference to a blob (creates the row on first use)."""
+    now = now or datetime.utcnow()
+    insert = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}[dialect_name]
+    stmt = insert(blobs_table).values(sha256=sha256, size=size, ref_count=1, created_at=now, last_used_at=now)
+    return stmt.on_conflict_do_update(
+        index_elements=[blobs_table.c.sha256],
+        set_={"ref_count": blobs_table.c.ref_count + 1, "last_used_at": now}
+    )
+
+
+def release_blob_statement(sha256: str, now: datetime = None):
+    """Drop one reference; the row stays until the GC finds it unreferenced."""
+    return (
+        blobs_table.update()
+        .where(blobs_table.c.sha256 == sha256)
+        .values(ref_count=blobs_table.c.ref_count - 1, last_used_at=now or datetime.utcnow())
+    )
+
+
+class BlobStore:
+    """Files on disk, named by their SHA-256."""
+
+    def __init__(self, directory: str = None):
+        self.directory = directory or BLOB_DIR
+
+    @property
+    def temp_directory(self) -> str:
+        return os.path.join(self.directory, "tmp")
+
+    def path_for(self, sha256: str) -> str:
+        if not is_sha256(sha256):
+            raise ValueError(f"Not a SHA-256 hex digest: {sha256!r}")
+        return os.path.join(self.directory, sha256[:2], sha256[2:4], sha256)
+
+    def preview_path(self, sha256: str) -> str:
+        """Where the rendered preview of a blob lives (removed together with the blob)."""
+        if not is_sha256(sha256):
+            raise ValueError(f"Not a SHA-256 hex digest: {sha256!r}")
+        return os.path.join(self.directory, "previews", sha256[:2], f"{sha256}.webp")
+
+    def exists(self, sha256: str) -> bool:
+        return os.path.exists(self.path_for(sha256))
+
+    def temp_path(self) -> str:
+        """A fresh path on the blob filesystem, so adopt() is a rename and not a copy."""
+        return os.path.join(self.temp_directory, uuid.uuid4().hex)
+
+    async def receive(self, upload, max_bytes: int = UPLOAD_MAX_BYTES) -> StoredUpload:
+        """Stream an UploadFile into a temp file; pass the result to adopt() once referenced."""
+        return await save_upload(upload, self.temp_path(), max_bytes=max_bytes)
+
+    def adopt(self, source_path: str, sha256: str) -> str:
+        """Move a file with known hash into place; a duplicate is just deleted (blocking)."""
+        path = self.path_for(sha256)
+        if os.path.exists(path):
+            remove_quietly(source_path)
+            return path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(source_path, path)
+        return path
+
+    async def adopt_async(self, source_path: str, sha256: str) -> str:
+        return await asyncio.to_thread(self.adopt, source_path, sha256)
+
+    def iter_blobs(self) -> Iterator[Tuple[str, str]]:
+        """(sha256, path) for every blob file on disk."""
+        if not os.path.isdir(self.directory):
+            return
+        for root, _, names in os.walk(self.directory):
+            if root == self.temp_directory:
+                continue
+            for name in names:
+                if is_sha256(name):
+                    yield name, os.path.join(root, name)
+
+
+blob_store = BlobStore()
+
+
+def _referenced(db: Session, sha256: str) -> bool:
+    """A blob row with references, or any file row still pointing at it."""
+    row = db.execute(select(blobs_table.c.ref_count).where(blobs_table.c.sha256 == sha256)).first()
+    if row is not None and row.ref_count > 0:
+        return True
+    return db.execute(select(exists().where(files_table.c.blob_sha256 == sha256))).scalar()
+
+
+def collect_garbage(db: Session, store: BlobStore = None, grace_seconds: int = BLOB_GC_GRACE_SECONDS,
+                    dry_run: bool = False, now: float = None) -> Dict[str, int]:
+    """Delete unreferenced blobs, blob files with no row, and stale temp files.
+
+    Returns counts: blobs, orphans, temp_files, bytes.
+    """
+    store = store or blob_store
+    now = now or time.time()
+    cutoff = datetime.utcfromtimestamp(now) - timedelta(seconds=grace_seconds)
+    report = {"blobs": 0, "orphans": 0, "temp_files": 0, "bytes": 0}
+
+    unreferenced = and_(
+        blobs_table.c.ref_count <= 0,
+        blobs_table.c.last_used_at < cutoff,
+        ~exists().where(files_table.c.blob_sha256 == blobs_table.c.sha256)
+    )
+    candidates = {row.sha256 for row in db.execute(select(blobs_table.c.sha256).where(unreferenced))}
+    if candidates and not dry_run:
+        # The WHERE is re-checked at delete time, so a reference taken meanwhile keeps its row
+        db.execute(blobs_table.delete().where(unreferenced, blobs_table.c.sha256.in_(candidates)))
+        db.commit()
+
+    known = set(db.execute(select(blobs_table.c.sha256)).scalars())
+    if dry_run:
+        known -= candidates
+    for sha256, path in store.iter_blobs():
+        if sha256 in known:
+            continue
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        kind = "blobs" if sha256 in candidates else "orphans"
+        if kind == "orphans" and now - stat.st_mtime < grace_seconds:
+            continue  # An upload may be between committing its row and our snapshot of the table
+
+        if not dry_run:
+            # Park the file, then look again - a writer that referenced it in the meantime
+            # either still finds it here or re-creates it from its own copy
+            parked = f"{path}.gc"
+            os.replace(path, parked)
+            db.rollback()  # fresh snapshot
+            if _referenced(db, sha256):
+                os.replace(parked, path)
+                continue
+            remove_quietly(parked)
+            remove_quietly(store.preview_path(sha256))
+        report[kind] += 1
+        report["bytes"] += stat.st_size
+
+    if os.path.isdir(store.temp_directory):
+        for name in os.listdir(store.temp_directory):
+            path = os.path.join(store.temp_directory, name)
+            if now - os.path.getmtime(path) > grace_seconds:
+                report["temp_files"] += 1
+                if not dry_run:
+                    remove_quietly(path)
+
+    logger.info(f"Blob GC{' (dry run)' if dry_run else ''}: {report}")
+    return report
+
+
+def adopt_legacy_files(db: Session, store: BlobStore = None) -> Dict[str, int]:
+    """Move files uploaded before the blob store into it, merging duplicates.
+
+    Returns counts: files, deduplicated, missing, bytes_saved.
+    """
+    store = store or blob_store
+    dialect_name = db.get_bind().dialect.name
+    report = {"files": 0, "deduplicated": 0, "missing": 0, "bytes_saved": 0}
+
+    rows = db.execute(
+        select(files_table.c.id, files_table.c.file_path).where(files_table.c.blob_sha256.is_(None))
+    ).all()
+    for row in rows:
+        if not os.path.exists(row.file_path):
+            report["missing"] += 1
+            continue
+
+        sha256 = sha256_file(row.file_path)
+        size = os.path.getsize(row.file_path)
+        already_stored = store.exists(sha256)
+
+        db.execute(acquire_blob_statement(dialect_name, sha256, size))
+        db.execute(
+            files_table.update().where(files_table.c.id == row.id)
+            .values(blob_sha256=sha256, file_size=size, file_path=store.path_for(sha256))
+        )
+        db.commit()
+        store.adopt(row.file_path, sha256)
+
+        report["files"] += 1
+        if already_stored:
+            report["deduplicated"] += 1
+            report["bytes_saved"] += size
+    return report
@@ -3,6 +3,11 @@ from sqlalchemy.exc import IntegrityError
 from typing import List, Optional
 from ..models.customer import Customer
 from ..schemas.customer import CustomerCreate, CustomerUpdate
+from .search import text_search
+from .customer_typeahead import customer_typeahead
+
+# Columns customer search matches, most important first
+CUSTOMER_SEARCH_COLUMNS = (Customer.company_name, Customer.contact_person, Customer.email, Customer.city)
 
 
 class CustomerService:
@@ -39,6 +44,7 @@ class CustomerService:
             self.db.add(db_customer)
             self.db.commit()
             self.db.refresh(db_customer)
+            customer_typeahead.upsert(db_customer)
             return db_customer
         except IntegrityError:
             self.db.rollback()
@@ -57,16 +63,12 @@ class CustomerService:
     ) -> tuple[List[Customer], int]:
         """Get a list of customers with optional search and filtering"""
         query = self.db.query(Customer)
+        rank = None
         
         # Apply search filter if provided
         if search:
-            search_filter = f"%{search}%"
-            query = query.filter(
-                (Customer.company_name.ilike(search_filter)) |
-                (Customer.contact_person.ilike(search_filter)) |
-                (Customer.email.ilike(search_filter)) |
-                (Customer.city.ilike(search_filter))
-            )
+            search_filter, rank = text_search(self.db.get_bind().dialect.name, CUSTOMER_SEARCH_COLUMNS, search)
+            query = query.filter(search_filter)
         
         # Apply status filter if provided
         if status and status != 'all':
@@ -75,6 +77,12 @@ class CustomerService:
         # Get total count
         total = query.count()
         
+        # Best matches first when searching
+        if rank is not None:
+            query = query.order_by(rank.desc(), Customer.id)
+        else:
+            query = query.order_by(Customer.id)  # stable pages
+        
         # Apply pagination
         customers = query.offset(skip).limit(limit).all()
         
@@ -105,6 +113,7 @@ class CustomerService:
         try:
             self.db.commit()
             self.db.refresh(db_customer)
+            customer_typeahead.upsert(db_customer)
             return db_customer
         except IntegrityError:
             self.db.rollback()
@@ -127,6 +136,7 @@ class CustomerService:
 
         try:
             self.db.commit()
+            customer_typeahead.remove(customer_id)
             return True
         except Exception:
             self.db.rollback()
@@ -0,0 +1,170 @@
+"""
+In-memory typeahead index for customer autocomplete.
+
+Every word of company_name, contact_person and email is kept in one sorted
+token list, so a prefix lookup is a bisect plus a short scan. No database
+round trip happens per keystroke. CustomerService keeps the index current on
+create/update/archive. Each worker also rebuilds it every
+CUSTOMER_TYPEAHEAD_REFRESH seconds to pick up writes made by other workers.
+"""
+
+import bisect
+import heapq
+import logging
+import os
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from ..models.customer import Customer
+
+logger = logging.getLogger(__name__)
+
+# Seconds before a worker reloads the index from the database (0 = never)
+CUSTOMER_TYPEAHEAD_REFRESH = float(os.getenv("CUSTOMER_TYPEAHEAD_REFRESH", "300"))
+
+# Field weights - a company name match beats a contact match beats an email match
+FIELD_WEIGHTS = {"company_name": 3, "contact_person": 2, "email": 1}
+
+# Tokens examined per query word - bounds one- and two-letter lookups on large books
+MAX_PREFIX_SCAN = int(os.getenv("CUSTOMER_TYPEAHEAD_MAX_SCAN", "2000"))
+
+_WORD = re.compile(r"[^\W_]+")
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lowercase words of a field ("orders@blue-bottle.com" -> orders, blue, bottle, com)."""
+    return _WORD.findall((text or "").lower())
+
+
+def field_tokens(company_name: str, contact_person: str, email: str) -> Dict[str, int]:
+    """Token -> best field weight for one customer; the full email is a token too."""
+    tokens = {}
+    for field, text in (("company_name", company_name), ("contact_person", contact_person), ("email", email)):
+        words = tokenize(text)
+        if field == "email" and email:
+            words.append(email.lower())
+        for word in words:
+            tokens[word] = max(tokens.get(word, 0), FIELD_WEIGHTS[field])
+    return tokens
+
+
+class CustomerTypeahead:
+    """Prefix index over customer names, contacts and emails."""
+
+    def __init__(self, refresh_seconds: float = CUSTOMER_TYPEAHEAD_REFRESH):
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.RLock()
+        self._build_lock = threading.Lock()  # one rebuild at a time; lookups keep using the old index
+        self._tokens: List[Tuple[str, int, int]] = []  # sorted (token, customer id, field weight)
+        self._customers: Dict[int, dict] = {}
+        self._built_at: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._customers)
+
+    @property
+    def is_stale(self) -> bool:
+        if self._built_at is None:
+            return True
+        return bool(self.refresh_seconds) and time.monotonic() - self._built_at > self.refresh_seconds
+
+    def build(self, db: Session):
+        """Load every active customer; replaces the current index in one swap."""
+        started_at = time.perf_counter()
+        rows = db.query(
+            Customer.id, Customer.company_name, Customer.contact_person, Customer.email
+        ).filter(Customer.is_archived.isnot(True)).all()
+
+        customers, tokens = {}, []
+        for row in rows:
+            customers[row.id] = row._asdict()
+            for token, weight in field_tokens(row.company_name, row.contact_person, row.email).items():
+                tokens.append((token, row.id, weight))
+        tokens.sort()
+
+        with self._lock:
+            self._customers = customers
+            self._tokens = tokens
+            self._built_at = time.monotonic()
+        logger.info(f"Customer typeahead built: {len(customers)} customers in {(time.perf_counter() - started_at) * 1000:.1f}ms")
+
+    def ensure_built(self, db: Session):
+        if self.is_stale:
+            with self._build_lock:
+                if self.is_stale:
+                    self.build(db)
+
+    def upsert(self, customer: Customer):
+        """Add or re-index one customer (archived customers are removed)."""
+        if customer.is_archived:
+            self.remove(customer.id)
+            return
+
+        with self._lock:
+            if self._built_at is None:
+                return  # Not loaded yet - the first build picks this customer up
+            self._remove_tokens(customer.id)
+            self._customers[customer.id] = {
+                "id": customer.id,
+                "company_name": customer.company_name,
+                "contact_person": customer.contact_person,
+                "email": customer.email
+            }
+            for token, weight in field_tokens(customer.company_name, customer.contact_person, customer.email).items():
+                bisect.insort(self._tokens, (token, customer.id, weight))
+
+    def remove(self, customer_id: int):
+        with self._lock:
+            self._remove_tokens(customer_id)
+            self._customers.pop(customer_id, None)
+
+    def _remove_tokens(self, customer_id: int):
+        existing = self._customers.get(customer_id)
+        if not existing:
+            return
+        for token in field_tokens(existing["company_name"], existing["contact_person"], existing["email"]):
+            position = bisect.bisect_left(self._tokens, (token, customer_id))
+            if position < len(self._tokens) and self._tokens[position][:2] == (token, customer_id):
+                del self._tokens[position]
+
+    def _prefix_matches(self, prefix: str) -> Dict[int, int]:
+        """Customer id -> score for every token starting with prefix."""
+        matches = {}
+        tokens = self._tokens
+        start = bisect.bisect_left(tokens, (prefix,))
+        for position in range(start, min(len(tokens), start + MAX_PREFIX_SCAN)):
+            token, customer_id, weight = tokens[position]
+            if not token.startswith(prefix):
+                break
+            # Whole-word matches rank above partial ones
+            score = weight * 2 if token == prefix else weight
+            if score > matches.get(customer_id, 0):
+                matches[customer_id] = score
+        return matches
+
+    def suggest(self, query: str, limit: int = 10) -> List[dict]:
+        """Top customers whose words start with every word of query."""
+        words = tokenize(query)
+        if not words:
+            return []
+
+        with self._lock:
+            # Most selective word first keeps the intersection small
+            candidates = sorted((self._prefix_matches(word) for word in words), key=len)
+            scores = candidates[0]
+            for matches in candidates[1:]:
+                scores = {customer_id: score + matches[customer_id]
+                          for customer_id, score in scores.items() if customer_id in matches}
+
+            best = heapq.nsmallest(
+                limit, scores.items(),
+                key=lambda item: (-item[1], (self._customers[item[0]]["company_name"] or "").lower(), item[0])
+            )
+            return [dict(self._customers[customer_id], score=score) for customer_id, score in best]
+
+
+customer_typeahead = CustomerTypeahead()
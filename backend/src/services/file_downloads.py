@@ -0,0 +1,170 @@
+"""
+Work order file downloads.
+
+Files are sent straight from disk with single-range support (RFC 9110) so
+large artwork can be resumed, plus strong ETags and cache headers. A blob's
+ETag is its SHA-256, so its content can never change under that validator.
+The body never sits in Python memory as a whole. It is handed to the server
+with the ASGI zero-copy send extension when the server offers it, or to nginx
+via X-Accel-Redirect when DOWNLOAD_ACCEL_REDIRECT is set. Otherwise it is read
+in DOWNLOAD_CHUNK_SIZE pieces off the event loop.
+"""
+
+import asyncio
+import os
+from email.utils import formatdate
+from mimetypes import guess_type
+from typing import Optional, Tuple
+from urllib.parse import quote
+
+from starlette.responses import Response
+
+from .blob_store import BLOB_DIR
+
+# Bytes read per send when the server has no zero-copy support
+DOWNLOAD_CHUNK_SIZE = int(os.getenv("DOWNLOAD_CHUNK_SIZE", str(1024 * 1024)))
+
+# nginx "internal" location aliased to BLOB_DIR (e.g. /protected-blobs/) - nginx then
+# serves blob downloads itself with sendfile; empty = Python sends the bytes
+DOWNLOAD_ACCEL_REDIRECT = os.getenv("DOWNLOAD_ACCEL_REDIRECT", "")
+
+# A blob never changes, so browsers may keep it; legacy files are revalidated every time
+IMMUTABLE_CACHE_CONTROL = "private, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "private, no-cache"
+
+
+class RangeNotSatisfiable(ValueError):
+    """The Range header does not overlap the file."""
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Inclusive (start, end) for a single "bytes=" range, None to send the whole file.
+
+    Malformed and multi-range headers are ignored (a full 200 is always allowed);
+    a range starting past the end raises RangeNotSatisfiable.
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    first, _, last = header[len("bytes="):].strip().partition("-")
+    try:
+        start = int(first) if first else None
+        end = int(last) if last else None
+    except ValueError:
+        return None
+    if end is not None and end < 0:
+        return None
+
+    if start is None:
+        if end is None:
+            return None
+        if end == 0 or size == 0:
+            raise RangeNotSatisfiable(header)
+        return max(size - end, 0), size - 1  # bytes=-500: the final 500 bytes
+    if start < 0 or (end is not None and end < start):
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable(header)
+    return start, size - 1 if end is None else min(end, size - 1)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header (single, list or *) against our ETag."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+
+
+def content_disposition(file_name: str, disposition: str = "attachment") -> str:
+    quoted = quote(file_name)
+    if quoted != file_name:
+        return f"{disposition}; filename*=utf-8''{quoted}"
+    return f'{disposition}; filename="{file_name}"'
+
+
+class FileRangeResponse(Response):
+    """Sends bytes start..end of a file without loading it into memory."""
+
+    def __init__(self, path: str, start: int, end: int, status_code: int, headers: dict,
+                 send_header_only: bool = False):
+        self.path = path
+        self.start = start
+        self.length = end - start + 1
+        self.send_header_only = send_header_only
+        super().__init__(status_code=status_code, headers=headers)
+
+    def init_headers(self, headers=None):
+        super().init_headers(headers)
+        # Response only sets content-length from a body; ours comes from the range
+        self.raw_headers = [(k, v) for k, v in self.raw_headers if k != b"content-length"]
+        self.raw_headers.append((b"content-length", str(self.length).encode("latin-1")))
+
+    async def __call__(self, scope, receive, send):
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if self.send_header_only or self.length == 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        handle = await asyncio.to_thread(open, self.path, "rb")
+        try:
+            if "http.response.zerocopysend" in scope.get("extensions", {}):
+                await send({"type": "http.response.zerocopysend", "file": handle,
+                            "offset": self.start, "count": self.length, "more_body": False})
+                return
+
+            position, remaining = self.start, self.length
+            while remaining:
+                chunk = await asyncio.to_thread(os.pread, handle.fileno(), min(DOWNLOAD_CHUNK_SIZE, remaining), position)
+                if not chunk:
+                    raise RuntimeError(f"{self.path} shrank while being sent")
+                position += len(chunk)
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+        finally:
+            await asyncio.to_thread(handle.close)
+
+
+def file_download_response(path: str, file_name: str, stat_result: os.stat_result, blob_sha256: Optional[str] = None,
+                           method: str = "GET", range_header: Optional[str] = None, if_range: Optional[str] = None,
+                           if_none_match: Optional[str] = None, disposition: str = "attachment") -> Response:
+    """Build the 200/206/304/416 response for one stored file."""
+    size = stat_result.st_size
+    if blob_sha256:
+        etag, cache_control = f'"{blob_sha256}"', IMMUTABLE_CACHE_CONTROL
+    else:
+        etag, cache_control = f'"{stat_result.st_mtime_ns:x}-{size:x}"', REVALIDATE_CACHE_CONTROL
+
+    headers = {
+        "etag": etag,
+        "cache-control": cache_control,
+        "last-modified": formatdate(stat_result.st_mtime, usegmt=True),
+        "accept-ranges": "bytes",
+        "content-disposition": content_disposition(file_name, disposition),
+        "content-type": guess_type(file_name)[0] or "application/octet-stream"
+    }
+
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={key: headers[key] for key in ("etag", "cache-control", "last-modified")})
+
+    if blob_sha256 and DOWNLOAD_ACCEL_REDIRECT:
+        # nginx applies Range/If-Range itself; it keeps our Content-Type/Disposition and Cache-Control
+        relative = os.path.relpath(path, BLOB_DIR).replace(os.sep, "/")
+        headers["x-accel-redirect"] = DOWNLOAD_ACCEL_REDIRECT.rstrip("/") + "/" + quote(relative)
+        return Response(status_code=200, headers=headers)
+
+    # If-Range: only honour the range when the client's copy is still current
+    if if_range and if_range.strip() != etag:
+        range_header = None
+    try:
+        requested = parse_range(range_header, size)
+    except RangeNotSatisfiable:
+        return Response(status_code=416, headers={"content-range": f"bytes */{size}", "accept-ranges": "bytes"})
+
+    send_header_only = method.upper() == "HEAD"
+    if requested is None:
+        return FileRangeResponse(path, 0, size - 1, 200, headers, send_header_only)
+
+    start, end = requested
+    headers["content-range"] = f"bytes {start}-{end}/{size}"
+    return FileRangeResponse(path, start, end, 206, headers, send_header_only)
@@ -0,0 +1,255 @@
+"""
+Background preview images for uploaded artwork.
+
+Adding an image file to a work order inserts a file_preview_jobs row in the
+same transaction, so the upload request only pays for one extra INSERT.
+PreviewWorker runs PREVIEW_WORKERS loops in each app process. Each loop claims
+one job at a time, renders a small WebP on a thread and records the result.
+Jobs survive restarts. Several processes can share the table: a claim is a
+conditional UPDATE, and a job whose worker died is picked up again after
+PREVIEW_JOB_TIMEOUT. Failures are retried with backoff, PREVIEW_MAX_ATTEMPTS
+times.
+
+Rendering needs Pillow; without it jobs fail with a clear error and the rest
+of the app is unaffected.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import and_, or_, select
+from sqlalchemy.orm import Session
+
+from ..models.simple_work_order import FilePreviewJob, WorkOrderFile
+from .blob_store import blob_store
+from .file_uploads import remove_quietly
+
+logger = logging.getLogger(__name__)
+
+# Concurrent preview renders per process (0 = do not render in this process)
+PREVIEW_WORKERS = int(os.getenv("PREVIEW_WORKERS", "2"))
+
+# Longest side of a preview, in pixels
+PREVIEW_MAX_SIZE = int(os.getenv("PREVIEW_MAX_SIZE", "320"))
+
+# Retry policy: attempts per job, first retry delay in seconds (doubles each time)
+PREVIEW_MAX_ATTEMPTS = int(os.getenv("PREVIEW_MAX_ATTEMPTS", "3"))
+PREVIEW_RETRY_SECONDS = int(os.getenv("PREVIEW_RETRY_SECONDS", "30"))
+
+# Idle workers look for new jobs this often (uploads in this process wake them at once)
+PREVIEW_POLL_SECONDS = float(os.getenv("PREVIEW_POLL_SECONDS", "10"))
+
+# A running job not finished after this many seconds is assumed orphaned and re-run
+PREVIEW_JOB_TIMEOUT = int(os.getenv("PREVIEW_JOB_TIMEOUT", "300"))
+
+# Refuse to decode images larger than this (decompression bomb guard)
+PREVIEW_MAX_PIXELS = int(os.getenv("PREVIEW_MAX_PIXELS", str(50_000_000)))
+
+PREVIEWABLE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".gif", ".webp", ".bmp", ".tif", ".tiff"}
+
+jobs_table = FilePreviewJob.__table__
+files_table = WorkOrderFile.__table__
+
+
+class PreviewUnsupported(Exception):
+    """The file cannot be previewed at all - retrying will not help."""
+
+
+def is_previewable(file_name: Optional[str]) -> bool:
+    return os.path.splitext(file_name or "")[1].lower() in PREVIEWABLE_EXTENSIONS
+
+
+def preview_path(file_id: int, blob_sha256: Optional[str] = None) -> str:
+    """Blobs share one preview per content; pre-blob-store files get one per row."""
+    if blob_sha256:
+        return blob_store.preview_path(blob_sha256)
+    return os.path.join(blob_store.directory, "previews", "files", f"{file_id}.webp")
+
+
+def enqueue_preview(db: Session, work_order_file: WorkOrderFile) -> Optional[FilePreviewJob]:
+    """Queue a preview for an image file in the caller's transaction (no commit)."""
+    if not is_previewable(work_order_file.file_name):
+        return None
+    job = FilePreviewJob(file=work_order_file, status="pending", attempts=0, run_after=datetime.utcnow())
+    db.add(job)
+    return job
+
+
+def render_preview(source_path: str, destination: str, max_size: int = PREVIEW_MAX_SIZE):
+    """Write a WebP no larger than max_size x max_size (blocking)."""
+    try:
+        from PIL import Image, ImageOps, UnidentifiedImageError
+    except ImportError:
+        raise PreviewUnsupported("Pillow is not installed")
+
+    Image.MAX_IMAGE_PIXELS = PREVIEW_MAX_PIXELS
+    partial_path = f"{destination}.part"
+    os.makedirs(os.path.dirname(destination), exist_ok=True)
+    try:
+        with Image.open(source_path) as image:
+            image.draft(image.mode, (max_size, max_size))  # JPEG: decode at a reduced scale
+            image = ImageOps.exif_transpose(image)
+            image.thumbnail((max_size, max_size))
+            if image.mode not in ("RGB", "RGBA"):
+                image = image.convert("RGBA")
+            image.save(partial_path, "WEBP", quality=80)
+        os.replace(partial_path, destination)
+    except (UnidentifiedImageError, Image.DecompressionBombError) as e:
+        raise PreviewUnsupported(str(e))
+    finally:
+        remove_quietly(partial_path)
+
+
+def claim_job(db: Session, now: datetime = None) -> Optional[dict]:
+    """Mark the next due job running and return it with its file; None when idle.
+
+    The UPDATE re-checks the claim condition, so two workers never run one job.
+    """
+    now = now or datetime.utcnow()
+    claimable = or_(
+        and_(jobs_table.c.status == "pending", jobs_table.c.run_after <= now),
+        and_(jobs_table.c.status == "running", jobs_table.c.locked_at < now - timedelta(seconds=PREVIEW_JOB_TIMEOUT))
+    )
+    candidates = db.execute(
+        select(jobs_table.c.id).where(claimable).order_by(jobs_table.c.run_after, jobs_table.c.id).limit(10)
+    ).scalars().all()
+
+    for job_id in candidates:
+        claimed = db.execute(
+            jobs_table.update()
+            .where(jobs_table.c.id == job_id, claimable)
+            .values(status="running", locked_at=now, attempts=jobs_table.c.attempts + 1, updated_at=now)
+        )
+        if claimed.rowcount == 1:
+            row = db.execute(
+                select(jobs_table.c.id, jobs_table.c.attempts, files_table.c.id.label("file_id"),
+                       files_table.c.file_path, files_table.c.blob_sha256)
+                .join(files_table, files_table.c.id == jobs_table.c.file_id)
+                .where(jobs_table.c.id == job_id)
+            ).one()
+            db.commit()
+            return row._asdict()
+    db.rollback()
+    return None
+
+
+def finish_job(db: Session, job_id: int, path: str):
+    db.execute(jobs_table.update().where(jobs_table.c.id == job_id).values(
+        status="done", preview_path=path, last_error=None, locked_at=None, updated_at=datetime.utcnow()
+    ))
+    db.commit()
+
+
+def fail_job(db: Session, job_id: int, attempts: int, error: str, retry: bool = True):
+    """Reschedule with exponential backoff, or give up after PREVIEW_MAX_ATTEMPTS."""
+    now = datetime.utcnow()
+    values = {"last_error": error[:1000], "locked_at": None, "updated_at": now}
+    if retry and attempts < PREVIEW_MAX_ATTEMPTS:
+        values.update(status="pending", run_after=now + timedelta(seconds=PREVIEW_RETRY_SECONDS * 2 ** (attempts - 1)))
+    else:
+        values.update(status="failed")
+    db.execute(jobs_table.update().where(jobs_table.c.id == job_id).values(**values))
+    db.commit()
+
+
+def process_next_job(session_factory: Callable[[], Session], renderer=render_preview) -> bool:
+    """Claim and run one job (blocking); False when nothing was due."""
+    db = session_factory()
+    try:
+        job = claim_job(db)
+        if job is None:
+            return False
+
+        path = preview_path(job["file_id"], job["blob_sha256"])
+        try:
+            if not os.path.exists(path):  # the same logo on another order is already done
+                renderer(job["file_path"], path)
+        except PreviewUnsupported as e:
+            logger.info(f"No preview for file {job['file_id']}: {e}")
+            fail_job(db, job["id"], job["attempts"], str(e), retry=False)
+        except Exception as e:
+            logger.warning(f"Preview of file {job['file_id']} failed (attempt {job['attempts']}): {e}")
+            fail_job(db, job["id"], job["attempts"], str(e))
+        else:
+            finish_job(db, job["id"], path)
+        return True
+    finally:
+        db.close()
+
+
+class PreviewWorker:
+    """Bounded pool of preview loops attached to the app's event loop."""
+
+    def __init__(self, workers: int = PREVIEW_WORKERS, poll_seconds: float = PREVIEW_POLL_SECONDS,
+                 session_factory: Callable[[], Session] = None, renderer=render_preview):
+        self.workers = workers
+        self.poll_seconds = poll_seconds
+        self.session_factory = session_factory
+        self.renderer = renderer
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._tasks: List[asyncio.Task] = []
+        self._lock = threading.Lock()
+        self.processed = 0
+        self.errors = 0
+
+    def start(self, loop: asyncio.AbstractEventLoop):
+        if self.workers <= 0 or self._tasks:
+            return
+        self._loop = loop
+        self._wakeup = asyncio.Event()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="preview")
+        self._tasks = [loop.create_task(self._run()) for _ in range(self.workers)]
+        logger.info(f"Preview worker started with {self.workers} worker(s)")
+
+    def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def notify(self):
+        """Wake idle loops - safe to call from any thread."""
+        if self._loop and self._wakeup and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def _run(self):
+        from ..database import SessionLocal
+
+        while True:
+            try:
+                processed = await self._loop.run_in_executor(
+                    self._executor, process_next_job, self.session_factory or SessionLocal, self.renderer
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Preview worker error: {e}")
+                with self._lock:
+                    self.errors += 1
+                processed = False
+
+            if processed:
+                with self._lock:
+                    self.processed += 1
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return {"workers": len(self._tasks), "processed": self.processed, "errors": self.errors}
+
+
+preview_worker = PreviewWorker()
@@ -0,0 +1,352 @@
+"""
+Streaming storage for work order file uploads.
+
+Uploads are read in fixed-size chunks, and every disk write is pushed to a
+worker thread so large artwork never blocks the event loop. A SHA-256 is
+computed while the bytes go past. Files larger than one request can handle go
+through ChunkedUploadStore: the client opens an upload, PUTs raw chunks at
+increasing offsets (resuming from the last acknowledged offset after a
+disconnect), and then completes it.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+import uuid
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+from ..metrics import upload_bytes
+
+try:
+    import fcntl
+except ImportError:  # Windows: uploads are only serialized within one process
+    fcntl = None
+
+# Where finished uploads are stored
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "uploads")
+
+# Read/write granularity - memory per in-flight upload is about one chunk
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+
+# Largest accepted file (default 512 MB)
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(512 * 1024 * 1024)))
+
+# Resumable uploads untouched for this many seconds are discarded
+UPLOAD_SESSION_TTL = int(os.getenv("UPLOAD_SESSION_TTL", str(24 * 3600)))
+
+
+class UploadTooLarge(ValueError):
+    """Raised when an upload goes past UPLOAD_MAX_BYTES."""
+
+
+@dataclass
+class StoredUpload:
+    path: str
+    size: int
+    sha256: str
+
+
+def safe_file_name(file_name: Optional[str], fallback: str = "upload") -> str:
+    """Strip directories and odd characters so a client name cannot escape UPLOAD_DIR."""
+    name = os.path.basename((file_name or "").replace("\\", "/"))
+    name = re.sub(r"[^A-Za-z0-9._ -]", "_", name).strip(" .")
+    return name or fallback
+
+
+def timestamped_path(file_name: str, directory: str = None) -> str:
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return os.path.join(directory or UPLOAD_DIR, f"{timestamp}_{safe_file_name(file_name)}")
+
+
+async def iter_upload(upload, chunk_size: int = UPLOAD_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """Yield an UploadFile's content in fixed-size chunks."""
+    while True:
+        chunk = await upload.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+async def write_stream(chunks: AsyncIterator[bytes], destination: str, max_bytes: int = UPLOAD_MAX_BYTES,
+                       mode: str = "wb", start_size: int = 0, hasher=None) -> Tuple[int, "hashlib._Hash"]:
+    """Write chunks to destination off the event loop; returns (total size, sha256 hasher).
+
+    Raises UploadTooLarge as soon as the running size passes max_bytes.
+    """
+    hasher = hasher or hashlib.sha256()
+    size = start_size
+    handle = await asyncio.to_thread(open, destination, mode)
+    try:
+        async for chunk in chunks:
+            size += len(chunk)
+            if size > max_bytes:
+                raise UploadTooLarge(f"File is larger than the {max_bytes // (1024 * 1024)} MB limit")
+            hasher.update(chunk)
+            await asyncio.to_thread(handle.write, chunk)
+            upload_bytes.inc(amount=len(chunk))
+    finally:
+        await asyncio.to_thread(handle.close)
+    return size, hasher
+
+
+async def save_upload(upload, destination: str, max_bytes: int = UPLOAD_MAX_BYTES,
+                      chunk_size: int = UPLOAD_CHUNK_SIZE) -> StoredUpload:
+    """Stream an UploadFile to destination; a failed or oversized upload leaves nothing behind."""
+    os.makedirs(os.path.dirname(destination) or ".", exist_ok=True)
+    partial_path = f"{destination}.part"
+    try:
+        size, hasher = await write_stream(iter_upload(upload, chunk_size), partial_path, max_bytes)
+        await asyncio.to_thread(os.replace, partial_path, destination)
+    except BaseException:
+        await asyncio.to_thread(remove_quietly, partial_path)
+        raise
+    return StoredUpload(path=destination, size=size, sha256=hasher.hexdigest())
+
+
+def sha256_file(path: str, chunk_size: int = UPLOAD_CHUNK_SIZE) -> str:
+    """Hash a file from disk in chunks (blocking - call via asyncio.to_thread)."""
+    hasher = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(chunk_size), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+class UploadSizeLimit:
+    """ASGI middleware rejecting oversized multipart uploads before the body is read.
+
+    Form parsing spools the whole body before a route runs, so the route-level
+    limit alone would still let a huge upload fill the temp directory.
+    """
+
+    def __init__(self, app, max_bytes: int = UPLOAD_MAX_BYTES, overhead: int = 64 * 1024):
+        self.app = app
+        self.limit = max_bytes + overhead  # allowance for multipart framing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["method"] == "POST" and scope["path"].endswith("/upload"):
+            for name, value in scope["headers"]:
+                if name == b"content-length" and value.isdigit() and int(value) > self.limit:
+                    body = json.dumps({"success": False, "error": "File is larger than the upload limit"}).encode()
+                    await send({"type": "http.response.start", "status": 413,
+                                "headers": [(b"content-type", b"application/json"), (b"connection", b"close")]})
+                    await send({"type": "http.response.body", "body": body})
+                    return
+        await self.app(scope, receive, send)
+
+
+def remove_quietly(path: str):
+    """Delete a file if it exists (blocking - call via asyncio.to_thread from async code)."""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class ChunkedUploadStore:
+    """Resumable uploads kept as <id>.part + <id>.json under UPLOAD_DIR/incoming.
+
+    State lives on disk, so any worker sharing the upload directory can take the
+    next chunk. Appends, completion and abort hold an asyncio lock per upload
+    within a process and an flock() on the .part file across processes (POSIX
+    only - without fcntl, a given upload must stick to one worker). The
+    running hash is kept in memory while chunks arrive in order at this worker,
+    and is recomputed from disk at completion otherwise.
+    """
+
+    def __init__(self, directory: str = None, max_bytes: int = UPLOAD_MAX_BYTES, ttl: int = UPLOAD_SESSION_TTL):
+        self.directory = directory or os.path.join(UPLOAD_DIR, "incoming")
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._hashers: Dict[str, Tuple[int, "hashlib._Hash"]] = {}  # upload id -> (offset, running hash)
+
+    def _paths(self, upload_id: str) -> Tuple[str, str]:
+        if not re.fullmatch(r"[0-9a-f]{32}", upload_id or ""):
+            raise ValueError("Upload not found")
+        base = os.path.join(self.directory, upload_id)
+        return f"{base}.json", f"{base}.part"
+
+    def _load(self, upload_id: str) -> dict:
+        meta_path, part_path = self._paths(upload_id)
+        try:
+            with open(meta_path) as handle:
+                session = json.load(handle)
+        except FileNotFoundError:
+            raise ValueError("Upload not found")
+        session["offset"] = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        return session
+
+    @asynccontextmanager
+    async def _locked(self, upload_id: str):
+        """Hold the upload's in-process lock and an exclusive flock on its .part file."""
+        _, part_path = self._paths(upload_id)
+        async with self._locks.setdefault(upload_id, asyncio.Lock()):
+            if fcntl is None:
+                yield
+                return
+            try:
+                handle = open(part_path, "rb")
+            except FileNotFoundError:
+                raise ValueError("Upload not found")
+            try:
+                # Poll rather than block a thread, so a cancelled request gives the lock up at once
+                while True:
+                    try:
+                        fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                        break
+                    except BlockingIOError:
+                        await asyncio.sleep(0.01)
+                yield
+            finally:
+                handle.close()  # also releases the flock
+
+    async def create(self, work_order_id: int, file_name: str, file_type: str, uploaded_by: str,
+                     total_size: int) -> dict:
+        """Open a resumable upload; returns its id, the expected size and the chunk size to use."""
+        if total_size <= 0:
+            raise ValueError("total_size must be positive")
+        if total_size > self.max_bytes:
+            raise UploadTooLarge(f"File is larger than the {self.max_bytes // (1024 * 1024)} MB limit")
+
+        await self.purge()
+
+        session = {
+            "upload_id": uuid.uuid4().hex,
+            "work_order_id": work_order_id,
+            "file_name": safe_file_name(file_name),
+            "file_type": file_type,
+            "uploaded_by": uploaded_by,
+            "total_size": total_size,
+            "created_at": time.time()
+        }
+        meta_path, part_path = self._paths(session["upload_id"])
+
+        def write_session():
+            os.makedirs(self.directory, exist_ok=True)
+            open(part_path, "wb").close()
+            with open(meta_path, "w") as handle:
+                json.dump(session, handle)
+
+        await asyncio.to_thread(write_session)
+        return dict(session, offset=0, chunk_size=UPLOAD_CHUNK_SIZE)
+
+    async def status(self, upload_id: str) -> dict:
+        return await asyncio.to_thread(self._load, upload_id)
+
+    async def append(self, upload_id: str, offset: int, chunks: AsyncIterator[bytes]) -> int:
+        """Append a chunk that starts at offset; returns the new offset.
+
+        A mismatched offset (duplicate or out-of-order chunk) is rejected with
+        the current offset so the client knows where to resume.
+        """
+        async with self._locked(upload_id):
+            session = await self.status(upload_id)
+            if offset != session["offset"]:
+                raise ValueError(f"Expected offset {session['offset']}, got {offset}")
+
+            cached_offset, hasher = self._hashers.pop(upload_id, (None, None))
+            if cached_offset != offset:
+                hasher = None
+
+            _, part_path = self._paths(upload_id)
+            try:
+                size, hasher = await write_stream(
+                    chunks, part_path, max_bytes=session["total_size"], mode="ab", start_size=offset,
+                    hasher=hasher or hashlib.sha256()
+                )
+            except UploadTooLarge:
+                # Drop the overflowing chunk so the client can retry from the acknowledged offset
+                await asyncio.to_thread(os.truncate, part_path, offset)
+                raise ValueError(f"Chunk runs past the declared total_size of {session['total_size']} bytes")
+
+            # A hash started mid-file is useless - only keep it when it covers the whole file
+            if offset == 0 or cached_offset == offset:
+                self._hashers[upload_id] = (size, hasher)
+            return size
+
+    async def complete(self, upload_id: str, destination: str) -> Tuple[dict, StoredUpload]:
+        """Move a fully received upload to destination and hash it.
+
+        Holds the upload's lock, so a concurrent complete or a late append sees
+        "Upload not found" instead of losing the .part file mid-operation.
+        """
+        async with self._locked(upload_id):
+            session = await self.status(upload_id)
+            if session["offset"] != session["total_size"]:
+                raise ValueError(f"Upload incomplete: {session['offset']} of {session['total_size']} bytes received")
+
+            meta_path, part_path = self._paths(upload_id)
+            cached_offset, hasher = self._hashers.pop(upload_id, (None, None))
+            if cached_offset == session["total_size"]:
+                sha256 = hasher.hexdigest()
+            else:
+                sha256 = await asyncio.to_thread(sha256_file, part_path)
+
+            os.makedirs(os.path.dirname(destination) or ".", exist_ok=True)
+            await asyncio.to_thread(os.replace, part_path, destination)
+            await asyncio.to_thread(remove_quietly, meta_path)
+            self._locks.pop(upload_id, None)
+        return session, StoredUpload(path=destination, size=session["total_size"], sha256=sha256)
+
+    async def abort(self, upload_id: str):
+        """Discard an upload; waits for a chunk or completion already in progress."""
+        meta_path, part_path = self._paths(upload_id)
+        try:
+            async with self._locked(upload_id):
+                await asyncio.to_thread(remove_quietly, part_path)
+                await asyncio.to_thread(remove_quietly, meta_path)
+        except ValueError:
+            # Already completed or aborted - only stray metadata can be left
+            await asyncio.to_thread(remove_quietly, meta_path)
+        self._hashers.pop(upload_id, None)
+        self._locks.pop(upload_id, None)
+
+    async def purge(self, now: float = None) -> int:
+        """Delete expired uploads, then forget the lock and running hash of uploads that are gone.
+
+        The disk work runs in a thread; the in-memory maps are only touched here
+        on the event loop, which is the only place they change.
+        """
+        known = set(self._locks) | set(self._hashers)
+        removed, gone = await asyncio.to_thread(self._purge_disk, now, known)
+        for upload_id in gone:
+            lock = self._locks.get(upload_id)
+            if lock is not None and lock.locked():
+                continue
+            self._locks.pop(upload_id, None)
+            self._hashers.pop(upload_id, None)
+        return removed
+
+    def _purge_disk(self, now: Optional[float], known) -> Tuple[int, list]:
+        removed = self.purge_expired(now)
+        gone = [upload_id for upload_id in known
+                if not os.path.exists(os.path.join(self.directory, f"{upload_id}.json"))]
+        return removed, gone
+
+    def purge_expired(self, now: float = None) -> int:
+        """Delete abandoned uploads older than the TTL (blocking)."""
+        now = now or time.time()
+        removed = 0
+        if os.path.isdir(self.directory):
+            for entry in os.listdir(self.directory):
+                if not entry.endswith(".json"):
+                    continue
+                meta_path = os.path.join(self.directory, entry)
+                part_path = meta_path[:-len(".json")] + ".part"
+                # The .part file is touched by every chunk, so active uploads never expire
+                last_activity = max(os.path.getmtime(path) for path in (meta_path, part_path) if os.path.exists(path))
+                if now - last_activity > self.ttl:
+                    remove_quietly(meta_path)
+                    remove_quietly(part_path)
+                    removed += 1
+        return removed
+
+
+chunked_uploads = ChunkedUploadStore()
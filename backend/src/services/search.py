@@ -0,0 +1,61 @@
+"""
+Text search for customers and work orders.
+
+On PostgreSQL the match runs against pg_trgm GIN indexes (migration 007):
+ILIKE '%term%' and the fuzzy word-similarity operator both use them, so search
+latency stays flat as tables grow. Results are ranked by trigram word
+similarity. Other databases (SQLite in tests) get the same filter as plain
+LIKE, ranked by where the term matched.
+"""
+
+from typing import Sequence, Tuple
+
+from sqlalchemy import case, func, literal, or_
+from sqlalchemy.sql.elements import ColumnElement
+
+# Shorter terms have no trigrams to look up, so they only match as prefixes
+MIN_SUBSTRING_LENGTH = 3
+
+# Not a backslash - its quoting differs between drivers and standard_conforming_strings
+LIKE_ESCAPE = "!"
+
+
+def escape_like(term: str) -> str:
+    """Escape LIKE wildcards so user input only ever matches literally."""
+    return term.replace(LIKE_ESCAPE, LIKE_ESCAPE * 2).replace("%", LIKE_ESCAPE + "%").replace("_", LIKE_ESCAPE + "_")
+
+
+def text_search(dialect_name: str, columns: Sequence, term: str) -> Tuple[ColumnElement, ColumnElement]:
+    """Return (filter, rank) for term across columns; higher rank is a better match.
+
+    The first column is treated as the primary one (e.g. company name) and wins ties.
+    """
+    term = term.strip()
+    escaped = escape_like(term.lower())
+    pattern = f"{escaped}%" if len(term) < MIN_SUBSTRING_LENGTH else f"%{escaped}%"
+
+    if dialect_name == "postgresql":
+        matches = [column.ilike(pattern, escape=LIKE_ESCAPE) for column in columns]
+        if len(term) >= MIN_SUBSTRING_LENGTH:
+            # "term <% column": trigram word similarity above pg_trgm.word_similarity_threshold
+            matches += [literal(term).op("<%")(column) for column in columns]
+        similarities = [func.word_similarity(term, func.coalesce(column, "")) for column in columns]
+        rank = func.greatest(*similarities) + 0.01 * similarities[0] if len(columns) > 1 else similarities[0]
+        return or_(*matches), rank
+
+    lowered = [func.lower(func.coalesce(column, "")) for column in columns]
+    matches = [column.like(pattern, escape=LIKE_ESCAPE) for column in lowered]
+
+    # Exact > prefix > substring, primary column first
+    scores = []
+    for weight, column in zip(range(len(lowered), 0, -1), lowered):
+        scores.append(case(
+            (column == term.lower(), 30 + weight),
+            (column.like(f"{escaped}%", escape=LIKE_ESCAPE), 20 + weight),
+            (column.like(f"%{escaped}%", escape=LIKE_ESCAPE), 10 + weight),
+            else_=0
+        ))
+    rank = scores[0]
+    for score in scores[1:]:
+        rank = func.max(rank, score) if dialect_name == "sqlite" else func.greatest(rank, score)
+    return or_(*matches), rank
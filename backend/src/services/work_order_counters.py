@@ -0,0 +1,206 @@
+"""
+Materialized work order counters.
+
+Every write in WorkOrderService applies the change in its counters, in the same
+transaction, as atomic ``count = count + n`` upserts. Reads touch a fixed set
+of rows no matter how much order history exists. reconcile_counters.py rebuilds
+the table from work_orders if it ever drifts.
+"""
+
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from ..models.work_order import WorkOrder, WorkOrderCounter, WorkOrderStatus, Priority
+
+# Core tables keep this usable without configuring the ORM mappers
+counters_table = WorkOrderCounter.__table__
+work_orders_table = WorkOrder.__table__
+
+# Statuses whose total_amount counts towards the open order value
+OPEN_VALUE_STATUSES = (
+    WorkOrderStatus.PENDING, WorkOrderStatus.APPROVED,
+    WorkOrderStatus.IN_PRODUCTION, WorkOrderStatus.PRODUCTION_COMPLETE,
+    WorkOrderStatus.QUALITY_CHECK
+)
+
+Counters = Dict[str, Tuple[int, Decimal]]
+
+
+def status_counter(status: WorkOrderStatus) -> str:
+    return f"status:{status.value}"
+
+
+def priority_counter(priority: Priority) -> str:
+    return f"priority:{priority.value}"
+
+
+def completed_counter(delivery_date: datetime) -> str:
+    return f"completed:{delivery_date:%Y-%m}"
+
+
+def order_counters(status: Optional[WorkOrderStatus], priority: Optional[Priority], is_active: Optional[bool],
+                   total_amount, delivery_date: Optional[datetime]) -> Counters:
+    """Counters a single order contributes to (inactive orders contribute nothing)."""
+    if is_active is False:
+        return {}
+
+    counters = {}
+    if status is not None:
+        counters[status_counter(status)] = (1, Decimal(total_amount or 0))
+    if priority is not None:
+        counters[priority_counter(priority)] = (1, Decimal(0))
+    if status == WorkOrderStatus.DELIVERED and delivery_date is not None:
+        counters[completed_counter(delivery_date)] = (1, Decimal(0))
+    return counters
+
+
+def work_order_counters(work_order: WorkOrder) -> Counters:
+    """order_counters for the current in-memory state of a WorkOrder."""
+    return order_counters(
+        work_order.status, work_order.priority, work_order.is_active,
+        work_order.total_amount, work_order.delivery_date
+    )
+
+
+def counter_delta(before: Counters, after: Counters) -> Counters:
+    """Per-counter (count, amount) change between two snapshots, zero entries dropped."""
+    delta = {}
+    for name in before.keys() | after.keys():
+        count_before, amount_before = before.get(name, (0, Decimal(0)))
+        count_after, amount_after = after.get(name, (0, Decimal(0)))
+        change = (count_after - count_before, amount_after - amount_before)
+        if change != (0, 0):
+            delta[name] = change
+    return delta
+
+
+def _increment_statement(dialect_name: str, name: str, count: int, amount: Decimal):
+    insert = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}[dialect_name]
+    stmt = insert(counters_table).values(name=name, count=count, amount=amount)
+    return stmt.on_conflict_do_update(
+        index_elements=[counters_table.c.name],
+        set_={
+            "count": counters_table.c.count + stmt.excluded.count,
+            "amount": counters_table.c.amount + stmt.excluded.amount
+        }
+    )
+
+
+def apply_counter_delta(db: Session, delta: Counters):
+    """Apply a delta inside the caller's transaction (no commit)."""
+    dialect_name = db.get_bind().dialect.name
+
+    # Sorted so concurrent writers always lock counter rows in the same order
+    for name in sorted(delta):
+        count, amount = delta[name]
+        if dialect_name in ("postgresql", "sqlite"):
+            db.execute(_increment_statement(dialect_name, name, count, amount))
+            continue
+
+        updated = db.execute(
+            counters_table.update()
+            .where(counters_table.c.name == name)
+            .values(count=counters_table.c.count + count, amount=counters_table.c.amount + amount)
+        )
+        if updated.rowcount == 0:
+            db.execute(counters_table.insert().values(name=name, count=count, amount=amount))
+
+
+def read_counter_statistics(db: Session, now: Optional[datetime] = None) -> dict:
+    """WorkOrderStats from the counters table - a fixed number of rows per call."""
+    now = now or datetime.utcnow()
+    month_counter = completed_counter(now)
+    names = [status_counter(status) for status in WorkOrderStatus]
+    names += [priority_counter(priority) for priority in Priority]
+    names.append(month_counter)
+
+    rows = db.execute(
+        select(counters_table.c.name, counters_table.c.count, counters_table.c.amount)
+        .where(counters_table.c.name.in_(names))
+    ).all()
+    stored = {row.name: row for row in rows}
+
+    def count_of(name):
+        return stored[name].count if name in stored else 0
+
+    status_counts = {status.value: count_of(status_counter(status)) for status in WorkOrderStatus}
+    total_value = sum(
+        (Decimal(stored[status_counter(status)].amount) for status in OPEN_VALUE_STATUSES if status_counter(status) in stored),
+        Decimal("0")
+    )
+
+    return {
+        "total_orders": sum(status_counts.values()),
+        "orders_by_status": status_counts,
+        "orders_by_priority": {priority.value: count_of(priority_counter(priority)) for priority in Priority},
+        "pending_orders": status_counts[WorkOrderStatus.PENDING.value],
+        "in_production_orders": status_counts[WorkOrderStatus.IN_PRODUCTION.value],
+        "completed_this_month": count_of(month_counter),
+        "total_value": total_value
+    }
+
+
+def compute_counters(db: Session) -> Counters:
+    """Counters recomputed from scratch out of work_orders."""
+    counters = defaultdict(lambda: (0, Decimal(0)))
+    active = work_orders_table.c.is_active == True
+
+    def add(name, count, amount=Decimal(0)):
+        stored_count, stored_amount = counters[name]
+        counters[name] = (stored_count + count, stored_amount + Decimal(amount or 0))
+
+    grouped = db.execute(
+        select(
+            work_orders_table.c.status,
+            work_orders_table.c.priority,
+            func.count().label("orders"),
+            func.sum(work_orders_table.c.total_amount).label("amount")
+        )
+        .where(active)
+        .group_by(work_orders_table.c.status, work_orders_table.c.priority)
+    )
+    for row in grouped:
+        if row.status is not None:
+            add(status_counter(row.status), row.orders, row.amount)
+        if row.priority is not None:
+            add(priority_counter(row.priority), row.orders)
+
+    delivered = db.execute(
+        select(work_orders_table.c.delivery_date, func.count().label("orders"))
+        .where(active, work_orders_table.c.status == WorkOrderStatus.DELIVERED,
+               work_orders_table.c.delivery_date.isnot(None))
+        .group_by(work_orders_table.c.delivery_date)
+    )
+    for row in delivered:
+        add(completed_counter(row.delivery_date), row.orders)
+
+    return dict(counters)
+
+
+def stored_counters(db: Session) -> Counters:
+    rows = db.execute(select(counters_table.c.name, counters_table.c.count, counters_table.c.amount)).all()
+    return {row.name: (row.count, Decimal(row.amount)) for row in rows}
+
+
+def rebuild_counters(db: Session) -> Counters:
+    """Replace the counters table with freshly computed values; returns the drift that was fixed."""
+    if db.get_bind().dialect.name == "postgresql":
+        # Writers block on their counter upsert until the rebuild commits, so none are lost
+        db.execute(text("LOCK TABLE work_order_counters IN SHARE ROW EXCLUSIVE MODE"))
+
+    fresh = compute_counters(db)
+    drift = counter_delta(stored_counters(db), fresh)
+
+    db.execute(counters_table.delete())
+    if fresh:
+        db.execute(counters_table.insert(), [
+            {"name": name, "count": count, "amount": amount} for name, (count, amount) in fresh.items()
+        ])
+    db.commit()
+    return drift
@@ -0,0 +1,199 @@
+"""
+Work order event hub - pushes create/claim/status/upload changes to dashboards.
+
+Services publish small JSON events after they commit. Each connected dashboard
+gets its own bounded asyncio queue; a slow client only loses its own oldest
+events instead of holding everyone else up.
+
+Set WORK_ORDER_EVENTS_BACKEND=postgres to route events through PostgreSQL
+LISTEN/NOTIFY so every uvicorn worker sees changes made by any other worker.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import select
+import threading
+from datetime import datetime
+from typing import Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# memory (single process) or postgres (LISTEN/NOTIFY across workers)
+EVENTS_BACKEND = os.getenv("WORK_ORDER_EVENTS_BACKEND", "memory")
+EVENTS_CHANNEL = os.getenv("WORK_ORDER_EVENTS_CHANNEL", "work_order_events")
+
+# Events buffered per connected client before the oldest are dropped
+CLIENT_QUEUE_SIZE = int(os.getenv("WORK_ORDER_EVENTS_QUEUE_SIZE", "100"))
+
+# Seconds between keep-alive comments on an idle stream
+HEARTBEAT_SECONDS = float(os.getenv("WORK_ORDER_EVENTS_HEARTBEAT", "15"))
+
+
+def work_order_event(event_type: str, order_id: int, **fields) -> dict:
+    """Build the event payload sent to dashboards for a work order change."""
+    event = {
+        "type": event_type,
+        "order_id": order_id,
+        "at": datetime.utcnow().isoformat()
+    }
+    event.update(fields)
+    return event
+
+
+def format_sse(event: dict) -> str:
+    """Encode an event as a server-sent events message."""
+    return f"data: {json.dumps(event)}\n\n"
+
+
+class EventHub:
+    """In-process fan-out of work order events to subscribed clients."""
+
+    def __init__(self, queue_size: int = CLIENT_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._notifier = None
+
+    def start(self, loop: asyncio.AbstractEventLoop, backend: str = EVENTS_BACKEND, database_url: str = None):
+        """Bind the hub to the server event loop and start the optional shared backend."""
+        self._loop = loop
+        if backend == "postgres":
+            from ..database import DATABASE_URL
+            self._notifier = PostgresNotifier(self, database_url or DATABASE_URL, EVENTS_CHANNEL)
+            self._notifier.start()
+            logger.info(f"Work order events using PostgreSQL channel '{EVENTS_CHANNEL}'")
+
+    def stop(self):
+        """Stop the shared backend and forget the event loop."""
+        if self._notifier:
+            self._notifier.stop()
+            self._notifier = None
+        self._loop = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> asyncio.Queue:
+        """Register a new client queue. Must be called on the event loop."""
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+
+    def publish(self, event: dict):
+        """Publish an event from any thread (services run in the threadpool)."""
+        if self._notifier:
+            self._notifier.notify(event)
+        else:
+            self.dispatch(event)
+
+    async def publish_async(self, event: dict):
+        """Publish from a coroutine without blocking the loop on pg_notify."""
+        if self._notifier:
+            await asyncio.to_thread(self._notifier.notify, event)
+        else:
+            self.dispatch(event)
+
+    def dispatch(self, event: dict):
+        """Hand an event to the event loop for delivery to local subscribers."""
+        loop = self._loop
+        if loop is None or not self._subscribers:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+
+        if running is loop:
+            self._fan_out(event)
+        else:
+            try:
+                loop.call_soon_threadsafe(self._fan_out, event)
+            except RuntimeError:
+                # Loop already closed (shutdown) - nobody is listening
+                pass
+
+    def _fan_out(self, event: dict):
+        for queue in list(self._subscribers):
+            if queue.full():
+                # Slow client - drop its oldest event rather than block others
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+
+class PostgresNotifier:
+    """Share events between workers through PostgreSQL LISTEN/NOTIFY."""
+
+    def __init__(self, hub: EventHub, database_url: str, channel: str):
+        self.hub = hub
+        self.database_url = database_url
+        self.channel = channel
+        self._stopping = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._notify_connection = None
+
+    def _connect(self):
+        import psycopg2
+        from ..database import libpq_database_url
+
+        # DATABASE_URL may name a SQLAlchemy driver (postgresql+psycopg2://), which libpq rejects
+        connection = psycopg2.connect(libpq_database_url(self.database_url))
+        connection.set_isolation_level(0)  # autocommit - NOTIFY is sent immediately
+        return connection
+
+    def start(self):
+        self._thread = threading.Thread(target=self._listen, name="work-order-events", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+        with self._lock:
+            if self._notify_connection is not None:
+                self._notify_connection.close()
+                self._notify_connection = None
+
+    def notify(self, event: dict):
+        """Send the event to every worker (including this one) via pg_notify."""
+        with self._lock:
+            try:
+                if self._notify_connection is None or self._notify_connection.closed:
+                    self._notify_connection = self._connect()
+                with self._notify_connection.cursor() as cursor:
+                    cursor.execute("SELECT pg_notify(%s, %s)", (self.channel, json.dumps(event)))
+                return
+            except Exception as e:
+                logger.error(f"Failed to publish work order event: {e}")
+                self._notify_connection = None
+        # Still tell our own clients
+        self.hub.dispatch(event)
+
+    def _listen(self):
+        while not self._stopping.is_set():
+            try:
+                connection = self._connect()
+                with connection.cursor() as cursor:
+                    cursor.execute(f'LISTEN "{self.channel}"')
+
+                while not self._stopping.is_set():
+                    if select.select([connection], [], [], 1.0) == ([], [], []):
+                        continue
+                    connection.poll()
+                    while connection.notifies:
+                        notification = connection.notifies.pop(0)
+                        self.hub.dispatch(json.loads(notification.payload))
+                connection.close()
+            except Exception as e:
+                logger.error(f"Work order event listener error, reconnecting: {e}")
+                self._stopping.wait(5)
+
+
+# Shared hub used by the services and the /events stream
+event_hub = EventHub()
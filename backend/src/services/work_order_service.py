@@ -1,17 +1,159 @@
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy import and_, or_, desc, asc, func
+from sqlalchemy import and_, or_, desc, asc, func, select
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
 from typing import List, Optional, Tuple
 from datetime import datetime, timedelta
 from decimal import Decimal
+import base64
 import calendar
+import json
+import os
 
 from ..models.work_order import WorkOrder, WorkOrderUpdate, ProductionSchedule, WorkOrderStatus, Priority
 from ..models.customer import Customer
+from ..cache import response_cache
+from .search import text_search
 from ..schemas.work_order import (
     WorkOrderCreate, WorkOrderUpdate, WorkOrderStatusUpdate,
     ProductionScheduleUpdate, WorkOrderListResponse
 )
+from .work_order_numbers import (
+    WORK_ORDER_NUMBER_BLOCK_SIZE, format_work_order_number, number_allocator, reserve_numbers,
+    work_order_number_prefix
+)
+from .work_order_counters import (
+    OPEN_VALUE_STATUSES, apply_counter_delta, counter_delta, read_counter_statistics, work_order_counters
+)
+
+# ResponseCache namespace for /stats and /queue - dropped after every write
+CACHE_NAMESPACE = "work_orders"
+
+# Where /stats reads from: "counters" (work_order_counters table) or "query" (grouped scan of work_orders)
+WORK_ORDER_STATS_SOURCE = os.getenv("WORK_ORDER_STATS_SOURCE", "counters")
+
+# Columns that can be paged with a cursor - non-null, so (value, id) is a total order
+CURSOR_SORT_COLUMNS = ("order_date", "created_at", "updated_at", "work_order_number", "quantity", "total_amount", "id")
+
+
+class ExplainJson(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) of a statement (PostgreSQL).
+
+    Compiled and executed like the statement itself, so its bind parameters go
+    through their type processors (e.g. Enum members become their names).
+    """
+
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(ExplainJson)
+def _compile_explain_json(element, compiler, **kw):
+    return f"EXPLAIN (FORMAT JSON) {compiler.process(element.statement, **kw)}"
+
+
+def _cursor_value(value):
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"dec": str(value)}
+    return value
+
+
+def _cursor_python_value(value):
+    if isinstance(value, dict) and "dt" in value:
+        return datetime.fromisoformat(value["dt"])
+    if isinstance(value, dict) and "dec" in value:
+        return Decimal(value["dec"])
+    return value
+
+
+def encode_cursor(sort_by: str, sort_order: str, sort_value, last_id: int) -> str:
+    """Opaque page cursor: the sort key and id of the last row on the page."""
+    payload = json.dumps([sort_by, sort_order, _cursor_value(sort_value), last_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str, object, int]:
+    """Inverse of encode_cursor; raises ValueError for anything malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_by, sort_order, sort_value, last_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return sort_by, sort_order, _cursor_python_value(sort_value), int(last_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def keyset_filter(sort_column, id_column, sort_value, last_id: int, descending: bool):
+    """Rows strictly after (sort_value, last_id) in (sort_column, id) order."""
+    if descending:
+        return or_(sort_column < sort_value, and_(sort_column == sort_value, id_column < last_id))
+    return or_(sort_column > sort_value, and_(sort_column == sort_value, id_column > last_id))
+
+def statistics_statement(month_start: datetime, month_end: datetime):
+    """Every /stats figure in one grouped query over active orders."""
+    # Core columns keep this usable without configuring the ORM mappers
+    work_orders = WorkOrder.__table__
+    delivered_this_month = and_(
+        work_orders.c.status == WorkOrderStatus.DELIVERED,
+        work_orders.c.delivery_date.between(month_start, month_end)
+    )
+    return (
+        select(
+            work_orders.c.status,
+            work_orders.c.priority,
+            func.count().label("orders"),
+            func.count().filter(delivered_this_month).label("completed_this_month"),
+            func.sum(work_orders.c.total_amount).filter(work_orders.c.status.in_(OPEN_VALUE_STATUSES)).label("open_value")
+        )
+        .where(work_orders.c.is_active == True)
+        .group_by(work_orders.c.status, work_orders.c.priority)
+    )
+
+
+PRODUCTION_QUEUE_STAGES = ("scheduled", "in_production", "quality_check")
+
+
+def production_queue_criteria(stage: str):
+    """(filters, ordering) for one production queue stage - served by ix_work_orders_active_queue."""
+    work_orders = WorkOrder.__table__
+    status, ordering = {
+        "scheduled": (WorkOrderStatus.APPROVED, (work_orders.c.priority.desc(), work_orders.c.requested_delivery_date.asc())),
+        "in_production": (WorkOrderStatus.IN_PRODUCTION, (work_orders.c.priority.desc(), work_orders.c.actual_production_start.asc())),
+        "quality_check": (WorkOrderStatus.QUALITY_CHECK, (work_orders.c.actual_production_complete.asc(),)),
+    }[stage]
+    return (work_orders.c.status == status, work_orders.c.is_active == True), ordering
+
+
+def fold_statistics(rows) -> dict:
+    """Turn (status, priority) groups into the WorkOrderStats shape."""
+    status_counts = {status.value: 0 for status in WorkOrderStatus}
+    priority_counts = {priority.value: 0 for priority in Priority}
+    total_orders = 0
+    completed_this_month = 0
+    total_value = Decimal("0")
+
+    for row in rows:
+        total_orders += row.orders
+        completed_this_month += row.completed_this_month
+        total_value += row.open_value or 0
+        if row.status is not None:
+            status_counts[row.status.value] += row.orders
+        if row.priority is not None:
+            priority_counts[row.priority.value] += row.orders
+
+    return {
+        "total_orders": total_orders,
+        "orders_by_status": status_counts,
+        "orders_by_priority": priority_counts,
+        "pending_orders": status_counts[WorkOrderStatus.PENDING.value],
+        "in_production_orders": status_counts[WorkOrderStatus.IN_PRODUCTION.value],
+        "completed_this_month": completed_this_month,
+        "total_value": total_value
+    }
 
 
 class WorkOrderService:
@@ -20,22 +162,12 @@ class WorkOrderService:
 
     def _generate_work_order_number(self) -> str:
         """Generate a unique work order number."""
-        current_year = datetime.now().year
-        current_month = datetime.now().month
-
-        # Get the count for this month
-        month_start = datetime(current_year, current_month, 1)
-        if current_month == 12:
-            month_end = datetime(current_year + 1, 1, 1) - timedelta(days=1)
+        prefix = work_order_number_prefix(datetime.now())
+        if WORK_ORDER_NUMBER_BLOCK_SIZE > 1:
+            value = number_allocator.next_value(self.db.get_bind(), prefix)
         else:
-            month_end = datetime(current_year, current_month + 1, 1) - timedelta(days=1)
-
-        count = self.db.query(WorkOrder).filter(
-            WorkOrder.order_date.between(month_start, month_end)
-        ).count()
-
-        # Generate number like WO2024-0001
-        return f"WO{current_year}-{count + 1:04d}"
+            value = reserve_numbers(self.db, prefix)
+        return format_work_order_number(prefix, value)
 
     def create_work_order(self, work_order_data: WorkOrderCreate, user_id: int) -> WorkOrder:
         """Create a new work order."""
@@ -74,7 +206,9 @@ class WorkOrderService:
 
         try:
             self.db.add(db_work_order)
+            apply_counter_delta(self.db, work_order_counters(db_work_order))
             self.db.commit()
+            response_cache.invalidate(CACHE_NAMESPACE)
             self.db.refresh(db_work_order)
             return db_work_order
         except IntegrityError:
@@ -100,22 +234,25 @@ class WorkOrderService:
         date_from: Optional[datetime] = None,
         date_to: Optional[datetime] = None,
         sort_by: str = "order_date",
-        sort_order: str = "desc"
-    ) -> Tuple[List[WorkOrder], int]:
-        """Get work orders with filtering and pagination."""
-        query = self.db.query(WorkOrder).join(Customer)
+        sort_order: str = "desc",
+        cursor: Optional[str] = None,
+        count: str = "exact"
+    ) -> Tuple[List[WorkOrder], Optional[int], Optional[str]]:
+        """Get work orders with filtering and pagination.
+
+        Pass the returned next_cursor back as ``cursor`` for constant-cost paging
+        (``skip`` is ignored then). ``count`` is "exact", "estimate" or "none".
+        """
+        query = self.db.query(WorkOrder)
+        rank = None
 
         # Apply filters
         if search:
-            search_filter = f"%{search}%"
-            query = query.filter(
-                or_(
-                    WorkOrder.work_order_number.ilike(search_filter),
-                    WorkOrder.product_type.ilike(search_filter),
-                    Customer.company_name.ilike(search_filter),
-                    Customer.contact_person.ilike(search_filter)
-                )
-            )
+            search_filter, rank = text_search(self.db.get_bind().dialect.name, (
+                WorkOrder.work_order_number, WorkOrder.product_type,
+                Customer.company_name, Customer.contact_person
+            ), search)
+            query = query.join(Customer).filter(search_filter)
 
         if status:
             query = query.filter(WorkOrder.status == status)
@@ -132,24 +269,72 @@ class WorkOrderService:
         if date_to:
             query = query.filter(WorkOrder.order_date <= date_to)
 
-        # Apply sorting
-        sort_column = getattr(WorkOrder, sort_by, WorkOrder.order_date)
-        if sort_order.lower() == "desc":
-            query = query.order_by(desc(sort_column))
+        # Total is taken before the cursor filter so it covers every page
+        if count == "exact":
+            total = query.count()
+        elif count == "estimate":
+            total = self._estimate_count(query)
         else:
-            query = query.order_by(asc(sort_column))
+            total = None
 
-        # Get total count
-        total = query.count()
-
-        # Apply pagination
-        work_orders = query.offset(skip).limit(limit).all()
-
-        return work_orders, total
+        # Apply sorting - id breaks ties so every row has a stable position
+        if sort_by == "relevance" and rank is not None:
+            sort_column = rank
+        else:
+            if not hasattr(WorkOrder, sort_by):
+                sort_by = "order_date"
+            sort_column = getattr(WorkOrder, sort_by)
+        descending = sort_order.lower() == "desc"
+        order = desc if descending else asc
+        query = query.order_by(order(sort_column), order(WorkOrder.id))
+
+        # Apply pagination - one extra row tells us whether there is a next page
+        if cursor:
+            cursor_sort_by, cursor_sort_order, sort_value, last_id = decode_cursor(cursor)
+            if (cursor_sort_by, cursor_sort_order) != (sort_by, sort_order.lower()):
+                raise ValueError("Cursor does not match the requested sort order")
+            if sort_by not in CURSOR_SORT_COLUMNS:
+                raise ValueError(f"Cursor paging is not available when sorting by {sort_by}")
+            query = query.filter(keyset_filter(sort_column, WorkOrder.id, sort_value, last_id, descending))
+        else:
+            query = query.offset(skip)
+
+        work_orders = query.limit(limit + 1).all()
+
+        next_cursor = None
+        if len(work_orders) > limit:
+            work_orders = work_orders[:limit]
+            if sort_by in CURSOR_SORT_COLUMNS:
+                last = work_orders[-1]
+                next_cursor = encode_cursor(sort_by, sort_order.lower(), getattr(last, sort_by), last.id)
+
+        return work_orders, total, next_cursor
+
+    def _estimate_count(self, query) -> int:
+        """Planner row estimate on PostgreSQL, exact count elsewhere."""
+        connection = self.db.connection()
+        if connection.dialect.name != "postgresql":
+            return query.count()
+
+        plan = connection.execute(ExplainJson(query.statement)).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    def _get_for_update(self, work_order_id: int) -> Optional[WorkOrder]:
+        """Load a work order with a row lock, so concurrent writers compute counter deltas one at a time.
+
+        populate_existing() re-reads the row once locked, in case this session already held a stale copy.
+        FOR UPDATE is a no-op on SQLite, which serializes writers anyway.
+        """
+        return (
+            self.db.query(WorkOrder).filter(WorkOrder.id == work_order_id)
+            .with_for_update().populate_existing().first()
+        )
 
     def update_work_order(self, work_order_id: int, work_order_data: WorkOrderUpdate, user_id: int) -> Optional[WorkOrder]:
         """Update an existing work order."""
-        db_work_order = self.db.query(WorkOrder).filter(WorkOrder.id == work_order_id).first()
+        db_work_order = self._get_for_update(work_order_id)
 
         if not db_work_order:
             return None
@@ -160,6 +345,8 @@ class WorkOrderService:
             if not customer:
                 raise ValueError(f"Customer with ID {work_order_data.customer_id} not found")
 
+        counters_before = work_order_counters(db_work_order)
+
         # Update fields
         update_data = work_order_data.model_dump(exclude_unset=True)
         for field, value in update_data.items():
@@ -173,7 +360,9 @@ class WorkOrderService:
         db_work_order.updated_at = datetime.utcnow()
 
         try:
+            apply_counter_delta(self.db, counter_delta(counters_before, work_order_counters(db_work_order)))
             self.db.commit()
+            response_cache.invalidate(CACHE_NAMESPACE)
             self.db.refresh(db_work_order)
             return db_work_order
         except IntegrityError:
@@ -182,13 +371,14 @@ class WorkOrderService:
 
     def update_work_order_status(self, work_order_id: int, status_update: WorkOrderStatusUpdate, user_id: int) -> Optional[WorkOrder]:
         """Update work order status and create audit trail."""
-        db_work_order = self.db.query(WorkOrder).filter(WorkOrder.id == work_order_id).first()
+        db_work_order = self._get_for_update(work_order_id)
 
         if not db_work_order:
             return None
 
         old_status = db_work_order.status
         new_status = WorkOrderStatus(status_update.status)
+        counters_before = work_order_counters(db_work_order)
 
         # Validate status transitions
         if not self._is_valid_status_transition(old_status, new_status):
@@ -213,7 +403,9 @@ class WorkOrderService:
         self.db.add(work_order_update)
 
         try:
+            apply_counter_delta(self.db, counter_delta(counters_before, work_order_counters(db_work_order)))
             self.db.commit()
+            response_cache.invalidate(CACHE_NAMESPACE)
             self.db.refresh(db_work_order)
             return db_work_order
         except Exception as e:
@@ -222,7 +414,7 @@ class WorkOrderService:
 
     def delete_work_order(self, work_order_id: int) -> bool:
         """Soft delete a work order."""
-        db_work_order = self.db.query(WorkOrder).filter(WorkOrder.id == work_order_id).first()
+        db_work_order = self._get_for_update(work_order_id)
 
         if not db_work_order:
             return False
@@ -231,11 +423,14 @@ class WorkOrderService:
         if db_work_order.status not in [WorkOrderStatus.DRAFT, WorkOrderStatus.PENDING]:
             raise ValueError("Cannot delete work order that is in production or completed")
 
+        counters_before = work_order_counters(db_work_order)
         db_work_order.is_active = False
         db_work_order.status = WorkOrderStatus.CANCELLED
 
         try:
+            apply_counter_delta(self.db, counter_delta(counters_before, work_order_counters(db_work_order)))
             self.db.commit()
+            response_cache.invalidate(CACHE_NAMESPACE)
             return True
         except Exception:
             self.db.rollback()
@@ -243,91 +438,23 @@ class WorkOrderService:
 
     def get_production_queue(self) -> dict:
         """Get current production queue organized by status."""
-        scheduled = self.db.query(WorkOrder).filter(
-            WorkOrder.status == WorkOrderStatus.APPROVED,
-            WorkOrder.is_active == True
-        ).order_by(WorkOrder.priority.desc(), WorkOrder.requested_delivery_date.asc()).all()
-
-        in_production = self.db.query(WorkOrder).filter(
-            WorkOrder.status == WorkOrderStatus.IN_PRODUCTION,
-            WorkOrder.is_active == True
-        ).order_by(WorkOrder.priority.desc(), WorkOrder.actual_production_start.asc()).all()
-
-        quality_check = self.db.query(WorkOrder).filter(
-            WorkOrder.status == WorkOrderStatus.QUALITY_CHECK,
-            WorkOrder.is_active == True
-        ).order_by(WorkOrder.actual_production_complete.asc()).all()
-
-        return {
-            "scheduled": scheduled,
-            "in_production": in_production,
-            "quality_check": quality_check
-        }
+        queue = {}
+        for stage in PRODUCTION_QUEUE_STAGES:
+            criteria, ordering = production_queue_criteria(stage)
+            queue[stage] = self.db.query(WorkOrder).filter(*criteria).order_by(*ordering).all()
+        return queue
 
     def get_work_order_statistics(self) -> dict:
         """Get work order statistics."""
         now = datetime.utcnow()
+        if WORK_ORDER_STATS_SOURCE == "counters":
+            return read_counter_statistics(self.db, now)
+
         month_start = datetime(now.year, now.month, 1)
         month_end = datetime(now.year, now.month, calendar.monthrange(now.year, now.month)[1], 23, 59, 59)
 
-        # Total orders
-        total_orders = self.db.query(WorkOrder).filter(WorkOrder.is_active == True).count()
-
-        # Orders by status
-        status_counts = {}
-        for status in WorkOrderStatus:
-            count = self.db.query(WorkOrder).filter(
-                WorkOrder.status == status,
-                WorkOrder.is_active == True
-            ).count()
-            status_counts[status.value] = count
-
-        # Orders by priority
-        priority_counts = {}
-        for priority in Priority:
-            count = self.db.query(WorkOrder).filter(
-                WorkOrder.priority == priority,
-                WorkOrder.is_active == True
-            ).count()
-            priority_counts[priority.value] = count
-
-        # Pending and in production
-        pending_orders = self.db.query(WorkOrder).filter(
-            WorkOrder.status == WorkOrderStatus.PENDING,
-            WorkOrder.is_active == True
-        ).count()
-
-        in_production_orders = self.db.query(WorkOrder).filter(
-            WorkOrder.status == WorkOrderStatus.IN_PRODUCTION,
-            WorkOrder.is_active == True
-        ).count()
-
-        # Completed this month
-        completed_this_month = self.db.query(WorkOrder).filter(
-            WorkOrder.status == WorkOrderStatus.DELIVERED,
-            WorkOrder.delivery_date.between(month_start, month_end),
-            WorkOrder.is_active == True
-        ).count()
-
-        # Total value of active orders
-        total_value = self.db.query(WorkOrder).filter(
-            WorkOrder.is_active == True,
-            WorkOrder.status.in_([
-                WorkOrderStatus.PENDING, WorkOrderStatus.APPROVED,
-                WorkOrderStatus.IN_PRODUCTION, WorkOrderStatus.PRODUCTION_COMPLETE,
-                WorkOrderStatus.QUALITY_CHECK
-            ])
-        ).with_entities(func.coalesce(func.sum(WorkOrder.total_amount), 0)).scalar()
-
-        return {
-            "total_orders": total_orders,
-            "orders_by_status": status_counts,
-            "orders_by_priority": priority_counts,
-            "pending_orders": pending_orders,
-            "in_production_orders": in_production_orders,
-            "completed_this_month": completed_this_month,
-            "total_value": total_value
-        }
+        rows = self.db.execute(statistics_statement(month_start, month_end)).all()
+        return fold_statistics(rows)
 
     def _is_valid_status_transition(self, old_status: WorkOrderStatus, new_status: WorkOrderStatus) -> bool:
         """Validate work order status transitions."""
@@ -0,0 +1,161 @@
+import hashlib
+import os
+import time
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from src.database import Base
+from src.models import FileBlob, SimpleWorkOrder, WorkOrderFile
+from src.services.async_simple_work_order_service import AsyncSimpleWorkOrderService
+from src.services.blob_store import BlobStore, adopt_legacy_files, collect_garbage
+
+LOGO = b"\x89PNG blue bottle logo"
+LOGO_SHA = hashlib.sha256(LOGO).hexdigest()
+
+
+@pytest.fixture
+def database_path(tmp_path):
+    # File-backed SQLite so the sync session (GC, adoption) and the async service share one database
+    return tmp_path / "test.db"
+
+
+@pytest.fixture
+def db(database_path):
+    engine = create_engine(f"sqlite:///{database_path}")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+@pytest.fixture
+def service(db, database_path):
+    """Calls an AsyncSimpleWorkOrderService method in a fresh session, like one request."""
+    sessions = async_sessionmaker(create_async_engine(f"sqlite+aiosqlite:///{database_path}", poolclass=NullPool),
+                                  expire_on_commit=False)
+
+    async def call(method: str, *args, **kwargs):
+        async with sessions() as session:
+            return await getattr(AsyncSimpleWorkOrderService(session), method)(*args, **kwargs)
+
+    return call
+
+
+@pytest.fixture
+def store(tmp_path):
+    return BlobStore(directory=str(tmp_path / "blobs"))
+
+
+def create_order(db) -> int:
+    order = SimpleWorkOrder(customer_name="Blue Bottle", customer_email="orders@example.com",
+                            order_description="12oz cups", quantity=1000)
+    db.add(order)
+    db.commit()
+    return order.id
+
+
+async def store_logo(service, store, tmp_path, order_id, name="logo.png") -> WorkOrderFile:
+    source = tmp_path / f"incoming-{time.perf_counter_ns()}"
+    source.write_bytes(LOGO)
+    work_order_file = await service(
+        "add_file", order_id, name, store.path_for(LOGO_SHA), "logo", "Sam", blob_sha256=LOGO_SHA, file_size=len(LOGO)
+    )
+    store.adopt(str(source), LOGO_SHA)
+    return work_order_file
+
+
+def ref_count(db, sha256=LOGO_SHA):
+    return db.scalar(select(FileBlob.ref_count).where(FileBlob.sha256 == sha256))
+
+
+def test_path_fans_out_by_hash_prefix(store):
+    path = store.path_for(LOGO_SHA)
+
+    assert path.endswith(os.path.join(LOGO_SHA[:2], LOGO_SHA[2:4], LOGO_SHA))
+    with pytest.raises(ValueError):
+        store.path_for("../../etc/passwd")
+
+
+@pytest.mark.asyncio
+async def test_duplicate_uploads_share_one_blob(db, service, store, tmp_path):
+    order_id = create_order(db)
+
+    first = await store_logo(service, store, tmp_path, order_id)
+    second = await store_logo(service, store, tmp_path, order_id, name="logo-again.png")
+
+    assert first.file_path == second.file_path
+    assert ref_count(db) == 2
+    assert [sha for sha, _ in store.iter_blobs()] == [LOGO_SHA]
+    assert not [name for name in os.listdir(tmp_path) if name.startswith("incoming-")]
+
+
+@pytest.mark.asyncio
+async def test_gc_keeps_referenced_and_removes_released_blobs(db, service, store, tmp_path):
+    order_id = create_order(db)
+    first = await store_logo(service, store, tmp_path, order_id)
+    second = await store_logo(service, store, tmp_path, order_id)
+
+    await service("delete_file", order_id, first.id)
+    assert ref_count(db) == 1
+    assert collect_garbage(db, store, grace_seconds=0)["blobs"] == 0
+    assert store.exists(LOGO_SHA)
+
+    await service("delete_file", order_id, second.id)
+    assert collect_garbage(db, store, grace_seconds=3600)["blobs"] == 0  # still inside the grace period
+
+    report = collect_garbage(db, store, grace_seconds=0, now=time.time() + 1)
+    assert report["blobs"] == 1
+    assert report["bytes"] == len(LOGO)
+    assert not store.exists(LOGO_SHA)
+    assert ref_count(db) is None
+
+
+@pytest.mark.asyncio
+async def test_gc_dry_run_changes_nothing(db, service, store, tmp_path):
+    order_id = create_order(db)
+    work_order_file = await store_logo(service, store, tmp_path, order_id)
+    await service("delete_file", order_id, work_order_file.id)
+
+    report = collect_garbage(db, store, grace_seconds=0, dry_run=True, now=time.time() + 1)
+
+    assert report["blobs"] == 1
+    assert store.exists(LOGO_SHA)
+    assert ref_count(db) == 0
+
+
+def test_gc_removes_orphaned_files_and_stale_temp_files(db, store):
+    orphan = store.path_for("ab" * 32)
+    os.makedirs(os.path.dirname(orphan))
+    open(orphan, "wb").close()
+    os.makedirs(store.temp_directory)
+    open(store.temp_path(), "wb").close()
+
+    assert collect_garbage(db, store, grace_seconds=60)["orphans"] == 0
+
+    report = collect_garbage(db, store, grace_seconds=60, now=time.time() + 120)
+    assert report["orphans"] == 1
+    assert report["temp_files"] == 1
+    assert not os.path.exists(orphan)
+
+
+def test_adopt_legacy_files_merges_duplicates(db, store, tmp_path):
+    order_id = create_order(db)
+    for name in ("20240101_logo.png", "20240301_logo.png"):
+        (tmp_path / name).write_bytes(LOGO)
+        db.add(WorkOrderFile(work_order_id=order_id, file_name="logo.png", file_path=str(tmp_path / name),
+                             file_type="logo", uploaded_by="Sam"))
+    db.add(WorkOrderFile(work_order_id=order_id, file_name="gone.pdf", file_path=str(tmp_path / "gone.pdf"),
+                         file_type="design", uploaded_by="Sam"))
+    db.commit()
+
+    report = adopt_legacy_files(db, store)
+
+    assert report == {"files": 2, "deduplicated": 1, "missing": 1, "bytes_saved": len(LOGO)}
+    assert ref_count(db) == 2
+    assert not (tmp_path / "20240101_logo.png").exists()
+    assert open(store.path_for(LOGO_SHA), "rb").read() == LOGO
@@ -0,0 +1,74 @@
+import threading
+import time
+
+import pytest
+
+from src.cache import ResponseCache, TTLCache
+
+
+def test_concurrent_misses_compute_once():
+    cache = ResponseCache(TTLCache(ttl=60))
+    calls = []
+    release = threading.Event()
+
+    def compute():
+        calls.append(1)
+        release.wait(1)
+        return {"total_orders": 3}
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_compute("work_orders", "stats", compute)))
+        for _ in range(20)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [{"total_orders": 3}] * 20
+
+
+def test_invalidate_drops_namespace_only():
+    cache = ResponseCache(TTLCache(ttl=60))
+    cache.get_or_compute("work_orders", "stats", lambda: 1)
+    cache.get_or_compute("customers", "stats", lambda: 1)
+
+    cache.invalidate("work_orders")
+
+    assert cache.get_or_compute("work_orders", "stats", lambda: 2) == 2
+    assert cache.get_or_compute("customers", "stats", lambda: 2) == 1
+
+
+def test_invalidation_during_compute_is_not_cached():
+    cache = ResponseCache(TTLCache(ttl=60))
+
+    def compute_then_write_lands():
+        cache.invalidate("work_orders")
+        return "stale"
+
+    assert cache.get_or_compute("work_orders", "queue", compute_then_write_lands) == "stale"
+    assert cache.get_or_compute("work_orders", "queue", lambda: "fresh") == "fresh"
+
+
+def test_filter_sets_are_cached_separately():
+    cache = ResponseCache(TTLCache(ttl=60))
+
+    cache.get_or_compute("work_orders", "stats", lambda: "high", params={"priority": "high"})
+
+    assert cache.get_or_compute("work_orders", "stats", lambda: "low", params={"priority": "low"}) == "low"
+    assert cache.get_or_compute("work_orders", "stats", lambda: "other", params={"priority": "high"}) == "high"
+
+
+def test_failed_compute_is_not_cached():
+    cache = ResponseCache(TTLCache(ttl=60))
+
+    def broken():
+        raise RuntimeError("database down")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute("work_orders", "stats", broken)
+    assert cache.get_or_compute("work_orders", "stats", lambda: "ok") == "ok"
@@ -0,0 +1,76 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.models.customer import Base, Customer
+from src.services.customer_typeahead import CustomerTypeahead, tokenize
+
+
+@pytest.fixture
+def db():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    for company, contact, email, archived in [
+        ("Blue Bottle Coffee", "Sam Lee", "sam@bluebottle.com", False),
+        ("Bluebird Bakery", "Dana Reyes", "orders@bluebird.com", False),
+        ("Cupworks Supply", "Blake Young", "blake@cupworks.com", False),
+        ("Blueprint Cafe", "Old Owner", "closed@blueprint.com", True),
+    ]:
+        session.add(Customer(company_name=company, contact_person=contact, email=email, is_archived=archived))
+    session.commit()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def index(db):
+    typeahead = CustomerTypeahead(refresh_seconds=0)
+    typeahead.ensure_built(db)
+    return typeahead
+
+
+def names(results):
+    return [result["company_name"] for result in results]
+
+
+def test_tokenize_splits_emails_and_punctuation():
+    assert tokenize("orders@blue-bottle.com") == ["orders", "blue", "bottle", "com"]
+
+
+def test_company_matches_rank_above_contact_matches(index):
+    assert names(index.suggest("bl")) == ["Blue Bottle Coffee", "Bluebird Bakery", "Cupworks Supply"]
+
+
+def test_every_query_word_must_match(index):
+    assert names(index.suggest("blue cof")) == ["Blue Bottle Coffee"]
+    assert names(index.suggest("dana")) == ["Bluebird Bakery"]
+    assert index.suggest("zzz") == []
+
+
+def test_archived_customers_are_not_indexed(index):
+    assert "Blueprint Cafe" not in names(index.suggest("blueprint"))
+
+
+def test_index_follows_writes(db, index):
+    customer = Customer(company_name="Bluestone Diner", contact_person="Kim Ho", email="kim@bluestone.com")
+    db.add(customer)
+    db.commit()
+    index.upsert(customer)
+    assert names(index.suggest("bluest")) == ["Bluestone Diner"]
+
+    customer.company_name = "Granite Diner"
+    customer.email = "kim@granite.com"
+    index.upsert(customer)
+    assert index.suggest("bluest") == []
+    assert names(index.suggest("granite")) == ["Granite Diner"]
+
+    index.remove(customer.id)
+    assert index.suggest("granite") == []
+
+
+def test_limit(index):
+    assert len(index.suggest("b", limit=2)) == 2
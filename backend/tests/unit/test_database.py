@@ -0,0 +1,129 @@
+import logging
+
+import pytest
+from sqlalchemy import exc, text
+
+from src import database
+from src.database import (InstrumentedQueuePool, QueryStats, QueryTimingMiddleware, create_database_engine,
+                          get_pool_stats, libpq_database_url, redact_parameters, track_queries)
+
+
+@pytest.fixture
+def file_engine(tmp_path):
+    engine = create_database_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.1
+    )
+    yield engine
+    engine.dispose()
+
+
+def test_engine_uses_instrumented_pool(file_engine):
+    assert isinstance(file_engine.pool, InstrumentedQueuePool)
+    assert file_engine.pool.size() == 1
+
+
+def test_pool_stats_count_checkouts(file_engine):
+    for _ in range(3):
+        with file_engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+
+    stats = get_pool_stats(file_engine)
+
+    assert stats["checkouts"] == 3
+    assert stats["timeouts"] == 0
+    assert stats["checked_out"] == 0
+    assert stats["max_wait_ms"] >= 0
+
+
+def test_pool_stats_record_timeouts(file_engine):
+    with file_engine.connect():
+        with pytest.raises(exc.TimeoutError):
+            file_engine.connect()
+
+    stats = get_pool_stats(file_engine)
+    assert stats["timeouts"] == 1
+    assert stats["max_wait_ms"] >= 100
+
+
+def test_memory_sqlite_shares_one_connection():
+    engine = create_database_engine("sqlite://")
+
+    with engine.connect() as connection:
+        connection.execute(text("CREATE TABLE t (id INTEGER)"))
+        connection.commit()
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT count(*) FROM t")).scalar() == 0
+
+    assert get_pool_stats(engine)["pool"] == "StaticPool"
+
+
+def test_track_queries_counts_statements(file_engine):
+    with file_engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        with track_queries() as stats:
+            for _ in range(3):
+                connection.execute(text("SELECT 2"))
+        connection.execute(text("SELECT 3"))
+
+    assert stats.count == 3
+    assert stats.total >= stats.slowest > 0
+    assert stats.slowest_statement == "SELECT 2"
+    assert stats.server_timing().startswith('db;dur=')
+    assert 'desc="3 queries"' in stats.server_timing()
+
+
+def test_slow_query_log_redacts_parameters(file_engine, monkeypatch, caplog):
+    monkeypatch.setattr(database, "DB_SLOW_QUERY_MS", 0.000001)
+
+    with caplog.at_level(logging.WARNING, logger="src.database"):
+        with file_engine.connect() as connection:
+            connection.execute(text("SELECT :password, :user_id"), {"password": "hunter2", "user_id": 7})
+
+    assert "Slow query" in caplog.text
+    assert "hunter2" not in caplog.text
+    assert "params=(str, int)" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_request_summary_names_slowest_statement(file_engine, monkeypatch, caplog):
+    monkeypatch.setattr(database, "DB_LOG_REQUEST_QUERIES", True)
+
+    async def app(scope, receive, send):
+        with file_engine.connect() as connection:
+            connection.execute(text("SELECT :password,\n       :user_id"), {"password": "hunter2", "user_id": 7})
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def send(message):
+        pass
+
+    with caplog.at_level(logging.INFO, logger="src.database"):
+        await QueryTimingMiddleware(app)({"type": "http", "method": "GET", "path": "/orders"}, None, send)
+
+    assert 'slowest_sql="SELECT ?, ?"' in caplog.text
+    assert "hunter2" not in caplog.text
+
+
+def test_slowest_sql_is_collapsed_and_truncated():
+    stats = QueryStats()
+    stats.record("SELECT id\n  FROM simple_work_orders\n  WHERE " + "x = 1 AND " * 100 + "y = 2", 0.01)
+
+    assert stats.slowest_sql().startswith("SELECT id FROM simple_work_orders WHERE x = 1")
+    assert len(stats.slowest_sql(max_chars=40)) == 40
+    assert stats.slowest_sql(max_chars=40).endswith("...")
+    assert QueryStats().slowest_sql() == ""
+
+
+def test_redact_parameters_shapes():
+    assert redact_parameters({"email": "a@example.com", "id": 1}) == "{email: str, id: int}"
+    assert redact_parameters([{"id": 1}, {"id": 2}]) == "<2 parameter sets>"
+    assert redact_parameters(()) == "()"
+
+
+def test_libpq_database_url_drops_the_driver():
+    assert libpq_database_url("postgresql+psycopg2://app:s3cret@db:5432/cups") == "postgresql://app:s3cret@db:5432/cups"
+    assert libpq_database_url("postgresql+asyncpg://app@db/cups") == "postgresql://app@db/cups"
+    assert libpq_database_url("postgresql://app@db/cups?sslmode=require") == "postgresql://app@db/cups?sslmode=require"
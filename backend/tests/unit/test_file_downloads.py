@@ -0,0 +1,32 @@
+import pytest
+
+from src.services.file_downloads import RangeNotSatisfiable, etag_matches, parse_range
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-99", (0, 99)),
+    ("bytes=100-", (100, 999)),
+    ("bytes=-200", (800, 999)),
+    ("bytes=900-5000", (900, 999)),
+    ("bytes=-5000", (0, 999)),
+    (None, None),
+    ("items=0-10", None),
+    ("bytes=0-10,20-30", None),
+    ("bytes=abc-", None),
+    ("bytes=50-10", None),
+])
+def test_parse_range(header, expected):
+    assert parse_range(header, 1000) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=1000-", "bytes=-0"])
+def test_unsatisfiable_ranges(header):
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range(header, 1000)
+
+
+def test_etag_matches_lists_and_weak_tags():
+    assert etag_matches('"a", W/"b"', '"b"')
+    assert etag_matches("*", '"b"')
+    assert not etag_matches('"a"', '"b"')
+    assert not etag_matches(None, '"b"')
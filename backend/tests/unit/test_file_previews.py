@@ -0,0 +1,139 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from src.database import Base
+from src.models import FilePreviewJob, SimpleWorkOrder
+from src.services import file_previews
+from src.services.async_simple_work_order_service import AsyncSimpleWorkOrderService
+from src.services.file_previews import PreviewUnsupported, claim_job, is_previewable, process_next_job
+
+
+@pytest.fixture
+def database_path(tmp_path):
+    # File-backed SQLite: files are added through the async service, jobs run on sync sessions
+    return tmp_path / "test.db"
+
+
+@pytest.fixture
+def session_factory(tmp_path, database_path, monkeypatch):
+    monkeypatch.setattr(file_previews.blob_store, "directory", str(tmp_path / "blobs"))
+    engine = create_engine(f"sqlite:///{database_path}")
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+async def add_file(database_path, tmp_path, file_name="logo.png"):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{database_path}", poolclass=NullPool)
+    async with async_sessionmaker(engine, expire_on_commit=False)() as db:
+        order = SimpleWorkOrder(customer_name="Blue Bottle", customer_email="orders@example.com",
+                                order_description="12oz cups", quantity=1000)
+        db.add(order)
+        await db.commit()
+        source = tmp_path / file_name
+        source.write_bytes(b"image bytes")
+        work_order_file = await AsyncSimpleWorkOrderService(db).add_file(order.id, file_name, str(source), "logo", "Sam")
+    return work_order_file.id
+
+
+def job_for(session_factory, file_id) -> FilePreviewJob:
+    db = session_factory()
+    try:
+        return db.scalar(select(FilePreviewJob).where(FilePreviewJob.file_id == file_id))
+    finally:
+        db.close()
+
+
+def copy_renderer(source, destination):
+    import os
+    os.makedirs(os.path.dirname(destination), exist_ok=True)
+    with open(source, "rb") as src, open(destination, "wb") as dst:
+        dst.write(src.read())
+
+
+@pytest.mark.asyncio
+async def test_only_images_are_queued(session_factory, database_path, tmp_path):
+    assert is_previewable("Logo.PNG")
+    assert not is_previewable("artwork.pdf")
+
+    assert job_for(session_factory, await add_file(database_path, tmp_path, "artwork.pdf")) is None
+    assert job_for(session_factory, await add_file(database_path, tmp_path)).status == "pending"
+
+
+@pytest.mark.asyncio
+async def test_worker_renders_and_marks_done(session_factory, database_path, tmp_path):
+    file_id = await add_file(database_path, tmp_path)
+
+    assert process_next_job(session_factory, copy_renderer) is True
+    assert process_next_job(session_factory, copy_renderer) is False
+
+    job = job_for(session_factory, file_id)
+    assert job.status == "done"
+    assert job.attempts == 1
+    assert open(job.preview_path, "rb").read() == b"image bytes"
+
+
+@pytest.mark.asyncio
+async def test_failures_retry_with_backoff_then_give_up(session_factory, database_path, tmp_path, monkeypatch):
+    monkeypatch.setattr(file_previews, "PREVIEW_MAX_ATTEMPTS", 2)
+    file_id = await add_file(database_path, tmp_path)
+
+    def broken_renderer(source, destination):
+        raise OSError("disk full")
+
+    process_next_job(session_factory, broken_renderer)
+    job = job_for(session_factory, file_id)
+    assert job.status == "pending"
+    assert job.run_after > datetime.utcnow()
+    assert process_next_job(session_factory, broken_renderer) is False  # not due yet
+
+    db = session_factory()
+    db.execute(file_previews.jobs_table.update().values(run_after=datetime.utcnow()))
+    db.commit()
+    db.close()
+    process_next_job(session_factory, broken_renderer)
+
+    job = job_for(session_factory, file_id)
+    assert job.status == "failed"
+    assert job.last_error == "disk full"
+
+
+@pytest.mark.asyncio
+async def test_unsupported_files_are_not_retried(session_factory, database_path, tmp_path):
+    file_id = await add_file(database_path, tmp_path)
+
+    def unsupported(source, destination):
+        raise PreviewUnsupported("cannot identify image file")
+
+    process_next_job(session_factory, unsupported)
+
+    assert job_for(session_factory, file_id).status == "failed"
+
+
+@pytest.mark.asyncio
+async def test_claimed_job_is_not_handed_out_twice(session_factory, database_path, tmp_path):
+    await add_file(database_path, tmp_path)
+    db = session_factory()
+
+    assert claim_job(db) is not None
+    assert claim_job(db) is None
+    # ...until its worker is presumed dead
+    later = datetime.utcnow() + timedelta(seconds=file_previews.PREVIEW_JOB_TIMEOUT + 1)
+    assert claim_job(db, now=later)["attempts"] == 2
+    db.close()
+
+
+def test_render_preview_writes_small_webp(tmp_path):
+    Image = pytest.importorskip("PIL.Image")
+    source = tmp_path / "logo.png"
+    Image.new("RGBA", (2000, 1000), (0, 120, 200, 255)).save(source)
+
+    file_previews.render_preview(str(source), str(tmp_path / "previews" / "logo.webp"), max_size=320)
+
+    with Image.open(tmp_path / "previews" / "logo.webp") as preview:
+        assert preview.size == (320, 160)
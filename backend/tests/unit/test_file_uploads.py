@@ -0,0 +1,176 @@
+import asyncio
+import hashlib
+import io
+import os
+
+import pytest
+from starlette.datastructures import UploadFile
+
+from src.services.file_uploads import (
+    ChunkedUploadStore, UploadTooLarge, safe_file_name, save_upload
+)
+
+
+async def chunks_of(data: bytes, size: int = 4):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+def test_safe_file_name_strips_directories():
+    assert safe_file_name("../../etc/passwd") == "passwd"
+    assert safe_file_name("C:\\art\\logo final.pdf") == "logo final.pdf"
+    assert safe_file_name("..") == "upload"
+
+
+@pytest.mark.asyncio
+async def test_save_upload_streams_and_hashes(tmp_path):
+    data = os.urandom(10_000)
+    destination = str(tmp_path / "logo.png")
+
+    stored = await save_upload(UploadFile(io.BytesIO(data), filename="logo.png"), destination, chunk_size=1024)
+
+    assert stored.size == len(data)
+    assert stored.sha256 == hashlib.sha256(data).hexdigest()
+    assert open(destination, "rb").read() == data
+
+
+@pytest.mark.asyncio
+async def test_oversized_upload_leaves_nothing_behind(tmp_path):
+    destination = str(tmp_path / "huge.pdf")
+
+    with pytest.raises(UploadTooLarge):
+        await save_upload(UploadFile(io.BytesIO(b"x" * 5000), filename="huge.pdf"), destination,
+                          max_bytes=4096, chunk_size=1024)
+
+    assert os.listdir(tmp_path) == []
+
+
+@pytest.mark.asyncio
+async def test_chunked_upload_resumes_and_completes(tmp_path):
+    store = ChunkedUploadStore(directory=str(tmp_path / "incoming"), max_bytes=1000)
+    data = b"print-ready artwork " * 10
+    session = await store.create(7, "art.pdf", "design", "Sam", total_size=len(data))
+    upload_id = session["upload_id"]
+
+    assert await store.append(upload_id, 0, chunks_of(data[:50])) == 50
+
+    # A retried chunk at a stale offset is refused; the client resumes from status()
+    with pytest.raises(ValueError):
+        await store.append(upload_id, 0, chunks_of(data[:50]))
+    assert (await store.status(upload_id))["offset"] == 50
+
+    assert await store.append(upload_id, 50, chunks_of(data[50:])) == len(data)
+    session, stored = await store.complete(upload_id, str(tmp_path / "art.pdf"))
+
+    assert session["work_order_id"] == 7
+    assert stored.sha256 == hashlib.sha256(data).hexdigest()
+    assert open(stored.path, "rb").read() == data
+    assert os.listdir(tmp_path / "incoming") == []
+
+
+@pytest.mark.asyncio
+async def test_chunked_upload_hash_recomputed_after_worker_switch(tmp_path):
+    directory = str(tmp_path / "incoming")
+    data = b"0123456789" * 8
+    first_worker = ChunkedUploadStore(directory=directory)
+    upload_id = (await first_worker.create(1, "a.ai", "design", "Sam", total_size=len(data)))["upload_id"]
+    await first_worker.append(upload_id, 0, chunks_of(data[:40]))
+
+    second_worker = ChunkedUploadStore(directory=directory)
+    await second_worker.append(upload_id, 40, chunks_of(data[40:]))
+    _, stored = await second_worker.complete(upload_id, str(tmp_path / "a.ai"))
+
+    assert stored.sha256 == hashlib.sha256(data).hexdigest()
+
+
+@pytest.mark.asyncio
+async def test_chunk_past_declared_size_is_rolled_back(tmp_path):
+    store = ChunkedUploadStore(directory=str(tmp_path / "incoming"))
+    upload_id = (await store.create(1, "a.pdf", "design", "Sam", total_size=10))["upload_id"]
+    await store.append(upload_id, 0, chunks_of(b"12345"))
+
+    with pytest.raises(ValueError):
+        await store.append(upload_id, 5, chunks_of(b"6789012345"))
+
+    assert (await store.status(upload_id))["offset"] == 5
+
+
+@pytest.mark.asyncio
+async def test_unknown_upload_id_is_rejected(tmp_path):
+    store = ChunkedUploadStore(directory=str(tmp_path))
+
+    with pytest.raises(ValueError):
+        await store.status("../../etc/passwd")
+
+
+@pytest.mark.asyncio
+async def test_concurrent_completes_finish_once(tmp_path):
+    store = ChunkedUploadStore(directory=str(tmp_path / "incoming"))
+    data = b"cup sleeve artwork" * 4
+    upload_id = (await store.create(1, "a.pdf", "design", "Sam", total_size=len(data)))["upload_id"]
+    await store.append(upload_id, 0, chunks_of(data))
+
+    results = await asyncio.gather(
+        store.complete(upload_id, str(tmp_path / "first.pdf")),
+        store.complete(upload_id, str(tmp_path / "second.pdf")),
+        return_exceptions=True
+    )
+
+    completed = [result for result in results if not isinstance(result, Exception)]
+    failed = [result for result in results if isinstance(result, Exception)]
+    assert len(completed) == 1
+    assert len(failed) == 1 and isinstance(failed[0], ValueError)
+    assert open(completed[0][1].path, "rb").read() == data
+
+
+@pytest.mark.asyncio
+async def test_purge_forgets_abandoned_uploads(tmp_path):
+    store = ChunkedUploadStore(directory=str(tmp_path / "incoming"), ttl=60)
+    upload_id = (await store.create(1, "a.pdf", "design", "Sam", total_size=10))["upload_id"]
+    await store.append(upload_id, 0, chunks_of(b"12345"))
+    assert upload_id in store._locks and upload_id in store._hashers
+
+    assert await store.purge(now=os.path.getmtime(tmp_path / "incoming" / f"{upload_id}.part") + 120) == 1
+
+    assert upload_id not in store._locks
+    assert upload_id not in store._hashers
+
+
+@pytest.mark.asyncio
+async def test_abort_waits_for_complete_in_progress(tmp_path):
+    store = ChunkedUploadStore(directory=str(tmp_path / "incoming"))
+    data = b"cup sleeve artwork" * 4
+    upload_id = (await store.create(1, "a.pdf", "design", "Sam", total_size=len(data)))["upload_id"]
+    await store.append(upload_id, 0, chunks_of(data))
+
+    completing = asyncio.ensure_future(store.complete(upload_id, str(tmp_path / "a.pdf")))
+    await asyncio.sleep(0)
+    await store.abort(upload_id)
+
+    _, stored = await completing
+    assert open(stored.path, "rb").read() == data
+    assert os.listdir(tmp_path / "incoming") == []
+    assert upload_id not in store._locks
+
+
+@pytest.mark.skipif(os.name != "posix", reason="cross-process locking uses flock")
+@pytest.mark.asyncio
+async def test_appends_from_two_workers_do_not_interleave(tmp_path):
+    directory = str(tmp_path / "incoming")
+    first_worker = ChunkedUploadStore(directory=directory)
+    second_worker = ChunkedUploadStore(directory=directory)
+    upload_id = (await first_worker.create(1, "a.pdf", "design", "Sam", total_size=16))["upload_id"]
+
+    async def slow_chunks(data):
+        for byte in data:
+            await asyncio.sleep(0.005)
+            yield bytes([byte])
+
+    results = await asyncio.gather(
+        first_worker.append(upload_id, 0, slow_chunks(b"AAAAAAAA")),
+        second_worker.append(upload_id, 0, slow_chunks(b"BBBBBBBB")),
+        return_exceptions=True
+    )
+
+    assert sum(isinstance(result, ValueError) for result in results) == 1
+    assert (await first_worker.status(upload_id))["offset"] == 8
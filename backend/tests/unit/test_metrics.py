@@ -0,0 +1,105 @@
+import asyncio
+import time
+
+import pytest
+
+from src import metrics
+from src.metrics import Counter, Histogram, MetricsMiddleware, MetricsRegistry, http_request_duration
+
+
+def test_counter_renders_with_total_suffix_and_labels():
+    registry = MetricsRegistry()
+    requests = registry.counter("uspc_test_requests", "Requests", ("route",))
+
+    requests.inc('/orders/{order_id}')
+    requests.inc('/orders/{order_id}', amount=2)
+    requests.inc('say "hi"')
+
+    text = registry.render()
+    assert "# TYPE uspc_test_requests_total counter" in text
+    assert 'uspc_test_requests_total{route="/orders/{order_id}"} 3' in text
+    assert 'uspc_test_requests_total{route="say \\"hi\\""} 1' in text
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("uspc_test_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, "/health")
+
+    samples = {(suffix, labels.get("le")): value for suffix, labels, value in histogram.samples()}
+
+    assert samples[("_bucket", "0.1")] == 2  # le is inclusive
+    assert samples[("_bucket", "1")] == 3
+    assert samples[("_bucket", "+Inf")] == 4
+    assert samples[("_count", None)] == 4
+    assert samples[("_sum", None)] == pytest.approx(3.65)
+
+
+def test_collectors_are_read_at_render_time():
+    registry = MetricsRegistry()
+    depth = {"value": 1}
+
+    def collect():
+        counter = Counter("uspc_test_snapshot", "Snapshot")
+        counter.inc(amount=depth["value"])
+        yield counter
+
+    registry.add_collector(collect)
+    assert "uspc_test_snapshot_total 1" in registry.render()
+    depth["value"] = 5
+    assert "uspc_test_snapshot_total 5" in registry.render()
+
+
+def test_dashboard_hit_ratio_comes_from_etag_responses(monkeypatch):
+    responses = Counter("uspc_dashboard_responses", "Dashboard responses", ("result",))
+    monkeypatch.setattr(metrics, "dashboard_responses", responses)
+    responses.inc("not_modified", amount=3)
+    responses.inc("full")
+
+    families = {metric.name: metric for metric in metrics.collect_runtime_metrics()}
+
+    assert families["uspc_dashboard_cache_hit_ratio"].value() == 0.75
+
+
+def test_middleware_overhead_is_small():
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 204, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def send(message):
+        pass
+
+    middleware = MetricsMiddleware(app)
+    scope = {"type": "http", "method": "GET", "path": "/overhead"}
+    calls = 5000
+
+    async def timed(handler):
+        started = time.perf_counter()
+        for _ in range(calls):
+            await handler(scope, None, send)
+        return time.perf_counter() - started
+
+    async def measure():
+        return (await timed(middleware) - await timed(app)) / calls
+
+    overhead = asyncio.run(measure())
+
+    assert overhead < 50e-6
+    assert http_request_duration.count("GET", "unmatched") >= 5000
+
+
+def test_metrics_endpoint_reports_routes_and_runtime_stats():
+    from fastapi.testclient import TestClient
+    from src.main import app
+
+    with TestClient(app) as client:
+        client.get("/health")
+        response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'uspc_http_requests_total{method="GET",route="/health",status="200"}' in response.text
+    assert 'uspc_http_request_duration_seconds_bucket{method="GET",route="/health",le="+Inf"}' in response.text
+    for name in ("uspc_http_requests_in_flight", "uspc_db_pool_checked_out", "uspc_password_hash_queue_depth",
+                 "uspc_upload_bytes_total", "uspc_dashboard_cache_hit_ratio", "uspc_dashboard_responses_total"):
+        assert f"\n{name}" in response.text
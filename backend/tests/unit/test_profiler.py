@@ -0,0 +1,121 @@
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api.v1.simple_auth import require_admin
+from src.main import app
+from src.profiler import ProfilerBusy, SamplingProfiler
+
+
+def busy_hot_path(stop: threading.Event):
+    while not stop.is_set():
+        sum(i * i for i in range(1000))
+
+
+@pytest.fixture
+def profiler(tmp_path):
+    profiler = SamplingProfiler(directory=str(tmp_path / "profiles"), interval_ms=1)
+    yield profiler
+    profiler.stop()
+
+
+def test_profile_captures_busy_threads(profiler):
+    stop = threading.Event()
+    worker = threading.Thread(target=busy_hot_path, args=(stop,), name="busy-worker")
+    worker.start()
+    try:
+        profiler.start(seconds=0.3)
+        time.sleep(0.1)
+        assert profiler.status()["running"] is True
+        summary = profiler.stop()
+    finally:
+        stop.set()
+        worker.join()
+
+    assert summary["samples"] > 0
+    with open(profiler.profile_path(summary["file"])) as handle:
+        lines = handle.read().splitlines()
+    busy = [line for line in lines if line.startswith("busy-worker;")]
+    assert busy and "busy_hot_path (" in busy[0]
+    _, count = busy[0].rsplit(" ", 1)
+    assert int(count) > 0
+    assert not profiler.running
+
+
+def test_request_bounded_run_stops_itself(profiler):
+    profiler.start(requests=2)
+    with pytest.raises(ProfilerBusy):
+        profiler.start(seconds=1)
+
+    profiler.request_finished()
+    assert profiler.running
+    profiler.request_finished()
+
+    for _ in range(100):
+        if not profiler.running:
+            break
+        time.sleep(0.01)
+    assert not profiler.running
+    assert profiler.last_profile["requests"] == 2
+
+
+def test_interval_is_validated_and_clamped(profiler):
+    with pytest.raises(ValueError):
+        profiler.start(seconds=1, interval_ms=-5)
+    assert not profiler.running
+
+    profiler.start(seconds=0.2, interval_ms=0.001)
+    time.sleep(0.2)
+    profiler.stop()
+
+    # Clamped to PROFILER_MIN_INTERVAL_MS: no more than one sample per millisecond
+    assert profiler.last_profile["samples"] <= 250
+
+
+def test_profile_path_rejects_other_files(profiler):
+    with pytest.raises(ValueError):
+        profiler.profile_path("../secrets.folded")
+    with pytest.raises(ValueError):
+        profiler.profile_path("missing.folded")
+
+
+def test_profiler_endpoints_require_admin():
+    with TestClient(app) as client:
+        assert client.get("/api/v1/admin/profiler").status_code == 403
+        assert client.post("/api/v1/admin/profiler/start", json={"seconds": 1}).status_code == 403
+
+
+def test_start_rejects_bad_input_with_400():
+    app.dependency_overrides[require_admin] = lambda: object()
+    try:
+        with TestClient(app) as client:
+            for body in ({"seconds": "soon"}, {"interval_ms": -5}, {"interval_ms": 0}, [1, 2]):
+                response = client.post("/api/v1/admin/profiler/start", json=body)
+                assert response.status_code == 400, body
+                assert response.json()["success"] is False
+            assert client.get("/api/v1/admin/profiler").json()["running"] is False
+    finally:
+        app.dependency_overrides.pop(require_admin, None)
+
+
+def test_admin_can_run_and_download_a_profile(tmp_path, monkeypatch):
+    from src.profiler import sampling_profiler
+
+    monkeypatch.setattr(sampling_profiler, "directory", str(tmp_path))
+    app.dependency_overrides[require_admin] = lambda: object()
+    try:
+        with TestClient(app) as client:
+            started = client.post("/api/v1/admin/profiler/start", json={"seconds": 5, "interval_ms": 1})
+            assert started.json()["running"] is True
+            assert client.post("/api/v1/admin/profiler/start", json={"seconds": 5}).status_code == 409
+
+            client.get("/health")
+            profile = client.post("/api/v1/admin/profiler/stop").json()["profile"]
+            download = client.get(f"/api/v1/admin/profiler/profiles/{profile['file']}")
+    finally:
+        app.dependency_overrides.pop(require_admin, None)
+
+    assert download.status_code == 200
+    assert download.headers["content-type"].startswith("text/plain")
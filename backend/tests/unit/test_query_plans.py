@@ -0,0 +1,42 @@
+import pytest
+from sqlalchemy import create_engine
+
+from src.query_plans import analyze, check_query_plans, plan_check_metadata, seed, sequential_scans
+
+
+@pytest.fixture
+def connection():
+    engine = create_engine("sqlite://")
+    with engine.connect() as connection:
+        plan_check_metadata().create_all(connection)
+        seed(connection, rows=3000)
+        analyze(connection)
+        yield connection
+    engine.dispose()
+
+
+def test_hot_queries_use_indexes(connection):
+    results = check_query_plans(connection)
+
+    failures = {name: result["plan"] for name, result in results.items() if result["seq_scans"]}
+    assert failures == {}
+    assert "WorkOrderService.get_production_queue(scheduled)" in results
+
+
+def test_missing_index_is_reported(connection):
+    connection.exec_driver_sql("DROP INDEX ix_work_order_files_work_order_id")
+    try:
+        results = check_query_plans(connection)
+    finally:
+        connection.exec_driver_sql("CREATE INDEX ix_work_order_files_work_order_id ON work_order_files (work_order_id)")
+
+    assert results["AsyncSimpleWorkOrderService.get_order_files"]["seq_scans"] == ["work_order_files"]
+
+
+def test_sequential_scans_reads_both_dialects():
+    assert sequential_scans(["SCAN work_orders"]) == ["work_orders"]
+    assert sequential_scans(["SCAN work_orders USING INDEX ix_work_orders_order_date_id"]) == []
+    assert sequential_scans(["SEARCH customers USING INDEX ix_customers_status (status=?)"]) == []
+    assert sequential_scans(["Limit", "  Seq Scan on simple_work_orders"]) == ["simple_work_orders"]
+    assert sequential_scans(["Index Scan on work_orders using ix_work_orders_status_order_date"]) == []
+    assert sequential_scans(["SCAN (subquery-3)", "SCAN users"]) == []
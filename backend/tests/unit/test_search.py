@@ -0,0 +1,61 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.models.customer import Base, Customer
+from src.services.search import escape_like, text_search
+
+COLUMNS = (Customer.company_name, Customer.contact_person, Customer.email, Customer.city)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    for company, contact, email, city in [
+        ("Cupworks Supply", "Dana Reyes", "orders@cupworks.com", "Portland"),
+        ("Blue Bottle Coffee", "Sam Lee", "sam@bluebottle.com", "Oakland"),
+        ("Bottle & Cup Co", "Alex Kim", "alex@bottlecup.com", "Seattle"),
+        ("100%_Juice", "Jo Park", "jo@juice.com", "Denver"),
+    ]:
+        session.add(Customer(company_name=company, contact_person=contact, email=email, city=city))
+    session.commit()
+    yield session
+    session.close()
+
+
+def search(db, term):
+    search_filter, rank = text_search("sqlite", COLUMNS, term)
+    return [c.company_name for c in db.query(Customer).filter(search_filter).order_by(rank.desc(), Customer.id)]
+
+
+def test_company_prefix_outranks_other_matches(db):
+    assert search(db, "bottle") == ["Bottle & Cup Co", "Blue Bottle Coffee"]
+
+
+def test_search_covers_contact_email_and_city(db):
+    assert search(db, "reyes") == ["Cupworks Supply"]
+    assert search(db, "OAKLAND") == ["Blue Bottle Coffee"]
+
+
+def test_short_terms_match_prefixes_only(db):
+    assert search(db, "bl") == ["Blue Bottle Coffee"]
+
+
+def test_wildcards_in_the_term_match_literally(db):
+    assert escape_like("100%_") == "100!%!_"
+    assert search(db, "0%_") == ["100%_Juice"]
+    assert search(db, "1_0") == []
+
+
+def test_postgres_search_uses_trigram_operators():
+    search_filter, rank = text_search("postgresql", (Customer.company_name, Customer.email), "cupworks")
+
+    sql = str(search_filter.compile(dialect=postgresql.dialect()))
+    assert "ILIKE" in sql and "<%" in sql
+    assert "word_similarity" in str(rank.compile(dialect=postgresql.dialect()))
@@ -0,0 +1,87 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.security import (
+    PasswordHashBusy, PasswordHashPool, get_password_hash, get_password_hash_async, hash_rounds,
+    needs_rehash, recommend_rounds, verify_password_async
+)
+
+
+@pytest.mark.asyncio
+async def test_verify_password_async_matches_sync_hash():
+    hashed = get_password_hash("cup-factory")
+
+    assert await verify_password_async("cup-factory", hashed) is True
+    assert await verify_password_async("wrong", hashed) is False
+
+
+@pytest.mark.asyncio
+async def test_get_password_hash_async_round_trip():
+    hashed = await get_password_hash_async("secret")
+
+    assert await verify_password_async("secret", hashed) is True
+
+
+@pytest.mark.asyncio
+async def test_pool_rejects_work_past_queue_limit():
+    pool = PasswordHashPool(workers=1, max_queue=1)
+    release = threading.Event()
+
+    running = asyncio.ensure_future(pool.run(release.wait))
+    queued = asyncio.ensure_future(pool.run(release.wait))
+    await asyncio.sleep(0.05)
+
+    assert pool.queue_depth == 1
+    with pytest.raises(PasswordHashBusy):
+        await pool.run(release.wait)
+
+    release.set()
+    await asyncio.gather(running, queued)
+
+    stats = pool.snapshot()
+    assert stats["completed"] == 2
+    assert stats["rejected"] == 1
+    assert stats["in_flight"] == 0
+    assert stats["max_queue_ms"] > 0
+
+
+@pytest.mark.asyncio
+async def test_pool_keeps_slot_of_cancelled_caller_until_hash_finishes():
+    pool = PasswordHashPool(workers=1, max_queue=0)
+    release = threading.Event()
+
+    caller = asyncio.ensure_future(pool.run(release.wait))
+    await asyncio.sleep(0.05)
+    caller.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await caller
+
+    # The worker is still busy, so the slot must stay taken
+    assert pool.snapshot()["in_flight"] == 1
+    with pytest.raises(PasswordHashBusy):
+        await pool.run(release.wait)
+
+    release.set()
+    for _ in range(100):
+        if pool.snapshot()["in_flight"] == 0:
+            break
+        await asyncio.sleep(0.01)
+    assert pool.snapshot()["in_flight"] == 0
+
+
+def test_hash_rounds_and_needs_rehash():
+    hashed = get_password_hash("secret", rounds=4)
+
+    assert hash_rounds(hashed) == 4
+    assert needs_rehash(hashed, rounds=4) is False
+    assert needs_rehash(hashed, rounds=5) is True
+    assert hash_rounds("not-a-bcrypt-hash") is None
+
+
+def test_recommend_rounds_picks_highest_cost_within_budget():
+    timings = {10: 60.0, 11: 120.0, 12: 240.0, 13: 480.0}
+
+    assert recommend_rounds(timings, target_ms=250) == 12
+    assert recommend_rounds(timings, target_ms=10) == 10
@@ -0,0 +1,88 @@
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from starlette.requests import Request
+
+from src.api.v1 import simple_auth
+from src.api.v1.simple_auth import (
+    AuthenticatedUser, create_simple_token, get_current_user_from_request, invalidate_cached_user
+)
+from src.database import Base
+from src.models import SimpleUser
+
+
+@pytest.fixture
+def engine():
+    # In-memory SQLite shared across the test via a single connection
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    simple_auth._user_cache.clear()
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    session.add(SimpleUser(
+        username="maria",
+        email="maria@example.com",
+        full_name="Maria Lopez",
+        hashed_password="not-used",
+        role="designer"
+    ))
+    session.commit()
+    yield session
+    session.close()
+
+
+def make_request(token):
+    headers = [(b"authorization", f"Bearer {token}".encode())]
+    return Request({"type": "http", "headers": headers, "query_string": b""})
+
+
+def count_queries(engine):
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    return statements
+
+
+def test_returns_frozen_snapshot(db):
+    user = get_current_user_from_request(make_request(create_simple_token("maria")), db)
+
+    assert isinstance(user, AuthenticatedUser)
+    assert user.full_name == "Maria Lopez"
+    with pytest.raises(AttributeError):
+        user.is_admin = True
+
+
+def test_repeat_requests_skip_the_database(engine, db):
+    token = create_simple_token("maria")
+    get_current_user_from_request(make_request(token), db)
+    statements = count_queries(engine)
+
+    for _ in range(5):
+        assert get_current_user_from_request(make_request(token), db).username == "maria"
+
+    assert statements == []
+
+
+def test_disabled_user_loses_access_after_invalidation(db):
+    token = create_simple_token("maria")
+    assert get_current_user_from_request(make_request(token), db) is not None
+
+    user = db.query(SimpleUser).filter(SimpleUser.username == "maria").first()
+    user.is_active = False
+    db.commit()
+    invalidate_cached_user("maria")
+
+    assert get_current_user_from_request(make_request(token), db) is None
+
+
+def test_invalid_token_is_rejected(db):
+    assert get_current_user_from_request(make_request("garbage"), db) is None
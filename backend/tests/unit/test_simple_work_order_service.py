@@ -0,0 +1,127 @@
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from src.database import Base
+from src.models import SimpleWorkOrder
+from src.services.async_simple_work_order_service import AsyncSimpleWorkOrderService
+
+
+@pytest.fixture
+def database_path(tmp_path):
+    # File-backed SQLite so the sync seeding session and the async service share one database
+    path = tmp_path / "test.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    engine.dispose()
+    return path
+
+
+@pytest.fixture
+def db(database_path):
+    engine = create_engine(f"sqlite:///{database_path}")
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+@pytest.fixture
+def async_engine(database_path):
+    return create_async_engine(f"sqlite+aiosqlite:///{database_path}", poolclass=NullPool)
+
+
+async def run_service(async_engine, method: str, *args, **kwargs):
+    async with async_sessionmaker(async_engine, expire_on_commit=False)() as session:
+        return await getattr(AsyncSimpleWorkOrderService(session), method)(*args, **kwargs)
+
+
+def seed_orders(db, status, count, start=None):
+    start = start or datetime(2025, 1, 1)
+    for i in range(count):
+        db.add(SimpleWorkOrder(
+            customer_name=f"{status} customer {i}",
+            customer_email=f"{status}{i}@example.com",
+            order_description=f"{status} order {i}",
+            quantity=1000 + i,
+            status=status,
+            created_at=start + timedelta(minutes=i)
+        ))
+    db.commit()
+
+
+@pytest.mark.asyncio
+async def test_dashboard_groups_every_stage(db, async_engine):
+    seed_orders(db, "new_order", 2)
+    seed_orders(db, "design", 1)
+    seed_orders(db, "shipping", 3)
+    seed_orders(db, "completed", 4)
+
+    data = await run_service(async_engine, "get_dashboard_data")
+
+    assert list(data) == ["new_orders", "design", "approval", "print", "production", "shipping"]
+    assert len(data["new_orders"]) == 2
+    assert len(data["design"]) == 1
+    assert data["approval"] == []
+    assert len(data["shipping"]) == 3
+    assert all(order.status == "shipping" for order in data["shipping"])
+
+
+@pytest.mark.asyncio
+async def test_dashboard_uses_single_query(db, async_engine):
+    seed_orders(db, "new_order", 3)
+    seed_orders(db, "print", 3)
+
+    statements = []
+    event.listen(async_engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    await run_service(async_engine, "get_dashboard_data")
+
+    assert len(statements) == 1
+
+
+@pytest.mark.asyncio
+async def test_dashboard_caps_rows_per_stage(db, async_engine):
+    seed_orders(db, "shipping", 10)
+    seed_orders(db, "design", 2)
+
+    data = await run_service(async_engine, "get_dashboard_data", per_stage_limit=4)
+
+    assert len(data["shipping"]) == 4
+    assert len(data["design"]) == 2
+    # Oldest orders stay on the board first
+    assert [order.customer_name for order in data["shipping"]] == [
+        f"shipping customer {i}" for i in range(4)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_dashboard_limit_zero_means_no_cap(db, async_engine):
+    seed_orders(db, "production", 7)
+
+    data = await run_service(async_engine, "get_dashboard_data", per_stage_limit=0)
+
+    assert len(data["production"]) == 7
+
+
+@pytest.mark.asyncio
+async def test_dashboard_cards_are_plain_projections(db, async_engine):
+    seed_orders(db, "design", 2)
+    order = db.query(SimpleWorkOrder).first()
+    order.order_description = "x" * 1000
+    order.special_notes = "not on the card"
+    db.commit()
+
+    async with async_sessionmaker(async_engine, expire_on_commit=False)() as session:
+        cards = await AsyncSimpleWorkOrderService(session).get_dashboard_cards()
+        # Nothing was loaded into the identity map
+        assert len(session.identity_map) == 0
+
+    assert len(cards["design"]) == 2
+    card = cards["design"][0]
+    assert isinstance(card, dict)
+    assert set(card) == {"id", "status", "customer_name", "quantity", "order_description", "assigned_to"}
+    assert len(card["order_description"]) == 140
@@ -0,0 +1,215 @@
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from src.main import app
+from src.database import Base, get_async_db, instrument_engine
+
+DASHBOARD_URL = "/api/v1/simple-work-orders/dashboard"
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    # File-backed SQLite so the async routes and the schema setup share one database
+    database_path = tmp_path / "test.db"
+    engine = create_engine(f"sqlite:///{database_path}")
+    Base.metadata.create_all(bind=engine)
+    engine.dispose()
+
+    # Preview workers started with the app render against the same database
+    from src.services.file_previews import preview_worker
+    monkeypatch.setattr(preview_worker, "session_factory",
+                        sessionmaker(bind=create_engine(f"sqlite:///{database_path}", poolclass=NullPool)))
+
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{database_path}", poolclass=NullPool)
+    instrument_engine(async_engine.sync_engine)
+    TestingSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with TestingSessionLocal() as db:
+            yield db
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+    app.dependency_overrides.clear()
+
+
+def create_order(client, name="Blue Bottle"):
+    response = client.post("/api/v1/simple-work-orders/create", data={
+        "customer_name": name,
+        "customer_email": "orders@example.com",
+        "order_description": "12oz hot cups, two colour logo",
+        "quantity": 5000
+    })
+    assert response.json()["success"] is True
+    return response.json()["order_id"]
+
+
+def test_dashboard_returns_etag_and_last_modified(client):
+    create_order(client)
+
+    response = client.get(DASHBOARD_URL, params={"view": "card"})
+
+    assert response.status_code == 200
+    assert response.headers["etag"].startswith('"')
+    assert "last-modified" in response.headers
+    assert response.json()["new_orders"][0]["customer_name"] == "Blue Bottle"
+
+
+def test_responses_report_sql_time_in_server_timing(client):
+    create_order(client)
+
+    response = client.get(DASHBOARD_URL)
+
+    server_timing = response.headers["server-timing"]
+    assert server_timing.startswith("db;dur=")
+    assert 'desc="0 queries"' not in server_timing
+    assert "db-slowest;dur=" in server_timing
+
+
+def test_dashboard_answers_304_when_unchanged(client):
+    create_order(client)
+    etag = client.get(DASHBOARD_URL).headers["etag"]
+
+    response = client.get(DASHBOARD_URL, headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+
+def test_dashboard_etag_changes_after_write(client):
+    order_id = create_order(client)
+    etag = client.get(DASHBOARD_URL).headers["etag"]
+
+    client.post(f"/api/v1/simple-work-orders/{order_id}/claim", json={"person_name": "Sam"})
+    response = client.get(DASHBOARD_URL, headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_dashboard_etag_depends_on_view(client):
+    create_order(client)
+
+    full = client.get(DASHBOARD_URL).headers["etag"]
+    card = client.get(DASHBOARD_URL, params={"view": "card"}).headers["etag"]
+
+    assert full != card
+
+
+@pytest.fixture
+def blobs(tmp_path, monkeypatch):
+    from src.services.blob_store import blob_store
+    from src.services.file_uploads import chunked_uploads
+    monkeypatch.setattr(blob_store, "directory", str(tmp_path / "blobs"))
+    monkeypatch.setattr(chunked_uploads, "directory", str(tmp_path / "incoming"))
+    return blob_store
+
+
+def upload(client, order_id, content=b"logo bytes", name="logo.png"):
+    response = client.post(f"/api/v1/simple-work-orders/{order_id}/upload",
+                           files={"file": (name, content)}, data={"file_type": "logo", "uploaded_by": "Sam"})
+    assert response.json()["success"] is True
+    return response.json()
+
+
+def test_reuploaded_file_is_stored_once(client, blobs):
+    first = upload(client, create_order(client))
+    second = upload(client, create_order(client, name="Reorder"), name="logo-copy.png")
+
+    assert first["sha256"] == second["sha256"]
+    assert [sha for sha, _ in blobs.iter_blobs()] == [first["sha256"]]
+    assert os.listdir(blobs.temp_directory) == []
+
+
+def test_attach_by_hash_skips_the_upload(client, blobs):
+    stored = upload(client, create_order(client))
+    order_id = create_order(client, name="Reorder")
+    url = f"/api/v1/simple-work-orders/{order_id}/files/by-hash"
+
+    response = client.post(url, json={"sha256": stored["sha256"], "file_name": "logo.png", "file_type": "logo"})
+    assert response.json()["deduplicated"] is True
+    files = client.get(f"/api/v1/simple-work-orders/{order_id}/files").json()["files"]
+    assert files[0]["sha256"] == stored["sha256"]
+
+    missing = client.post(url, json={"sha256": "0" * 64, "file_name": "new.pdf"})
+    assert missing.status_code == 404
+    assert missing.json()["missing"] is True
+
+
+def test_chunked_upload_lands_in_blob_store(client, blobs):
+    order_id = create_order(client)
+    data = b"x" * 300
+    started = client.post(f"/api/v1/simple-work-orders/{order_id}/uploads",
+                          json={"file_name": "art.pdf", "file_type": "design", "total_size": len(data)}).json()
+    upload_url = f"/api/v1/simple-work-orders/uploads/{started['upload_id']}"
+
+    assert client.put(upload_url, params={"offset": 0}, content=data[:100]).json()["offset"] == 100
+    conflict = client.put(upload_url, params={"offset": 0}, content=data[:100])
+    assert conflict.status_code == 409
+    assert conflict.json()["offset"] == 100
+    client.put(upload_url, params={"offset": 100}, content=data[100:])
+
+    completed = client.post(f"{upload_url}/complete").json()
+    assert completed["success"] is True
+    assert open(blobs.path_for(completed["sha256"]), "rb").read() == data
+
+
+def test_download_supports_ranges_and_etags(client, blobs):
+    order_id = create_order(client)
+    content = bytes(range(256)) * 40
+    stored = upload(client, order_id, content=content, name="artwork.pdf")
+    url = f"/api/v1/simple-work-orders/{order_id}/files/{stored['file_id']}/download"
+
+    full = client.get(url)
+    assert full.status_code == 200
+    assert full.content == content
+    assert full.headers["etag"] == f'"{stored["sha256"]}"'
+    assert full.headers["accept-ranges"] == "bytes"
+    assert "immutable" in full.headers["cache-control"]
+    assert full.headers["content-disposition"] == 'attachment; filename="artwork.pdf"'
+
+    partial = client.get(url, headers={"Range": "bytes=1000-1999"})
+    assert partial.status_code == 206
+    assert partial.content == content[1000:2000]
+    assert partial.headers["content-range"] == f"bytes 1000-1999/{len(content)}"
+    assert partial.headers["content-length"] == "1000"
+
+    stale = client.get(url, headers={"Range": "bytes=0-9", "If-Range": '"other"'})
+    assert stale.status_code == 200
+    assert len(stale.content) == len(content)
+
+    assert client.get(url, headers={"If-None-Match": full.headers["etag"]}).status_code == 304
+    assert client.get(url, headers={"Range": f"bytes={len(content)}-"}).status_code == 416
+
+    head = client.head(url)
+    assert head.headers["content-length"] == str(len(content))
+    assert head.content == b""
+
+
+def test_download_of_unknown_file_is_404(client, blobs):
+    order_id = create_order(client)
+
+    assert client.get(f"/api/v1/simple-work-orders/{order_id}/files/999/download").status_code == 404
+
+
+def test_image_uploads_get_a_preview_job(client, blobs):
+    order_id = create_order(client)
+    image = upload(client, order_id, name="logo.png")
+    document = upload(client, order_id, content=b"%PDF", name="proof.pdf")
+
+    files = {f["id"]: f for f in client.get(f"/api/v1/simple-work-orders/{order_id}/files").json()["files"]}
+    assert files[image["file_id"]]["preview"] in ("pending", "running", "done", "failed")
+    assert files[document["file_id"]]["preview"] is None
+
+    response = client.get(f"/api/v1/simple-work-orders/{order_id}/files/{document['file_id']}/preview")
+    assert response.status_code == 404
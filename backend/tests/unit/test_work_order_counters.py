@@ -0,0 +1,99 @@
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import Column, Integer, MetaData, Table, create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.models.work_order import Priority, WorkOrder, WorkOrderCounter, WorkOrderStatus
+from src.services.work_order_counters import (
+    apply_counter_delta, compute_counters, counter_delta, order_counters, read_counter_statistics,
+    rebuild_counters, stored_counters
+)
+from src.services.work_order_service import fold_statistics, statistics_statement
+
+NOW = datetime(2024, 5, 20)
+
+
+@pytest.fixture
+def db():
+    # work_orders and its counters, with bare users/customers tables for the foreign keys
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    metadata = MetaData()
+    Table("users", metadata, Column("id", Integer, primary_key=True))
+    Table("customers", metadata, Column("id", Integer, primary_key=True))
+    WorkOrder.__table__.to_metadata(metadata)
+    WorkOrderCounter.__table__.to_metadata(metadata)
+    metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def insert_order(db, number, status, priority, amount, delivery_date=None):
+    """Insert a row the way WorkOrderService does: order plus its counters, one commit."""
+    db.execute(WorkOrder.__table__.insert().values(
+        work_order_number=number, customer_id=1, product_type="Paper Cup 8oz", quantity=1000,
+        unit_price=Decimal("0.10"), total_amount=Decimal(amount), status=status, priority=priority,
+        is_active=True, delivery_date=delivery_date
+    ))
+    apply_counter_delta(db, order_counters(status, priority, True, Decimal(amount), delivery_date))
+    db.commit()
+
+
+def test_counter_delta_moves_order_between_statuses():
+    before = order_counters(WorkOrderStatus.SHIPPED, Priority.HIGH, True, Decimal("80.00"), None)
+    after = order_counters(WorkOrderStatus.DELIVERED, Priority.HIGH, True, Decimal("80.00"), NOW)
+
+    assert counter_delta(before, after) == {
+        "status:shipped": (-1, Decimal("-80.00")),
+        "status:delivered": (1, Decimal("80.00")),
+        "completed:2024-05": (1, Decimal(0))
+    }
+
+
+def test_deactivated_order_leaves_every_counter():
+    before = order_counters(WorkOrderStatus.PENDING, Priority.LOW, True, Decimal("10.00"), None)
+
+    assert order_counters(WorkOrderStatus.CANCELLED, Priority.LOW, False, Decimal("10.00"), None) == {}
+    assert set(counter_delta(before, {})) == {"status:pending", "priority:low"}
+
+
+def test_counter_reads_match_grouped_query(db):
+    insert_order(db, "WO-1", WorkOrderStatus.PENDING, Priority.HIGH, "150.00")
+    insert_order(db, "WO-2", WorkOrderStatus.PENDING, Priority.NORMAL, "50.00")
+    insert_order(db, "WO-3", WorkOrderStatus.IN_PRODUCTION, Priority.HIGH, "25.00")
+    insert_order(db, "WO-4", WorkOrderStatus.DELIVERED, Priority.LOW, "40.00", delivery_date=datetime(2024, 5, 2))
+    insert_order(db, "WO-5", WorkOrderStatus.DELIVERED, Priority.LOW, "40.00", delivery_date=datetime(2024, 4, 2))
+
+    rows = db.execute(statistics_statement(datetime(2024, 5, 1), datetime(2024, 5, 31, 23, 59, 59))).all()
+
+    assert read_counter_statistics(db, NOW) == fold_statistics(rows)
+    assert stored_counters(db) == compute_counters(db)
+
+
+def test_counter_read_is_a_single_small_query(db):
+    for i in range(20):
+        insert_order(db, f"WO-{i}", WorkOrderStatus.DELIVERED, Priority.NORMAL, "10.00",
+                     delivery_date=datetime(2023 + i % 2, 1 + i % 12, 1))
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    stats = read_counter_statistics(db, NOW)
+
+    assert len(statements) == 1
+    assert "work_orders " not in statements[0]
+    assert stats["total_orders"] == 20
+
+
+def test_rebuild_repairs_drift(db):
+    insert_order(db, "WO-1", WorkOrderStatus.PENDING, Priority.HIGH, "150.00")
+    db.execute(WorkOrderCounter.__table__.update().values(count=99))
+    db.commit()
+
+    drift = rebuild_counters(db)
+
+    assert drift["status:pending"] == (-98, Decimal(0))
+    assert stored_counters(db) == compute_counters(db)
+    assert read_counter_statistics(db, NOW)["pending_orders"] == 1
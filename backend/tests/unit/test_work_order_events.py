@@ -0,0 +1,73 @@
+import asyncio
+import json
+import threading
+
+import pytest
+
+from src.services.work_order_events import EventHub, format_sse, work_order_event
+
+
+@pytest.mark.asyncio
+async def test_event_reaches_every_subscriber():
+    hub = EventHub()
+    first = hub.subscribe()
+    second = hub.subscribe()
+
+    hub.publish(work_order_event("status", 7, status="design"))
+
+    for queue in (first, second):
+        event = await asyncio.wait_for(queue.get(), timeout=1)
+        assert event["type"] == "status"
+        assert event["order_id"] == 7
+        assert event["status"] == "design"
+
+
+@pytest.mark.asyncio
+async def test_publish_from_worker_thread():
+    hub = EventHub()
+    queue = hub.subscribe()
+
+    # Sync services run in FastAPI's threadpool, not on the loop
+    thread = threading.Thread(target=hub.publish, args=(work_order_event("created", 1),))
+    thread.start()
+    thread.join()
+
+    event = await asyncio.wait_for(queue.get(), timeout=1)
+    assert event["type"] == "created"
+
+
+@pytest.mark.asyncio
+async def test_slow_client_drops_oldest_events():
+    hub = EventHub(queue_size=3)
+    queue = hub.subscribe()
+
+    for order_id in range(5):
+        hub.publish(work_order_event("claimed", order_id))
+
+    received = [queue.get_nowait()["order_id"] for _ in range(queue.qsize())]
+    assert received == [2, 3, 4]
+
+
+@pytest.mark.asyncio
+async def test_unsubscribed_client_gets_nothing():
+    hub = EventHub()
+    queue = hub.subscribe()
+    hub.unsubscribe(queue)
+
+    hub.publish(work_order_event("upload", 3))
+
+    assert queue.empty()
+    assert hub.subscriber_count == 0
+
+
+def test_publish_without_loop_is_a_no_op():
+    # Scripts and tests that never start the server must not fail
+    EventHub().publish(work_order_event("created", 1))
+
+
+def test_format_sse():
+    message = format_sse({"type": "status", "order_id": 2})
+
+    assert message.startswith("data: ")
+    assert message.endswith("\n\n")
+    assert json.loads(message[len("data: "):]) == {"type": "status", "order_id": 2}
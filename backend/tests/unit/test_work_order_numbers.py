@@ -0,0 +1,69 @@
+import threading
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from src.models.work_order import WorkOrderNumberCounter
+from src.services.work_order_numbers import (
+    WorkOrderNumberAllocator, format_work_order_number, reserve_numbers, work_order_number_prefix
+)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    # File-backed so every thread gets its own connection, like a real pool
+    engine = create_engine(f"sqlite:///{tmp_path / 'numbers.db'}", connect_args={"timeout": 30})
+    WorkOrderNumberCounter.__table__.create(engine)
+    return engine
+
+
+def test_number_format():
+    prefix = work_order_number_prefix(datetime(2024, 5, 20))
+
+    assert format_work_order_number(prefix, 7) == "WO2024-0007"
+
+
+def test_reserve_numbers_in_transaction(engine):
+    db = sessionmaker(bind=engine)()
+
+    assert reserve_numbers(db, "WO2024") == 1
+    assert reserve_numbers(db, "WO2024") == 2
+    assert reserve_numbers(db, "WO2025") == 1
+    db.rollback()
+
+    # Rolled back with the order that would have used it - no gap
+    assert reserve_numbers(db, "WO2024") == 1
+
+
+def test_concurrent_allocation_never_repeats(engine):
+    allocated = []
+    lock = threading.Lock()
+
+    def worker():
+        for _ in range(25):
+            with engine.begin() as connection:
+                value = reserve_numbers(connection, "WO2024")
+            with lock:
+                allocated.append(value)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(allocated) == list(range(1, 201))
+
+
+def test_block_allocator_reserves_in_chunks(engine):
+    first = WorkOrderNumberAllocator(block_size=10)
+    second = WorkOrderNumberAllocator(block_size=10)
+
+    values = [first.next_value(engine, "WO2024") for _ in range(3)]
+    values.append(second.next_value(engine, "WO2024"))
+
+    assert values == [1, 2, 3, 11]
+    with engine.connect() as connection:
+        assert connection.execute(select(WorkOrderNumberCounter.__table__.c.last_value)).scalar() == 20
@@ -0,0 +1,140 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import Column, Integer, MetaData, Table, create_engine, event, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.database import Base
+from src.models.simple_work_order import SimpleWorkOrder
+from src.models.work_order import Priority, WorkOrder, WorkOrderStatus
+from src.services.work_order_service import (
+    ExplainJson, decode_cursor, encode_cursor, fold_statistics, keyset_filter, statistics_statement
+)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def test_cursor_round_trip_keeps_types():
+    order_date = datetime(2024, 3, 1, 9, 30)
+
+    assert decode_cursor(encode_cursor("order_date", "desc", order_date, 42)) == ("order_date", "desc", order_date, 42)
+    assert decode_cursor(encode_cursor("total_amount", "asc", Decimal("12.50"), 7))[2] == Decimal("12.50")
+
+
+def test_malformed_cursor_is_rejected():
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+def test_estimate_explain_processes_enum_filters_for_postgres():
+    work_orders = WorkOrder.__table__
+    statement = select(work_orders.c.id).where(
+        work_orders.c.status == WorkOrderStatus.PENDING, work_orders.c.priority == Priority.HIGH
+    )
+    dialect = postgresql.dialect()
+
+    compiled = ExplainJson(statement).compile(dialect=dialect)
+    params = {
+        name: compiled.binds[name].type.dialect_impl(dialect).bind_processor(dialect)(value)
+        for name, value in compiled.construct_params().items()
+    }
+
+    assert str(compiled).startswith("EXPLAIN (FORMAT JSON) SELECT work_orders.id")
+    assert sorted(params.values()) == ["HIGH", "PENDING"]
+
+
+@pytest.mark.parametrize("descending", [True, False])
+def test_keyset_pages_cover_every_row_once_with_ties(db, descending):
+    # Three orders share each timestamp, so paging must fall back to id
+    start = datetime(2024, 1, 1)
+    for i in range(10):
+        db.add(SimpleWorkOrder(customer_name=f"Cafe {i}", customer_email="cafe@example.com",
+                               order_description="cups", quantity=100,
+                               created_at=start + timedelta(days=i // 3)))
+    db.commit()
+
+    order = (SimpleWorkOrder.created_at.desc(), SimpleWorkOrder.id.desc()) if descending else \
+        (SimpleWorkOrder.created_at.asc(), SimpleWorkOrder.id.asc())
+    expected = [row.id for row in db.query(SimpleWorkOrder).order_by(*order)]
+
+    seen, cursor = [], None
+    while True:
+        query = db.query(SimpleWorkOrder).order_by(*order)
+        if cursor:
+            _, _, sort_value, last_id = decode_cursor(cursor)
+            query = query.filter(keyset_filter(SimpleWorkOrder.created_at, SimpleWorkOrder.id,
+                                               sort_value, last_id, descending))
+        page = query.limit(4).all()
+        if not page:
+            break
+        seen.extend(row.id for row in page)
+        cursor = encode_cursor("created_at", "desc", page[-1].created_at, page[-1].id)
+
+    assert seen == expected
+
+
+@pytest.fixture
+def work_orders_engine():
+    # work_orders alone, with bare users/customers tables for its foreign keys
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    metadata = MetaData()
+    Table("users", metadata, Column("id", Integer, primary_key=True))
+    Table("customers", metadata, Column("id", Integer, primary_key=True))
+    work_orders = WorkOrder.__table__.to_metadata(metadata)
+    metadata.create_all(engine)
+    return engine, work_orders
+
+
+def add_order(connection, work_orders, number, status, priority, amount="100.00", is_active=True, delivery_date=None):
+    connection.execute(work_orders.insert().values(
+        work_order_number=number, customer_id=1, product_type="Paper Cup 8oz", quantity=1000,
+        unit_price=Decimal("0.10"), total_amount=Decimal(amount), status=status, priority=priority,
+        is_active=is_active, delivery_date=delivery_date
+    ))
+
+
+def test_statistics_come_from_one_grouped_query(work_orders_engine):
+    engine, work_orders = work_orders_engine
+    month_start, month_end = datetime(2024, 5, 1), datetime(2024, 5, 31, 23, 59, 59)
+    with engine.begin() as connection:
+        add_order(connection, work_orders, "WO-1", WorkOrderStatus.PENDING, Priority.HIGH, "150.00")
+        add_order(connection, work_orders, "WO-2", WorkOrderStatus.PENDING, Priority.NORMAL, "50.00")
+        add_order(connection, work_orders, "WO-3", WorkOrderStatus.IN_PRODUCTION, Priority.HIGH, "25.00")
+        add_order(connection, work_orders, "WO-4", WorkOrderStatus.DELIVERED, Priority.LOW, delivery_date=datetime(2024, 5, 10))
+        add_order(connection, work_orders, "WO-5", WorkOrderStatus.DELIVERED, Priority.LOW, delivery_date=datetime(2024, 4, 10))
+        add_order(connection, work_orders, "WO-6", WorkOrderStatus.PENDING, Priority.URGENT, is_active=False)
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    with engine.connect() as connection:
+        stats = fold_statistics(connection.execute(statistics_statement(month_start, month_end)).all())
+
+    assert len(statements) == 1
+    assert stats["total_orders"] == 5
+    assert stats["orders_by_status"]["pending"] == 2
+    assert stats["orders_by_status"]["cancelled"] == 0
+    assert stats["orders_by_priority"] == {"low": 2, "normal": 1, "high": 2, "urgent": 0}
+    assert stats["pending_orders"] == 2
+    assert stats["in_production_orders"] == 1
+    assert stats["completed_this_month"] == 1
+    assert stats["total_value"] == Decimal("225.00")
+
+
+def test_fold_statistics_with_no_orders():
+    stats = fold_statistics([])
+
+    assert stats["total_orders"] == 0
+    assert set(stats["orders_by_status"]) == {status.value for status in WorkOrderStatus}
+    assert stats["total_value"] == Decimal("0")